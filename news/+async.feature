@@ -0,0 +1 @@
+Add ``async_recurrence_sequence_ical`` and ``async_recurrence_sequence_timedelta``, which calculate recurrence sequences in an executor without blocking the asyncio event loop.
@@ -0,0 +1 @@
+Add ``plone.event.batch.expand_many``, which calculates the occurrences of many events in a process pool and returns them as compact integer arrays.
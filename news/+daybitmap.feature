@@ -0,0 +1 @@
+Add ``plone.event.daybitmap`` with compressed day bitmaps of the days with events per category, for month grids and mini calendars.
@@ -0,0 +1 @@
+Occurrences returned by RecurrenceSupport only store their series and the offset of their start, which keeps long occurrence lists and the occurrence cache small.
@@ -0,0 +1 @@
+Add ``plone.event.freebusy``, which lazily merges the occurrences of many events into coalesced busy periods and formats them as RFC5545 FREEBUSY properties.
@@ -0,0 +1 @@
+Add ``plone.event.ical.ical_chunks``, which exports events as RFC5545 calendar in bytes chunks, reading the events lazily, so large calendars are exported with a constant memory footprint.
@@ -0,0 +1 @@
+Add ``plone.event.ical.read_events``, which reads the events of an RFC5545 calendar incrementally from a file or byte stream and generates them as ``IVEvent`` records with ``pydt`` converted dates, optionally converting them in a process pool.
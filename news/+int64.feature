@@ -0,0 +1 @@
+Add ``dt2int64`` and ``int642dt``, a 64bit integer representation of datetimes with a resolution of one second, and the NumPy batch converters ``dt2int_array``, ``int2dt_array``, ``dt2int64_array`` and ``int642dt_array``. ``int2dt`` now decodes dates in December and on the 31st correctly.
@@ -0,0 +1,2 @@
+Add ``recurrence_int_array``, which calculates the ``dt2int`` integer representations of the occurrences without creating timezone aware datetimes.
+``plone.event.batch`` uses it to expand events.
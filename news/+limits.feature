@@ -0,0 +1,3 @@
+Add ``IRecurrenceLimits`` with a maximum number of occurrences, a maximum number of scanned dates and a timeout for recurrence calculations.
+Limits can be passed per call or registered as utility, ``MAXCOUNT`` remains the default.
+The sequences tell via their ``truncated`` attribute, if they were stopped by a limit.
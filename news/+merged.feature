@@ -0,0 +1 @@
+Add ``merged_occurrences``, which lazily merges the occurrences of many events in chronological order, e.g. to find the next upcoming occurrences.
@@ -0,0 +1 @@
+Add ``plone.event.index.OccurrenceIndex``, an interval tree over the occurrences of many events for range and stabbing queries.
@@ -0,0 +1 @@
+Speed up ``pydt`` for normalized datetimes and cache the zones guessed by ``guesstz``. Add ``pydt_many`` to convert many values, e.g. of catalog brains.
@@ -0,0 +1 @@
+Add ``recurrence_diff``, which calculates the occurrences added and removed by a change of the recurrence definition and only checks the changed dates, if just RDATE or EXDATE lines changed.
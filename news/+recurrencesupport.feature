@@ -0,0 +1 @@
+Add ``plone.event.adapters.RecurrenceSupport``, a default ``IRecurrenceSupport`` adapter for ``IEventRecurrence`` events, which caches the occurrences per uid, last modification date and range.
@@ -0,0 +1,2 @@
+Cache compiled recurrence rulesets in a bounded LRU cache, so that repeated calls of ``recurrence_sequence_ical`` with the same rule and start date skip parsing.
+Add ``compile_recurrence``, ``invalidate_recurrence_cache`` and the ``plone.event.cache.LRUCache`` with hit/miss statistics.
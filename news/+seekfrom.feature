@@ -0,0 +1,3 @@
+``recurrence_sequence_ical`` seeks to the first occurrence ending after ``from_`` when no ``until`` is given, instead of localizing and dropping every earlier occurrence.
+``MAXCOUNT`` is now applied from ``from_`` on, like when both ``from_`` and ``until`` are given, ``count`` is still counted from the event's start.
+The new ``seek_recurrence`` function starts rules without ``COUNT`` at their last period before ``from_``, so its cost doesn't grow with the age of the event.
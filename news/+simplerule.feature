@@ -0,0 +1,2 @@
+Calculate simple daily and weekly recurrence rules arithmetically in ``recurrence_sequence_ical`` with the new ``plone.event.simplerule.SimpleRule``, which supports indexing, counting and seeking in constant time.
+All other rules are still calculated with python-dateutil.
@@ -0,0 +1 @@
+Add ``plone.event.adapters.EventSnapshot``, a read-only ``IEventAccessor`` with all values read once, and ``event_snapshots``, which builds the snapshots of many contexts with one adapter lookup per content type.
@@ -0,0 +1,2 @@
+Add ``plone.event.store``, a memory mapped file store of the occurrences of many events, which worker processes share through the page cache.
+The ``plone-event-store`` console script rebuilds a store from iCalendar files, adds events to it or compacts it.
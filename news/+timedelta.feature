@@ -0,0 +1 @@
+Add ``TimedeltaRecurrence`` with arithmetic length, index and window access to timedelta recurrences. ``recurrence_sequence_timedelta`` uses it for pytz timezones.
@@ -0,0 +1 @@
+Add timezone backends in ``plone.event.tzbackend``. ``set_backend("zoneinfo")`` switches from pytz to the standard library zoneinfo timezones, with the same DST semantics.
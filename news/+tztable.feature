@@ -0,0 +1 @@
+Speed up ``recurrence_sequence_ical`` by looking up the UTC offsets of the occurrences in cached per-timezone transition tables and comparing UTC times as integers.
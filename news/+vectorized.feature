@@ -0,0 +1,2 @@
+Add ``plone.event.vectorized`` with ``recurrence_datetime64`` and ``recurrence_int32``, which calculate recurrence sequences as NumPy arrays of UTC ``datetime64[s]`` values or ``dt2int`` compatible integers.
+NumPy is an optional dependency, available via the ``numpy`` extra.
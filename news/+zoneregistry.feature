@@ -0,0 +1 @@
+Cache timezone lookups, including invalid identifiers, in ``get_timezone``, rate limit the warnings about invalid timezones and cache ``default_timezone`` until the ``TZ`` environment variable changes.
@@ -42,9 +42,18 @@ setup(
         "zope.component",
         "zope.interface",
     ],
+    entry_points={
+        "console_scripts": [
+            "plone-event-store = plone.event.store:main",
+        ],
+    },
     extras_require={
+        "numpy": [
+            "numpy",
+        ],
         "test": [
             "DateTime",
+            "numpy",
             "zope.configuration",
         ],
     },
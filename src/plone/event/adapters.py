@@ -1,7 +1,18 @@
+from array import array
+from datetime import timedelta
+from plone.event.cache import LRUCache
 from plone.event.interfaces import IEvent
 from plone.event.interfaces import IEventAccessor
+from plone.event.interfaces import IEventRecurrence
+from plone.event.interfaces import IOccurrence
+from plone.event.interfaces import IRecurrenceSupport
+from plone.event.recurrence import recurrence_sequence_ical
+from plone.event.utils import pydt
+from plone.event.utils import utc
 from zope.component import adapter
+from zope.component import getSiteManager
 from zope.interface import implementer
+from zope.interface import providedBy
 
 
 @implementer(IEventAccessor)
@@ -28,3 +39,291 @@ class EventAccessor:
     @property
     def duration(self):
         return self.end - self.start
+
+
+# The attributes of IEventAccessor, which are copied into snapshots.
+SNAPSHOT_FIELDS = tuple(sorted(IEventAccessor.names()))
+_VALUE_FIELDS = tuple(it for it in SNAPSHOT_FIELDS if it != "duration")
+_marker = object()
+
+
+@implementer(IEventAccessor)
+class EventSnapshot:
+    """Read-only accessor with the values of an IEventAccessor, read once.
+
+    Reading an attribute of a snapshot doesn't access the context, so lists
+    of many events can be rendered without waking up their content objects
+    again. Attributes, which the accessor doesn't provide, raise an
+    AttributeError, like they do on the accessor. Attributes beyond
+    IEventAccessor aren't available.
+
+    >>> from datetime import datetime
+    >>> from plone.event.adapters import EventAccessor, EventSnapshot
+    >>> class Event:
+    ...     uid = 'a1'
+    ...     title = 'Meeting'
+    ...     start = datetime(2013, 6, 3, 9, 0)
+    ...     end = datetime(2013, 6, 3, 10, 0)
+    >>> snapshot = EventSnapshot(EventAccessor(Event()))
+    >>> snapshot.title, snapshot.duration
+    ('Meeting', datetime.timedelta(seconds=3600))
+    >>> snapshot.title = 'Changed'
+    Traceback (most recent call last):
+    ...
+    AttributeError: EventSnapshot is read-only.
+
+    """
+
+    __slots__ = ("context",) + SNAPSHOT_FIELDS
+
+    def __init__(self, accessor):
+        """
+        :param accessor: IEventAccessor or an object, which is adapted to it.
+        """
+        if not IEventAccessor.providedBy(accessor):
+            accessor = IEventAccessor(accessor)
+        _set = object.__setattr__
+        context = getattr(accessor, "context", accessor)
+        _set(self, "context", context)
+        # EventAccessor only forwards to the context, so read from the context
+        # directly.
+        source = context if type(accessor) is EventAccessor else accessor
+        for name in _VALUE_FIELDS:
+            value = getattr(source, name, _marker)
+            if value is not _marker:
+                _set(self, name, value)
+        try:
+            if source is context:
+                duration = self.end - self.start
+            else:
+                duration = accessor.duration
+            _set(self, "duration", duration)
+        except (AttributeError, TypeError):
+            # TypeError: Event without start or end.
+            pass
+
+    def __setattr__(self, name, value):
+        raise AttributeError("EventSnapshot is read-only.")
+
+    def __delattr__(self, name):
+        raise AttributeError("EventSnapshot is read-only.")
+
+    def __repr__(self):
+        return f"<EventSnapshot {getattr(self, 'uid', None)!r}>"
+
+
+def event_snapshots(contexts):
+    """Return the snapshots of many contexts.
+
+    The IEventAccessor adapter factory is looked up once per set of provided
+    interfaces instead of once per context.
+
+    :param contexts: Iterable of contexts, e.g. content objects, or
+                     IEventAccessor objects.
+    :type contexts: iterable
+    :rtype: list of EventSnapshot
+    """
+    lookup = getSiteManager().adapters.lookup
+    factories = {}
+    result = []
+    for context in contexts:
+        if IEventAccessor.providedBy(context):
+            result.append(EventSnapshot(context))
+            continue
+        spec = providedBy(context)
+        factory = factories.get(spec)
+        if factory is None:
+            factory = lookup((spec,), IEventAccessor)
+            if factory is None:
+                # Without a registered adapter, the context can still conform
+                # or be adapted by an adapter hook. Raises the usual TypeError
+                # otherwise.
+                result.append(EventSnapshot(IEventAccessor(context)))
+                continue
+            factories[spec] = factory
+        accessor = factory(context)
+        if accessor is None:
+            accessor = IEventAccessor(context)
+        result.append(EventSnapshot(accessor))
+    return result
+
+
+# Occurrence start dates, keyed on uid, last modification date and range of
+# the event.
+OCCURRENCE_CACHE_SIZE = 1024
+occurrence_cache = LRUCache(maxsize=OCCURRENCE_CACHE_SIZE)
+
+
+def invalidate_occurrence_cache(uid=None):
+    """Remove cached occurrences.
+
+    Changes of events with a last_modified date are picked up without
+    invalidating the cache, because their cache keys change.
+
+    :param uid: Remove the occurrences of this event only. By default, all
+                entries are removed.
+    :returns: Number of removed entries.
+    :rtype: integer
+    """
+    if uid is None:
+        return occurrence_cache.invalidate()
+    return occurrence_cache.invalidate(predicate=lambda key: key[0] == uid)
+
+
+class OccurrenceSeries:
+    """Data shared by the occurrences of an event: the event, the UTC start of
+    the first occurrence, the timezone and the duration.
+    """
+
+    __slots__ = ("event", "utc", "tz", "duration")
+
+    def __init__(self, event, utc, tz, duration):
+        self.event = event
+        self.utc = utc
+        self.tz = tz
+        self.duration = duration
+
+    def start(self, offset):
+        """Return the start of the occurrence offset seconds after the first
+        one, in the timezone of the series.
+        """
+        return (self.utc + timedelta(seconds=offset)).astimezone(self.tz)
+
+
+@implementer(IOccurrence)
+class Occurrence:
+    """Single occurrence of an event.
+
+    Only the series and the offset of the start in seconds are stored, start
+    and end are calculated on access. Other attributes are read from the
+    event. As the start is calculated from UTC, a wall time within a DST gap
+    is returned with the UTC offset after the change.
+    """
+
+    __slots__ = ("_series", "_offset")
+
+    def __init__(self, series, offset):
+        """
+        :param series: OccurrenceSeries of the event.
+        :param offset: Seconds since the start of the first occurrence.
+        :type offset: integer
+        """
+        self._series = series
+        self._offset = offset
+
+    @property
+    def parent(self):
+        """IEventAccessor of the event."""
+        return self._series.event
+
+    @property
+    def start(self):
+        return self._series.start(self._offset)
+
+    @property
+    def end(self):
+        start = self._series.start(self._offset)
+        duration = self._series.duration
+        return start + duration if duration is not None else start
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._series.event, name)
+
+    def __repr__(self):
+        return f"<Occurrence {self.start.isoformat()}>"
+
+
+def _compact(dates):
+    """Return the UTC start of the first date, the timezone and the offsets
+    of the dates in seconds since the first one.
+    """
+    if not dates:
+        return None, None, array("q")
+    first = dates[0]
+    base = first.replace(tzinfo=None) - first.utcoffset()
+    offsets = array("q")
+    for date in dates:
+        # Subtracting datetimes with the same tzinfo ignores their UTC
+        # offsets, so compare the UTC times.
+        delta = date.replace(tzinfo=None) - date.utcoffset() - base
+        offsets.append(delta.days * 86400 + delta.seconds)
+    return utc(first), first.tzinfo, offsets
+
+
+@implementer(IRecurrenceSupport)
+@adapter(IEventRecurrence)
+class RecurrenceSupport:
+    """Recurrence adapter for events, which provide IEventAccessor start,
+    recurrence and duration.
+
+    The start dates of the occurrences are cached as offsets to the first
+    one, keyed on the uid and last_modified date of the event and the range.
+    Events without uid or last_modified are calculated each time, like
+    sequences, which are cut off by the recurrence limits.
+
+    >>> from datetime import datetime
+    >>> from plone.event.adapters import EventAccessor, RecurrenceSupport
+    >>> from zope.component import provideAdapter
+    >>> provideAdapter(EventAccessor)
+    >>> from plone.event.interfaces import IEvent
+    >>> from zope.interface import implementer
+    >>> @implementer(IEvent)
+    ... class Event:
+    ...     uid = 'a1'
+    ...     last_modified = datetime(2013, 5, 1)
+    ...     title = 'Daily'
+    ...     start = datetime(2013, 6, 3, 9, 0)
+    ...     end = datetime(2013, 6, 3, 10, 0)
+    ...     recurrence = 'RRULE:FREQ=DAILY;COUNT=10'
+    >>> occurrences = RecurrenceSupport(Event()).occurrences(
+    ...     datetime(2013, 6, 5), datetime(2013, 6, 7))
+    >>> [(it.start.day, it.end.hour, it.title) for it in occurrences]
+    [(5, 10, 'Daily'), (6, 10, 'Daily')]
+
+    """
+
+    def __init__(self, context):
+        self.context = context
+
+    def occurrences(self, range_start=None, range_end=None):
+        """Return the occurrences of the event, which end after range_start
+        and start before range_end.
+
+        :param range_start: Optional start of the range.
+        :type range_start: datetime.datetime
+        :param range_end: Optional end of the range.
+        :type range_end: datetime.datetime
+        :rtype: list of IOccurrence
+        """
+        event = IEventAccessor(self.context)
+        try:
+            duration = event.duration
+        except (AttributeError, TypeError):
+            duration = None
+        range_start = pydt(range_start) if range_start is not None else None
+        range_end = pydt(range_end) if range_end is not None else None
+
+        uid = getattr(event, "uid", None)
+        last_modified = getattr(event, "last_modified", None)
+        key = value = None
+        if uid is not None and last_modified is not None:
+            key = (uid, pydt(last_modified), range_start, range_end)
+            value = occurrence_cache.get(key)
+        if value is None:
+            dates = recurrence_sequence_ical(
+                event.start,
+                recrule=getattr(event, "recurrence", None),
+                from_=range_start,
+                until=range_end,
+                duration=duration,
+            )
+            value = _compact(list(dates))
+            # The limits might be different for the next call, e.g. per site
+            # or with more time left, so truncated sequences aren't cached.
+            if key is not None and not dates.truncated:
+                occurrence_cache.set(key, value)
+        first, tz, offsets = value
+        series = OccurrenceSeries(event, first, tz, duration)
+        return [Occurrence(series, offset) for offset in offsets]
@@ -0,0 +1,130 @@
+"""Expansion of the recurrence sequences of many events in parallel."""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from plone.event.recurrence import recurrence_int_array
+
+import itertools
+import os
+
+
+def expand_event(event, from_=None, until=None, limits=None):
+    """Calculate the integer representations of the occurrences of one event.
+
+    :param event: Tuple of start date, recurrence rule and duration, as passed
+                  to recurrence_sequence_ical. Recurrence rule and duration
+                  can be None.
+    :type event: tuple
+    :param limits: Optional limits, as for recurrence_sequence_ical.
+    :type limits: IRecurrenceLimits
+    :returns: Integer representations of the occurrences, as calculated by
+              plone.event.utils.dt2int.
+    :rtype: array.array of typecode 'i'
+
+    """
+    start, recrule, duration = event
+    return recurrence_int_array(
+        start,
+        recrule=recrule,
+        from_=from_,
+        until=until,
+        duration=duration,
+        limits=limits,
+    )
+
+
+def _expand_chunk(chunk, from_, until, limits):
+    return [
+        (index, expand_event(event, from_, until, limits)) for index, event in chunk
+    ]
+
+
+def expand_many(
+    events,
+    from_=None,
+    until=None,
+    workers=None,
+    chunksize=64,
+    ordered=True,
+    executor=None,
+    limits=None,
+):
+    """Calculate the occurrences of many events in a process pool.
+
+    The events are sent to the worker processes in chunks. Only the number of
+    chunks needed to keep the workers busy are in flight at the same time, so
+    events can be a lazy iterable.
+
+    :param events: Iterable of (start, recrule, duration) tuples.
+    :type events: iterable
+
+    :param from_: Optional datetime to limit the occurrences within a timespan.
+    :type from_: datetime.datetime
+
+    :param until: Optional datetime to limit the occurrences within a timespan.
+    :type until: datetime.datetime
+
+    :param workers: Number of worker processes. Defaults to the number of
+                    CPUs. With 1 or less, the events are expanded in the
+                    calling process.
+    :type workers: integer
+
+    :param chunksize: Number of events sent to a worker at once.
+    :type chunksize: integer
+
+    :param ordered: If True, the results are generated in the order of the
+                    events. Otherwise as soon as a chunk is completed.
+    :type ordered: boolean
+
+    :param executor: Optional concurrent.futures executor to be used instead
+                     of a new process pool.
+    :type executor: concurrent.futures.Executor
+
+    :param limits: Optional limits, as for recurrence_sequence_ical. Utilities
+                   registered in the calling process aren't available in the
+                   worker processes, so limits should be passed explicitly.
+    :type limits: IRecurrenceLimits
+
+    :returns: Generator of (index, occurrences) tuples, where index is the
+              position of the event in events and occurrences an array of
+              dt2int integer representations.
+    :rtype: generator
+
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    enumerated = enumerate(events)
+    chunks = iter(lambda: list(itertools.islice(enumerated, chunksize)), [])
+
+    if executor is None and workers <= 1:
+        for chunk in chunks:
+            yield from _expand_chunk(chunk, from_, until, limits)
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for chunk in itertools.islice(chunks, 2 * workers):
+            pending.append(executor.submit(_expand_chunk, chunk, from_, until, limits))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                for chunk in itertools.islice(chunks, 1):
+                    pending.append(
+                        executor.submit(_expand_chunk, chunk, from_, until, limits)
+                    )
+                yield from future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
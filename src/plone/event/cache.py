@@ -0,0 +1,145 @@
+from collections import OrderedDict
+
+import threading
+
+_marker = object()
+
+
+class LRUCache:
+    """A thread-safe, bounded least-recently-used cache with hit and miss
+    statistics.
+
+    >>> from plone.event.cache import LRUCache
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.set('a', 1)
+    >>> cache.set('b', 2)
+    >>> cache.get('a')
+    1
+
+    Adding a third item evicts the least recently used one.
+    >>> cache.set('c', 3)
+    >>> cache.get('b') is None
+    True
+    >>> sorted(cache.keys())
+    ['a', 'c']
+
+    >>> cache.stats()
+    {'hits': 1, 'misses': 1, 'evictions': 1, 'size': 2, 'maxsize': 2}
+
+    A maxsize of 0 disables caching.
+    >>> cache.resize(0)
+    >>> len(cache)
+    0
+    >>> cache.set('d', 4)
+    >>> len(cache)
+    0
+
+    """
+
+    def __init__(self, maxsize=128, on_evict=None):
+        """
+        :param maxsize: Maximum number of entries. 0 disables the cache, None
+                        makes it unbounded.
+        :type maxsize: integer
+
+        :param on_evict: Optional callable, which is called with the key and
+                         value of every entry evicted to make room for a new
+                         one.
+        :type on_evict: callable
+        """
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _marker)
+            if value is _marker:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if self.maxsize == 0:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._shrink(self.maxsize)
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for key. On a miss, call factory to create
+        the value and store it.
+        """
+        value = self.get(key, _marker)
+        if value is _marker:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key=None, predicate=None):
+        """Remove entries from the cache.
+
+        :param key: Remove the entry for this key.
+        :param predicate: Remove all entries for which predicate(key) is true.
+        :returns: Number of removed entries.
+        :rtype: integer
+        """
+        with self._lock:
+            if predicate is not None:
+                keys = [k for k in self._data if predicate(k)]
+            elif key is not None:
+                keys = [key] if key in self._data else []
+            else:
+                keys = list(self._data)
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def resize(self, maxsize):
+        """Change the maximum number of entries, evicting the least recently
+        used ones if necessary.
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            self._shrink(maxsize)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+    def _shrink(self, maxsize):
+        if maxsize is None:
+            return
+        while len(self._data) > maxsize:
+            key, value = self._data.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(key, value)
@@ -0,0 +1,336 @@
+"""Day resolution bitmaps of the days with events.
+
+Days are numbered since 1970-01-01. A DayBitmap splits them into chunks of
+4096 days and stores each non-empty chunk as an integer bit mask, like
+roaring bitmaps do with their containers. Sets of days spanning decades take a
+few hundred bytes, and union, intersection and range queries work on whole
+chunks at once.
+
+"""
+
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+
+CHUNK_BITS = 12
+CHUNK_SIZE = 1 << CHUNK_BITS
+_CHUNK_MASK = CHUNK_SIZE - 1
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_day(value):
+    """Return the day number of a date, datetime or day number.
+
+    Datetimes are taken at their wall time, without converting them to
+    another timezone.
+
+    >>> from datetime import date
+    >>> from plone.event.daybitmap import to_day
+    >>> to_day(date(1970, 1, 2))
+    1
+    """
+    if isinstance(value, int):
+        return value
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def from_day(day):
+    """Return the date of a day number."""
+    return date.fromordinal(day + EPOCH_ORDINAL)
+
+
+def _bits(mask, offset):
+    """Generate the positions of the set bits of mask, plus offset."""
+    while mask:
+        low = mask & -mask
+        yield offset + low.bit_length() - 1
+        mask ^= low
+
+
+class DayBitmap:
+    """Compressed set of day numbers.
+
+    >>> from datetime import date
+    >>> from plone.event.daybitmap import DayBitmap
+    >>> days = DayBitmap()
+    >>> days.add_range(date(2027, 1, 30), date(2027, 2, 2))
+    >>> days.add(date(2027, 3, 1))
+    >>> len(days)
+    5
+    >>> days.dates(date(2027, 2, 1), date(2027, 12, 31))
+    [datetime.date(2027, 2, 1), datetime.date(2027, 2, 2), datetime.date(2027, 3, 1)]
+    >>> other = DayBitmap([date(2027, 3, 1), date(2027, 4, 1)])
+    >>> (days & other).dates()
+    [datetime.date(2027, 3, 1)]
+    >>> len(days | other)
+    6
+
+    """
+
+    __slots__ = ("_chunks",)
+
+    def __init__(self, days=()):
+        """
+        :param days: Iterable of dates or day numbers.
+        """
+        # chunk number -> bit mask of the days in the chunk
+        self._chunks = {}
+        for day in days:
+            self.add(day)
+
+    @classmethod
+    def _from_chunks(cls, chunks):
+        bitmap = cls()
+        bitmap._chunks = {key: mask for key, mask in chunks.items() if mask}
+        return bitmap
+
+    def copy(self):
+        return self._from_chunks(self._chunks)
+
+    def add(self, day):
+        """Add a date or day number."""
+        day = to_day(day)
+        key = day >> CHUNK_BITS
+        self._chunks[key] = self._chunks.get(key, 0) | 1 << (day & _CHUNK_MASK)
+
+    def add_range(self, first, last):
+        """Add all days from first to last, inclusive."""
+        first, last = to_day(first), to_day(last)
+        while first <= last:
+            key = first >> CHUNK_BITS
+            lo = first & _CHUNK_MASK
+            hi = min(last - (key << CHUNK_BITS), _CHUNK_MASK)
+            mask = ((1 << (hi - lo + 1)) - 1) << lo
+            self._chunks[key] = self._chunks.get(key, 0) | mask
+            first = (key + 1) << CHUNK_BITS
+
+    def __contains__(self, day):
+        day = to_day(day)
+        return bool(self._chunks.get(day >> CHUNK_BITS, 0) >> (day & _CHUNK_MASK) & 1)
+
+    def __len__(self):
+        return sum(mask.bit_count() for mask in self._chunks.values())
+
+    def __bool__(self):
+        return bool(self._chunks)
+
+    def __iter__(self):
+        for key in sorted(self._chunks):
+            yield from _bits(self._chunks[key], key << CHUNK_BITS)
+
+    def __eq__(self, other):
+        if not isinstance(other, DayBitmap):
+            return NotImplemented
+        return self._chunks == other._chunks
+
+    def __or__(self, other):
+        chunks = dict(self._chunks)
+        for key, mask in other._chunks.items():
+            chunks[key] = chunks.get(key, 0) | mask
+        return self._from_chunks(chunks)
+
+    def __and__(self, other):
+        if len(other._chunks) < len(self._chunks):
+            self, other = other, self
+        return self._from_chunks(
+            {
+                key: mask & other._chunks[key]
+                for key, mask in self._chunks.items()
+                if key in other._chunks
+            }
+        )
+
+    def __sub__(self, other):
+        return self._from_chunks(
+            {
+                key: mask & ~other._chunks.get(key, 0)
+                for key, mask in self._chunks.items()
+            }
+        )
+
+    def __ior__(self, other):
+        for key, mask in other._chunks.items():
+            self._chunks[key] = self._chunks.get(key, 0) | mask
+        return self
+
+    def days(self, first=None, last=None):
+        """Return the sorted day numbers from first to last, inclusive.
+
+        :param first: Optional first date or day number.
+        :param last: Optional last date or day number.
+        :rtype: list
+        """
+        if not self._chunks:
+            return []
+        if first is None:
+            first = min(self._chunks) << CHUNK_BITS
+        if last is None:
+            last = ((max(self._chunks) + 1) << CHUNK_BITS) - 1
+        result = []
+        for offset, mask in self._masks(first, last):
+            result.extend(_bits(mask, offset))
+        return result
+
+    def dates(self, first=None, last=None):
+        """Return the sorted dates from first to last, inclusive."""
+        return [from_day(day) for day in self.days(first, last)]
+
+    def any(self, first, last):
+        """Return True, if there is a day from first to last, inclusive."""
+        return any(mask for _, mask in self._masks(first, last))
+
+    def _masks(self, first, last):
+        """Generate the masks of the chunks from first to last, inclusive,
+        shifted to start at first, with the day number of their first bit.
+        """
+        first, last = to_day(first), to_day(last)
+        for key in range(first >> CHUNK_BITS, (last >> CHUNK_BITS) + 1):
+            mask = self._chunks.get(key)
+            if not mask:
+                continue
+            offset = key << CHUNK_BITS
+            lo = max(first - offset, 0)
+            hi = min(last - offset, _CHUNK_MASK)
+            if lo <= hi:
+                yield offset + lo, mask >> lo & ((1 << (hi - lo + 1)) - 1)
+
+
+def occurrence_days(occurrences, duration=None):
+    """Return the days covered by occurrences.
+
+    An occurrence covers the days from its start to its end, taken at their
+    wall time. An end at midnight doesn't cover the following day.
+
+    :param occurrences: Iterable of datetimes or dates.
+    :param duration: Optional duration of the occurrences.
+    :type duration: datetime.timedelta
+    :rtype: DayBitmap
+    """
+    bitmap = DayBitmap()
+    for start in occurrences:
+        if not duration:
+            bitmap.add(start)
+            continue
+        end = start + duration
+        if not isinstance(start, datetime):
+            # Dates end at the midnight starting the end day.
+            if duration >= timedelta(days=1):
+                end -= timedelta(days=1)
+        elif end.time() == datetime.min.time():
+            end -= timedelta(microseconds=1)
+        bitmap.add_range(start, max(start, end))
+    return bitmap
+
+
+class DayIndex:
+    """Days with events, per category.
+
+    >>> from datetime import date, datetime, timedelta
+    >>> from plone.event.daybitmap import DayIndex
+    >>> index = DayIndex()
+    >>> index.index_event(
+    ...     'conference', [datetime(2027, 5, 3, 9, 0)],
+    ...     duration=timedelta(days=2), categories=['Tech'])
+    >>> index.index_event(
+    ...     'party', [datetime(2027, 5, 4, 20, 0)], categories=['Fun'])
+    >>> index.dates(date(2027, 1, 1), date(2027, 12, 31))
+    [datetime.date(2027, 5, 3), datetime.date(2027, 5, 4), datetime.date(2027, 5, 5)]
+    >>> index.dates(date(2027, 1, 1), date(2027, 12, 31),
+    ...             categories=['Tech', 'Fun'], operator='and')
+    [datetime.date(2027, 5, 4)]
+
+    """
+
+    def __init__(self):
+        # uid -> (DayBitmap, categories)
+        self._events = {}
+        # category -> DayBitmap. None is the category of all events.
+        self._categories = {}
+        # Categories, which have to be recalculated after a removal.
+        self._stale = set()
+
+    def __len__(self):
+        return len(self._events)
+
+    def __contains__(self, uid):
+        return uid in self._events
+
+    def index_event(self, uid, occurrences, duration=None, categories=()):
+        """Add or replace the days of an event.
+
+        :param uid: Unique identifier of the event.
+        :param occurrences: Iterable of occurrence start datetimes, e.g. from
+                            recurrence_sequence_ical, or dates.
+        :param duration: Optional duration of the occurrences.
+        :type duration: datetime.timedelta
+        :param categories: Categories or subjects of the event.
+        """
+        self.remove(uid)
+        bitmap = occurrence_days(occurrences, duration)
+        categories = frozenset(categories)
+        self._events[uid] = (bitmap, categories)
+        for category in (None, *categories):
+            if category in self._stale:
+                continue
+            if category in self._categories:
+                self._categories[category] |= bitmap
+            else:
+                self._categories[category] = bitmap.copy()
+
+    def remove(self, uid):
+        """Remove the days of an event, if it is indexed."""
+        entry = self._events.pop(uid, None)
+        if entry is None:
+            return
+        self._stale.update((None, *entry[1]))
+
+    def bitmap(self, category=None):
+        """Return the days with events of a category.
+
+        :param category: Category or None for all events.
+        :rtype: DayBitmap
+        """
+        return self._bitmap(category).copy()
+
+    def _bitmap(self, category):
+        if category in self._stale:
+            bitmap = DayBitmap()
+            for days, categories in self._events.values():
+                if category is None or category in categories:
+                    bitmap |= days
+            self._categories[category] = bitmap
+            self._stale.discard(category)
+        return self._categories.get(category) or DayBitmap()
+
+    def union(self, categories):
+        """Return the days with events of any of the categories."""
+        result = DayBitmap()
+        for category in categories:
+            result |= self._bitmap(category)
+        return result
+
+    def intersection(self, categories):
+        """Return the days with events of each of the categories."""
+        categories = list(categories)
+        if not categories:
+            return self.bitmap()
+        result = self._bitmap(categories[0]).copy()
+        for category in categories[1:]:
+            result = result & self._bitmap(category)
+        return result
+
+    def dates(self, first, last, categories=None, operator="or"):
+        """Return the sorted dates with events from first to last, inclusive.
+
+        :param categories: Optional categories to filter by.
+        :param operator: "or" for days with events of any of the categories,
+                         "and" for days with events of each of them.
+        :rtype: list
+        """
+        if categories is None:
+            bitmap = self._bitmap(None)
+        elif operator == "and":
+            bitmap = self.intersection(categories)
+        else:
+            bitmap = self.union(categories)
+        return bitmap.dates(first, last)
@@ -0,0 +1,160 @@
+"""Free/busy calculation over the occurrences of many events.
+
+The occurrence sequences of all sources are merged lazily with a heap. Per
+source, only the occurrences of about one day are kept in memory, regardless
+of the number of occurrences within the queried window.
+
+"""
+
+from plone.event.ical import fold
+from plone.event.recurrence import recurrence_sequence_ical
+from plone.event.recurrence import utc_sorted
+from plone.event.utils import pydt
+from plone.event.utils import utc
+
+import heapq
+import itertools
+
+
+def _periods(source, from_, until, limits):
+    """Generate the UTC (start, end) periods of the occurrences of a source,
+    which overlap the window, sorted by start.
+    """
+    start, recrule, duration = source
+    if not duration:
+        return
+    # Without until, the sequence is generated lazily from from_ on.
+    occurrences = recurrence_sequence_ical(
+        start, recrule=recrule, from_=from_, duration=duration, limits=limits
+    )
+    for occurrence, _ in utc_sorted(occurrences):
+        if occurrence >= until:
+            break
+        end = occurrence + duration
+        if end > from_:
+            yield occurrence, end
+
+
+def busy_periods(sources, from_, until, limits=None):
+    """Generate the coalesced busy periods of many events within a window.
+
+    Overlapping and adjacent occurrences are merged into one period. Periods
+    are clipped to the window.
+
+    :param sources: Iterable of (start, recrule, duration) tuples, as passed
+                    to recurrence_sequence_ical. Sources without duration
+                    don't block any time.
+    :type sources: iterable
+
+    :param from_: Start of the window.
+    :type from_: datetime.datetime
+
+    :param until: End of the window.
+    :type until: datetime.datetime
+
+    :param limits: Optional limits per source, as for
+                   recurrence_sequence_ical.
+    :type limits: IRecurrenceLimits
+
+    :returns: Generator of (start, end) tuples of UTC datetimes.
+    :rtype: generator
+
+    >>> from datetime import datetime, timedelta
+    >>> from plone.event.freebusy import busy_periods
+    >>> sources = [
+    ...     (datetime(2013, 6, 3, 9, 0), 'RRULE:FREQ=DAILY',
+    ...      timedelta(hours=1)),
+    ...     (datetime(2013, 6, 4, 9, 30), None, timedelta(hours=1)),
+    ... ]
+    >>> for start, end in busy_periods(
+    ...         sources, datetime(2013, 6, 4), datetime(2013, 6, 5, 9, 30)):
+    ...     print(start, end)
+    2013-06-04 09:00:00+00:00 2013-06-04 10:30:00+00:00
+    2013-06-05 09:00:00+00:00 2013-06-05 09:30:00+00:00
+
+    """
+    from_ = utc(pydt(from_))
+    until = utc(pydt(until))
+    merged = heapq.merge(
+        *(_periods(source, from_, until, limits) for source in sources)
+    )
+    current = next(merged, None)
+    if current is None:
+        return
+    start, end = current
+    for next_start, next_end in merged:
+        if next_start > end:
+            yield max(start, from_), min(end, until)
+            start, end = next_start, next_end
+        elif next_end > end:
+            end = next_end
+    yield max(start, from_), min(end, until)
+
+
+def free_periods(sources, from_, until, limits=None):
+    """Generate the free periods within a window, the gaps between the busy
+    periods of busy_periods.
+
+    :returns: Generator of (start, end) tuples of UTC datetimes.
+    :rtype: generator
+    """
+    from_ = utc(pydt(from_))
+    until = utc(pydt(until))
+    free = from_
+    for start, end in busy_periods(sources, from_, until, limits):
+        if start > free:
+            yield free, start
+        free = end
+    if free < until:
+        yield free, until
+
+
+def freebusy_lines(periods, fbtype=None, per_line=None):
+    """Format periods as RFC5545 FREEBUSY content lines.
+
+    :param periods: Iterable of (start, end) tuples of timezone aware
+                    datetimes, e.g. from busy_periods.
+    :type periods: iterable
+
+    :param fbtype: Optional free/busy type, like BUSY or BUSY-TENTATIVE.
+    :type fbtype: string
+
+    :param per_line: Optional maximum number of periods per FREEBUSY
+                     property. By default, all periods are in one property.
+    :type per_line: integer
+
+    :returns: Generator of folded content lines, without line breaks at the
+              end.
+    :rtype: generator
+
+    >>> from datetime import datetime
+    >>> from plone.event.freebusy import freebusy_lines
+    >>> import pytz
+    >>> periods = [
+    ...     (datetime(1997, 3, 8, 16, 0, tzinfo=pytz.utc),
+    ...      datetime(1997, 3, 8, 16, 30, tzinfo=pytz.utc)),
+    ...     (datetime(1997, 3, 8, 18, 0, tzinfo=pytz.utc),
+    ...      datetime(1997, 3, 8, 20, 0, tzinfo=pytz.utc)),
+    ... ]
+    >>> for line in freebusy_lines(periods, fbtype='BUSY'):
+    ...     print(line.replace('\\r\\n', '\\n'))
+    FREEBUSY;FBTYPE=BUSY:19970308T160000Z/19970308T163000Z,19970308T180000Z/199
+     70308T200000Z
+
+    """
+    name = "FREEBUSY"
+    if fbtype:
+        name = f"{name};FBTYPE={fbtype}"
+    periods = iter(periods)
+    while True:
+        chunk = list(itertools.islice(periods, per_line))
+        if not chunk:
+            return
+        values = ",".join(
+            f"{utc(start):%Y%m%dT%H%M%SZ}/{utc(end):%Y%m%dT%H%M%SZ}"
+            for start, end in chunk
+        )
+        # Without the trailing line break of fold.
+        yield fold(f"{name}:{values}")[:-2].decode("utf-8")
+        if per_line is None:
+            return
@@ -0,0 +1,1104 @@
+"""Streaming RFC5545 export and import of events.
+
+The calendar is generated as a sequence of bytes chunks. Events are adapted
+to IEventAccessor and serialized one at a time, so the memory footprint of an
+export doesn't depend on the number of events and the first chunk is
+available before all events are read.
+
+Date-times of events in a named timezone of either timezone backend are
+written as local times with a TZID. The VTIMEZONE component of a timezone is
+written before the first event using it, RFC5545 doesn't require a specific
+order of the components of a calendar. Date-times in UTC or an unnamed fixed
+offset are written in UTC.
+
+Imports work the same way: the calendar is read line by line and converted
+into one VEventRecord per VEVENT component.
+
+"""
+
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from datetime import tzinfo
+from dateutil import rrule
+from plone.event.cache import LRUCache
+from plone.event.interfaces import IEventAccessor
+from plone.event.interfaces import IVEvent
+from plone.event.tzbackend import backend_for
+from plone.event.tztable import get_zone_table
+from plone.event.utils import default_timezone
+from plone.event.utils import get_timezone
+from plone.event.utils import logger
+from plone.event.utils import pydt
+from plone.event.utils import utctz
+from plone.event.utils import warn_throttled
+from pytz.tzinfo import BaseTzInfo
+from pytz.tzinfo import DstTzInfo
+from zope.interface import implementer
+
+import itertools
+import pytz
+import re
+
+PRODID = "-//Plone.org//NONSGML plone.event//EN"
+VERSION = "2.0"
+
+# Minimum size of the chunks in bytes.
+CHUNK_SIZE = 64 * 1024
+
+# Timezone transitions before this year are not written to VTIMEZONE
+# components.
+TRANSITIONS_SINCE = 1970
+
+# Transitions of timezones other than pytz ones, which have no transition
+# table, are searched up to this year, like pytz tables end with 2037.
+TRANSITIONS_UNTIL = 2038
+
+_ESCAPE = str.maketrans({"\\": "\\\\", ";": "\\;", ",": "\\,", "\n": "\\n"})
+
+
+def escape(value):
+    """Escape a TEXT property value.
+
+    >>> from plone.event.ical import escape
+    >>> print(escape('Rock, Paper; Scissors\\nLizard'))
+    Rock\\, Paper\\; Scissors\\nLizard
+
+    """
+    return str(value).replace("\r\n", "\n").translate(_ESCAPE)
+
+
+def fold(line):
+    """Encode a content line as UTF-8 and fold it into lines of at most 75
+    octets, without splitting multi-octet characters. The result ends with a
+    line break.
+
+    :rtype: bytes
+
+    >>> from plone.event.ical import fold
+    >>> [len(it) for it in fold('SUMMARY:' + 'x' * 70).split(b'\\r\\n')]
+    [75, 4, 0]
+    >>> [len(it) for it in fold('SUMMARY:' + '\\xe4' * 40).split(b'\\r\\n')]
+    [74, 15, 0]
+
+    """
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return data + b"\r\n"
+    chunks = []
+    start, size = 0, 75
+    while len(data) - start > size:
+        end = start + size
+        # Don't start the next line with an UTF-8 continuation octet.
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        chunks.append(data[start:end])
+        start, size = end, 74
+    chunks.append(data[start:])
+    return b"\r\n ".join(chunks) + b"\r\n"
+
+
+def format_datetime(dt):
+    """Format a datetime as RFC5545 DATE-TIME value without timezone
+    designator. Faster than strftime.
+
+    >>> from datetime import datetime
+    >>> from plone.event.ical import format_datetime
+    >>> format_datetime(datetime(2013, 6, 3, 9, 5, 7))
+    '20130603T090507'
+
+    """
+    return "%04d%02d%02dT%02d%02d%02d" % (
+        dt.year,
+        dt.month,
+        dt.day,
+        dt.hour,
+        dt.minute,
+        dt.second,
+    )
+
+
+def format_date(value):
+    """Format a date as RFC5545 DATE value."""
+    return "%04d%02d%02d" % (value.year, value.month, value.day)
+
+
+def format_utc(dt):
+    """Format a timezone aware datetime as RFC5545 UTC DATE-TIME value."""
+    offset = dt.utcoffset()
+    if offset:
+        dt = dt.replace(tzinfo=None) - offset
+    return format_datetime(dt) + "Z"
+
+
+def _offset(delta):
+    """Format a UTC offset as RFC5545 UTC-OFFSET value."""
+    seconds = delta.days * 86400 + delta.seconds
+    sign = "-" if seconds < 0 else "+"
+    minutes, second = divmod(abs(seconds), 60)
+    hour, minute = divmod(minutes, 60)
+    if second:
+        return "%s%02d%02d%02d" % (sign, hour, minute, second)
+    return "%s%02d%02d" % (sign, hour, minute)
+
+
+def _table_transitions(tz, since):
+    """Return the transitions of a pytz timezone from its transition table."""
+    if not isinstance(tz, DstTzInfo):
+        offset = tz.utcoffset(None)
+        return [(datetime(1970, 1, 1), offset, offset, False, tz.tzname(None))]
+    trans = tz._utc_transition_times
+    infos = tz._transition_info
+    first = max(bisect_right(trans, datetime(since, 1, 1)) - 1, 1)
+    return [
+        (trans[pos] + infos[pos - 1][0], infos[pos - 1][0]) + infos[pos]
+        for pos in range(first, len(trans))
+    ]
+
+
+# Searched transitions per timezone and year.
+_transitions_cache = LRUCache(maxsize=64)
+
+
+def _scanned_transitions(tz, since):
+    """Return the transitions of any other timezone, found by comparing its
+    UTC offset, DST offset and name day by day and bisecting the changes to
+    the second.
+    """
+
+    def info(naive):
+        local = naive.replace(tzinfo=timezone.utc).astimezone(tz)
+        return local.utcoffset(), local.dst() or timedelta(0), local.tzname()
+
+    day = timedelta(days=1)
+    start = datetime(since, 1, 1)
+    current = datetime(since - 1, 1, 1)
+    state = info(current)
+    transitions = []
+    while current.year < TRANSITIONS_UNTIL:
+        following = current + day
+        if info(following) == state:
+            current = following
+            continue
+        low, high = 0, 86400
+        while high - low > 1:
+            middle = (low + high) // 2
+            if info(current + timedelta(seconds=middle)) == state:
+                low = middle
+            else:
+                high = middle
+        current += timedelta(seconds=high)
+        after = info(current)
+        transitions.append((current, state[0], after[0], after[1], after[2]))
+        state = after
+    # Like for pytz, the transition in effect at the start of since is
+    # included. Without one within the year before, the state at the start
+    # of since is written as transition without change.
+    first = bisect_right([it[0] for it in transitions], start) - 1
+    if first < 0:
+        offset, dst, name = info(start)
+        transitions.insert(0, (start - offset, offset, offset, dst, name))
+        first = 0
+    return [
+        (utc + offset, offset, after, dst, name)
+        for utc, offset, after, dst, name in transitions[first:]
+    ]
+
+
+def vtimezone_lines(tz, since=TRANSITIONS_SINCE):
+    """Return the content lines of the VTIMEZONE component of a named
+    timezone, with one STANDARD or DAYLIGHT sub-component per transition.
+
+    The transitions of pytz timezones are read from their transition table,
+    the ones of other timezones, like zoneinfo timezones, are searched until
+    TRANSITIONS_UNTIL.
+
+    :param tz: pytz, zoneinfo or other PEP 495 timezone with a name.
+    :param since: Year of the first transition to include. The transition
+                  in effect at the start of this year is included, too.
+    :type since: integer
+    :rtype: list
+
+    >>> from plone.event.ical import vtimezone_lines
+    >>> import pytz
+    >>> lines = vtimezone_lines(pytz.timezone('Europe/Vienna'), since=2013)
+    >>> print('\\n'.join(lines[:8]))
+    BEGIN:VTIMEZONE
+    TZID:Europe/Vienna
+    BEGIN:STANDARD
+    DTSTART:20121028T030000
+    TZOFFSETFROM:+0200
+    TZOFFSETTO:+0100
+    TZNAME:CET
+    END:STANDARD
+
+    """
+    if isinstance(tz, BaseTzInfo):
+        transitions = _table_transitions(tz, since)
+    else:
+        transitions = _transitions_cache.get_or_create(
+            (tz, since), lambda: _scanned_transitions(tz, since)
+        )
+    lines = ["BEGIN:VTIMEZONE", f"TZID:{zone_name(tz)}"]
+    for start, before, after, dst, name in transitions:
+        kind = "DAYLIGHT" if dst else "STANDARD"
+        lines += [
+            f"BEGIN:{kind}",
+            f"DTSTART:{format_datetime(start)}",
+            f"TZOFFSETFROM:{_offset(before)}",
+            f"TZOFFSETTO:{_offset(after)}",
+            f"TZNAME:{name}",
+            f"END:{kind}",
+        ]
+    lines.append("END:VTIMEZONE")
+    return lines
+
+
+def zone_name(tz):
+    """Return the TZID, which local times of a timezone are written with, or
+    None for UTC and unnamed fixed offsets, which are written in UTC.
+
+    >>> from plone.event.ical import zone_name
+    >>> import pytz, zoneinfo
+    >>> zone_name(zoneinfo.ZoneInfo('Europe/Vienna'))
+    'Europe/Vienna'
+    >>> zone_name(pytz.utc) is None
+    True
+
+    """
+    if tz is None:
+        return None
+    name = backend_for(tz).zone(tz)
+    if name in (None, "UTC"):
+        return None
+    return name
+
+
+def _dates(event):
+    """Return the DTSTART and DTEND properties of an event and the timezone
+    of their TZID, if any.
+    """
+    start = pydt(event.start)
+    end = getattr(event, "end", None)
+    end = pydt(end) if end is not None else None
+    if getattr(event, "whole_day", False):
+        lines = [f"DTSTART;VALUE=DATE:{format_date(start)}"]
+        if end is not None:
+            # DTEND is exclusive.
+            end = end.astimezone(start.tzinfo).date() + timedelta(days=1)
+            lines.append(f"DTEND;VALUE=DATE:{format_date(end)}")
+        return lines, None
+    if getattr(event, "open_end", False):
+        end = None
+    tz = start.tzinfo
+    name = zone_name(tz)
+    if name is None:
+        lines = [f"DTSTART:{format_utc(start)}"]
+        if end is not None:
+            lines.append(f"DTEND:{format_utc(end)}")
+        return lines, None
+    lines = [f"DTSTART;TZID={name}:{format_datetime(start)}"]
+    if end is not None:
+        if zone_name(end.tzinfo) != name:
+            end = end.astimezone(tz)
+        lines.append(f"DTEND;TZID={name}:{format_datetime(end)}")
+    return lines, tz
+
+
+def event_lines(event, stamp):
+    """Return the content lines of the VEVENT component of an event and the
+    timezone its date-times refer to, if any.
+
+    :param event: IEventAccessor object.
+    :param stamp: DTSTAMP of the event, a timezone aware datetime.
+    :returns: List of unfolded content lines and a timezone or None.
+    :rtype: tuple
+    """
+
+    def get(name):
+        return getattr(event, name, None)
+
+    lines = ["BEGIN:VEVENT", f"DTSTAMP:{format_utc(stamp)}"]
+    uid = get("uid")
+    if uid:
+        lines.append(f"UID:{uid}")
+    for name, attr in (("CREATED", "created"), ("LAST-MODIFIED", "last_modified")):
+        value = get(attr)
+        if value:
+            lines.append(f"{name}:{format_utc(pydt(value))}")
+    dates, tz = _dates(event)
+    lines += dates
+    recurrence = get("recurrence")
+    if recurrence:
+        for line in recurrence.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if ":" not in line:
+                line = f"RRULE:{line}"
+            lines.append(line)
+    for name, attr in (
+        ("SUMMARY", "title"),
+        ("DESCRIPTION", "description"),
+        ("LOCATION", "location"),
+    ):
+        value = get(attr)
+        if value:
+            lines.append(f"{name}:{escape(value)}")
+    url = get("url") or get("event_url")
+    if url:
+        lines.append(f"URL:{url}")
+    subjects = get("subjects")
+    if subjects:
+        lines.append("CATEGORIES:" + ",".join(escape(it) for it in subjects))
+    contact = [
+        it
+        for it in (get("contact_name"), get("contact_email"), get("contact_phone"))
+        if it
+    ]
+    if contact:
+        lines.append("CONTACT:" + escape(", ".join(contact)))
+    for attendee in get("attendees") or ():
+        # CAL-ADDRESS values are URIs, not TEXT.
+        lines.append(f"ATTENDEE:{attendee}")
+    lines.append("END:VEVENT")
+    return lines, tz
+
+
+def ical_chunks(events, calendar=None, stamp=None, chunk_size=CHUNK_SIZE):
+    """Generate an RFC5545 calendar of events as bytes chunks.
+
+    :param events: Iterable of events, which are adapted to IEventAccessor,
+                   e.g. a generator over catalog results. If None, the items
+                   of the calendar are exported.
+    :type events: iterable
+
+    :param calendar: Optional ICalendarAccessor, whose title, description,
+                     uid and timezone are written as calendar properties.
+
+    :param stamp: Optional DTSTAMP of the events. Defaults to now.
+    :type stamp: datetime.datetime
+
+    :param chunk_size: Minimum size of the chunks in bytes, except for the
+                       last one.
+    :type chunk_size: integer
+
+    :returns: Generator of UTF-8 encoded chunks with folded content lines.
+    :rtype: generator
+
+    >>> from datetime import datetime
+    >>> from plone.event.ical import ical_chunks
+    >>> from plone.event.interfaces import IEventAccessor
+    >>> from zope.interface import implementer
+    >>> import pytz
+    >>> @implementer(IEventAccessor)
+    ... class Event:
+    ...     uid = 'a1'
+    ...     title = 'Meeting'
+    ...     start = datetime(2013, 6, 3, 9, 0, tzinfo=pytz.utc)
+    ...     end = datetime(2013, 6, 3, 10, 0, tzinfo=pytz.utc)
+    >>> stamp = datetime(2013, 6, 1, tzinfo=pytz.utc)
+    >>> data = b''.join(ical_chunks([Event()], stamp=stamp))
+    >>> print(data.decode('utf-8').replace('\\r\\n', '\\n'))
+    BEGIN:VCALENDAR
+    VERSION:2.0
+    PRODID:-//Plone.org//NONSGML plone.event//EN
+    BEGIN:VEVENT
+    DTSTAMP:20130601T000000Z
+    UID:a1
+    DTSTART:20130603T090000Z
+    DTEND:20130603T100000Z
+    SUMMARY:Meeting
+    END:VEVENT
+    END:VCALENDAR
+    <BLANKLINE>
+
+    """
+    if stamp is None:
+        stamp = datetime.now(pytz.utc)
+    if events is None:
+        events = calendar.items()
+    lines = ["BEGIN:VCALENDAR", f"VERSION:{VERSION}", f"PRODID:{PRODID}"]
+    zones = set()
+    if calendar is not None:
+        for name, attr in (
+            ("X-WR-CALNAME", "title"),
+            ("X-WR-CALDESC", "description"),
+            ("X-WR-RELCALID", "uid"),
+            ("X-WR-TIMEZONE", "timezone"),
+        ):
+            value = getattr(calendar, attr, None)
+            if value:
+                lines.append(f"{name}:{escape(value)}")
+        tz = get_timezone(calendar.timezone or "")
+        if zone_name(tz) is not None:
+            lines += vtimezone_lines(tz)
+            zones.add(zone_name(tz))
+
+    parts = [fold(line) for line in lines]
+    size = sum(len(it) for it in parts)
+    for event in events:
+        if not IEventAccessor.providedBy(event):
+            event = IEventAccessor(event)
+        lines, tz = event_lines(event, stamp)
+        if tz is not None:
+            name = zone_name(tz)
+            if name not in zones:
+                lines = vtimezone_lines(tz) + lines
+                zones.add(name)
+        for line in lines:
+            data = fold(line)
+            parts.append(data)
+            size += len(data)
+        if size >= chunk_size:
+            yield b"".join(parts)
+            parts, size = [], 0
+    parts.append(fold("END:VCALENDAR"))
+    yield b"".join(parts)
+
+
+# Properties of a VEVENT: name -> (IVEvent attribute, converter, may occur
+# more than once).
+_TEXT, _RAW, _DATETIME, _DATETIMES, _LIST, _INT, _DURATION, _GEO = range(8)
+PROPERTIES = {
+    "DTSTART": ("dtstart", _DATETIME, False),
+    "DTEND": ("dtend", _DATETIME, False),
+    "DURATION": ("duration", _DURATION, False),
+    "RRULE": ("rrule", _RAW, False),
+    "DESCRIPTION": ("description", _TEXT, False),
+    "LOCATION": ("location", _TEXT, False),
+    "SUMMARY": ("summary", _TEXT, False),
+    "URL": ("url", _RAW, False),
+    "ATTENDEE": ("attendee", _RAW, True),
+    "CATEGORIES": ("categories", _LIST, True),
+    "CONTACT": ("contact", _TEXT, True),
+    "EXDATE": ("exdate", _DATETIMES, True),
+    "RDATE": ("rdate", _DATETIMES, True),
+    "DTSTAMP": ("dtstamp", _DATETIME, False),
+    "UID": ("uid", _TEXT, False),
+    "CLASS": ("klass", _RAW, False),
+    "CREATED": ("created", _DATETIME, False),
+    "GEO": ("geo", _GEO, False),
+    "LAST-MODIFIED": ("last_mod", _DATETIME, False),
+    "ORGANIZER": ("organizer", _RAW, False),
+    "PRIORITY": ("priority", _INT, False),
+    "SEQUENCE": ("seq", _INT, False),
+    "STATUS": ("status", _RAW, False),
+    "TRANSP": ("transp", _RAW, False),
+    "RECURRENCE-ID": ("recurid", _DATETIME, False),
+    "ATTACH": ("attach", _RAW, True),
+    "COMMENT": ("comment", _TEXT, True),
+    "REQUEST-STATUS": ("rstatus", _RAW, True),
+    "RELATED-TO": ("related", _RAW, True),
+    "RESOURCES": ("resources", _LIST, True),
+}
+
+_UNESCAPE = re.compile(r"\\([\;,nN])")
+_UNESCAPED = {"\\": "\\", ";": ";", ",": ",", "n": "\n", "N": "\n"}
+_LIST_SEPARATOR = re.compile(r"(?<!\\),")
+_DURATION_VALUE = re.compile(
+    r"([-+])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+
+
+@implementer(IVEvent)
+class VEventRecord:
+    """Properties of a VEVENT component, with the attribute names of IVEvent.
+
+    Properties, which may occur more than once, are lists. Other properties,
+    which are not set, are None. Unknown properties are in x_prop for
+    extension properties and iana_prop otherwise, keyed on their name.
+
+    DATE values are converted to datetimes at midnight, like for
+    IEventAccessor, whole_day is True if DTSTART is a DATE value.
+    """
+
+    __slots__ = tuple(attr for attr, _, _ in PROPERTIES.values()) + (
+        "whole_day",
+        "x_prop",
+        "iana_prop",
+    )
+
+    def __init__(self):
+        for attr, _, multi in PROPERTIES.values():
+            setattr(self, attr, [] if multi else None)
+        self.whole_day = False
+        self.x_prop = {}
+        self.iana_prop = {}
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"<VEventRecord {self.uid!r}>"
+
+
+def unescape(value):
+    """Unescape a TEXT property value."""
+    if "\\" not in value:
+        return value
+    return _UNESCAPE.sub(lambda match: _UNESCAPED[match.group(1)], value)
+
+
+def parse_duration(value):
+    """Return the timedelta of an RFC5545 DURATION value.
+
+    >>> from datetime import timedelta
+    >>> from plone.event.ical import parse_duration
+    >>> parse_duration('P1DT2H30M')
+    datetime.timedelta(days=1, seconds=9000)
+    >>> parse_duration('-PT15M') == -timedelta(minutes=15)
+    True
+
+    """
+    match = _DURATION_VALUE.match(value.strip())
+    if match is None:
+        raise ValueError(f"Invalid duration {value!r}.")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    delta = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+    return -delta if sign == "-" else delta
+
+
+_OFFSET_VALUE = re.compile(r"([+-])(\d\d)(\d\d)(\d\d)?\Z")
+_UNTIL_UTC = re.compile(r"UNTIL=(\d{8}T\d{6})Z", re.IGNORECASE)
+_DATETIME_VALUE = re.compile(r"\d{8}(T\d{6}Z?)?\Z")
+
+
+def _naive(value):
+    """Return the timezone naive datetime of a stripped DATE or DATE-TIME
+    value, ignoring a UTC designator.
+    """
+    if not _DATETIME_VALUE.match(value):
+        raise ValueError(f"Invalid DATE or DATE-TIME value: {value!r}")
+    if len(value) == 8:
+        return datetime(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    return datetime(
+        int(value[:4]),
+        int(value[4:6]),
+        int(value[6:8]),
+        int(value[9:11]),
+        int(value[11:13]),
+        int(value[13:15]),
+    )
+
+
+def parse_datetime(value, params=None, zones=None):
+    """Return the timezone aware datetime of an RFC5545 DATE or DATE-TIME
+    value, converted with pydt.
+
+    UTC values are in UTC, values with a TZID parameter, which is a valid
+    timezone identifier or a key of zones, in this timezone. Floating values
+    and dates are localized in the default timezone of the server, see
+    default_timezone, values with an unknown TZID, too, with a warning.
+
+    :param zones: Optional timezones of VTIMEZONE components, keyed on their
+                  TZID.
+    :type zones: dict
+
+    :raises: ValueError, if the value isn't a valid DATE or DATE-TIME.
+
+    >>> from plone.event.ical import parse_datetime
+    >>> parse_datetime('20130603T090000', {'TZID': 'Europe/Vienna'})
+    datetime.datetime(2013, 6, 3, 9, 0, tzinfo=<DstTzInfo 'Europe/Vienna' CEST+2:00:00 DST>)
+    >>> parse_datetime('20130603T070000Z')
+    datetime.datetime(2013, 6, 3, 7, 0, tzinfo=<UTC>)
+    >>> parse_datetime('2013060')
+    Traceback (most recent call last):
+    ...
+    ValueError: Invalid DATE or DATE-TIME value: '2013060'
+
+    """
+    value = value.strip()
+    # Periods are represented by their start.
+    value = value.partition("/")[0]
+    naive = _naive(value)
+    if value.endswith("Z"):
+        return naive.replace(tzinfo=utctz())
+    tzid = params.get("TZID") if params and len(value) > 8 else None
+    tz = None
+    if tzid:
+        tzid = tzid.strip('"')
+        tz = get_timezone(tzid)
+        if tz is None and zones:
+            tz = zones.get(tzid)
+        if tz is None:
+            warn_throttled(
+                f"Unknown timezone {tzid!r}, localized in the default timezone."
+            )
+    if tz is None:
+        tz = get_timezone(default_timezone())
+    if isinstance(tz, BaseTzInfo):
+        # Same as pydt, without localizing each value with pytz.
+        return get_zone_table(tz).localize(naive)[0]
+    return pydt(naive, missing_zone=tz)
+
+
+def parse_line(line):
+    """Split an unfolded content line into name, parameters and value.
+
+    >>> from plone.event.ical import parse_line
+    >>> parse_line('DTSTART;TZID="Europe/Vienna";VALUE=DATE-TIME:20130603T090000')
+    ('DTSTART', {'TZID': '"Europe/Vienna"', 'VALUE': 'DATE-TIME'}, '20130603T090000')
+
+    """
+    if '"' not in line:
+        head, _, value = line.partition(":")
+        name, *params = head.split(";")
+    else:
+        # Quoted parameter values can contain colons and semicolons.
+        quoted = False
+        parts, start = [], 0
+        for pos, char in enumerate(line):
+            if char == '"':
+                quoted = not quoted
+            elif quoted:
+                continue
+            elif char == ";":
+                parts.append(line[start:pos])
+                start = pos + 1
+            elif char == ":":
+                break
+        else:
+            pos = len(line)
+        parts.append(line[start:pos])
+        value = line[pos + 1 :]
+        name, *params = parts
+    return (
+        name.upper(),
+        {key.upper(): val for key, _, val in (it.partition("=") for it in params)},
+        value,
+    )
+
+
+def _convert_value(kind, value, params, zones):
+    if kind == _TEXT:
+        return unescape(value)
+    if kind == _DATETIME:
+        return parse_datetime(value, params, zones)
+    if kind == _DATETIMES:
+        return [parse_datetime(it, params, zones) for it in value.split(",") if it]
+    if kind == _LIST:
+        return [unescape(it) for it in _LIST_SEPARATOR.split(value) if it]
+    if kind == _INT:
+        return int(value)
+    if kind == _DURATION:
+        return parse_duration(value)
+    if kind == _GEO:
+        lat, _, lon = value.partition(";")
+        return float(lat), float(lon)
+    return value
+
+
+def _is_date(value, params):
+    """Return whether a DATE or DATE-TIME value is a DATE."""
+    if params.get("VALUE", "").upper() == "DATE":
+        return True
+    return len(value.strip()) == 8
+
+
+def convert_event(lines, zones=None):
+    """Convert the unfolded content lines of a VEVENT component, without its
+    BEGIN and END lines, into a VEventRecord.
+
+    :param zones: Optional timezones of VTIMEZONE components, keyed on their
+                  TZID, see parse_datetime.
+    :type zones: dict
+
+    :raises: ValueError, naming the property, the content line and the UID of
+             the event, if a property value is invalid.
+    :rtype: VEventRecord
+    """
+    record = VEventRecord()
+    for line in lines:
+        name, params, value = parse_line(line)
+        spec = PROPERTIES.get(name)
+        if spec is None:
+            props = record.x_prop if name.startswith("X-") else record.iana_prop
+            props[name] = unescape(value)
+            continue
+        attr, kind, multi = spec
+        if attr == "dtstart" and record.dtstart is None:
+            record.whole_day = _is_date(value, params)
+        try:
+            value = _convert_value(kind, value, params, zones)
+        except ValueError as exc:
+            uid = next((it[4:] for it in lines if it[:4].upper() == "UID:"), None)
+            raise ValueError(
+                f"Invalid {name} value of event {uid!r} in line {line!r}: {exc}"
+            ) from exc
+        if not multi:
+            if getattr(record, attr) is None:
+                setattr(record, attr, value)
+        elif kind in (_DATETIMES, _LIST):
+            getattr(record, attr).extend(value)
+        else:
+            getattr(record, attr).append(value)
+    return record
+
+
+def _convert(lines, zones=None):
+    """Return the VEventRecord of an event or the ValueError of its invalid
+    value, which can be sent back from a worker process.
+    """
+    try:
+        return convert_event(lines, zones)
+    except ValueError as exc:
+        return exc
+
+
+def _convert_chunk(chunk, zones=None):
+    return [_convert(lines, zones) for lines in chunk]
+
+
+def _checked(records, skip_invalid):
+    """Generate the records, raising or logging and skipping errors."""
+    for record in records:
+        if isinstance(record, ValueError):
+            if not skip_invalid:
+                raise record
+            logger.warning("Skipped event: %s", record)
+            continue
+        yield record
+
+
+def _lines(stream):
+    """Generate the lines of an iterable of bytes or string chunks."""
+    rest = b""
+    for chunk in stream:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if rest:
+            chunk = rest + chunk
+        lines = chunk.split(b"\n")
+        rest = lines.pop()
+        yield from lines
+    if rest:
+        yield rest
+
+
+def unfold(stream):
+    """Generate the unfolded content lines of a stream.
+
+    :param stream: Binary file object or iterable of bytes or string chunks,
+                   like lines or the chunks of ical_chunks.
+    :returns: Generator of strings without line breaks.
+    """
+    current = None
+    for raw in _lines(stream):
+        raw = raw.rstrip(b"\r")
+        if raw[:1] in (b" ", b"\t"):
+            if current is not None:
+                current += raw[1:]
+            continue
+        if current:
+            yield current.decode("utf-8", "replace")
+        current = raw
+    if current:
+        yield current.decode("utf-8", "replace")
+
+
+class VTimezone(tzinfo):
+    """Timezone of a VTIMEZONE component, whose TZID isn't a valid timezone
+    identifier.
+
+    Like zoneinfo timezones, it supports PEP 495, so it is handled by the
+    zoneinfo timezone backend. Its key is the TZID.
+    """
+
+    def __init__(self, key, transitions):
+        """
+        :param key: TZID of the component.
+        :param transitions: List of (wall time, UTC offset before, UTC offset
+                            after, DST offset, name) tuples, as in the
+                            STANDARD and DAYLIGHT sub-components, sorted by
+                            their UTC time.
+        """
+        self.key = key
+        self._transitions = transitions
+        self._utc = [start - before for start, before, _, _, _ in transitions]
+        # Wall times from which on a transition applies, for fold 0 and 1.
+        self._walls = (
+            [utc + max(it[1], it[2]) for utc, it in zip(self._utc, transitions)],
+            [utc + min(it[1], it[2]) for utc, it in zip(self._utc, transitions)],
+        )
+        self._infos = [(after, dst, name) for _, _, after, dst, name in transitions]
+        if transitions:
+            first = transitions[0]
+            self._initial = (first[1], timedelta(0), first[4])
+        else:
+            self._initial = (timedelta(0), timedelta(0), key)
+
+    def _info(self, dt):
+        pos = bisect_right(self._walls[dt.fold], dt.replace(tzinfo=None)) - 1
+        return self._infos[pos] if pos >= 0 else self._initial
+
+    def utcoffset(self, dt):
+        if dt is None:
+            return None
+        return self._info(dt)[0]
+
+    def dst(self, dt):
+        if dt is None:
+            return None
+        return self._info(dt)[1]
+
+    def tzname(self, dt):
+        if dt is None:
+            return None
+        return self._info(dt)[2]
+
+    def fromutc(self, dt):
+        naive = dt.replace(tzinfo=None)
+        pos = bisect_right(self._utc, naive) - 1
+        if pos < 0:
+            return (naive + self._initial[0]).replace(tzinfo=self)
+        _, before, after, _, _ = self._transitions[pos]
+        local = naive + after
+        # Wall times repeated after a negative change have fold 1.
+        fold = int(after < before and local < self._utc[pos] + before)
+        return local.replace(tzinfo=self, fold=fold)
+
+    def __reduce__(self):
+        return VTimezone, (self.key, self._transitions)
+
+    def __repr__(self):
+        return f"<VTimezone {self.key!r}>"
+
+
+def _parse_offset(value):
+    """Return the timedelta of an RFC5545 UTC-OFFSET value."""
+    match = _OFFSET_VALUE.match(value.strip())
+    if match is None:
+        raise ValueError(f"Invalid UTC offset {value!r}.")
+    sign, hours, minutes, seconds = match.groups()
+    delta = timedelta(hours=int(hours), minutes=int(minutes), seconds=int(seconds or 0))
+    return -delta if sign == "-" else delta
+
+
+def parse_vtimezone(lines):
+    """Return the timezone of the unfolded content lines of a VTIMEZONE
+    component, without its BEGIN and END lines.
+
+    Recurring transitions are expanded until TRANSITIONS_UNTIL.
+
+    :raises: ValueError, if the component is invalid.
+    :rtype: VTimezone
+
+    >>> from datetime import datetime
+    >>> from plone.event.ical import parse_vtimezone
+    >>> tz = parse_vtimezone([
+    ...     'TZID:W. Europe Standard Time',
+    ...     'BEGIN:STANDARD',
+    ...     'DTSTART:16011028T030000',
+    ...     'RRULE:FREQ=YEARLY;BYDAY=-1SU;BYMONTH=10',
+    ...     'TZOFFSETFROM:+0200',
+    ...     'TZOFFSETTO:+0100',
+    ...     'END:STANDARD',
+    ...     'BEGIN:DAYLIGHT',
+    ...     'DTSTART:16010325T020000',
+    ...     'RRULE:FREQ=YEARLY;BYDAY=-1SU;BYMONTH=3',
+    ...     'TZOFFSETFROM:+0100',
+    ...     'TZOFFSETTO:+0200',
+    ...     'END:DAYLIGHT',
+    ... ])
+    >>> print(datetime(2013, 6, 3, 9, 0, tzinfo=tz).utcoffset())
+    2:00:00
+
+    """
+    tzid = None
+    component = None
+    components = []
+    for line in lines:
+        name, params, value = parse_line(line)
+        if name == "BEGIN":
+            component = {"KIND": value.strip().upper(), "RDATE": []}
+        elif name == "END":
+            if component is not None:
+                components.append(component)
+            component = None
+        elif component is None:
+            if name == "TZID":
+                tzid = value.strip()
+        elif name == "RDATE":
+            component["RDATE"] += [_naive(it.strip()) for it in value.split(",") if it]
+        else:
+            component[name] = value
+    if not tzid:
+        raise ValueError("VTIMEZONE component without TZID.")
+
+    transitions = []
+    until = datetime(TRANSITIONS_UNTIL, 1, 1)
+    for component in components:
+        try:
+            start = _naive(component["DTSTART"].strip())
+            before = _parse_offset(component["TZOFFSETFROM"])
+            after = _parse_offset(component["TZOFFSETTO"])
+        except KeyError as exc:
+            raise ValueError(f"Missing {exc.args[0]} in VTIMEZONE {tzid!r}.") from None
+        dst = after - before if component["KIND"] == "DAYLIGHT" else timedelta(0)
+        name = unescape(component.get("TZNAME", tzid))
+        starts = [start] + component["RDATE"]
+        if "RRULE" in component:
+            # UNTIL is in UTC, while the rule is expanded in wall time.
+            recrule = _UNTIL_UTC.sub(
+                lambda match: "UNTIL="
+                + format_datetime(_naive(match.group(1)) + before),
+                component["RRULE"],
+            )
+            starts += itertools.takewhile(
+                lambda it: it < until, rrule.rrulestr(recrule, dtstart=start)
+            )
+        transitions += [(it, before, after, dst, name) for it in set(starts)]
+    transitions.sort(key=lambda it: it[0] - it[1])
+    return VTimezone(tzid, transitions)
+
+
+def _add_zone(zones, lines):
+    """Add the timezone of a VTIMEZONE component, whose TZID isn't a valid
+    timezone identifier, to zones.
+    """
+    try:
+        tz = parse_vtimezone(lines)
+    except ValueError as exc:
+        warn_throttled(f"Invalid VTIMEZONE component: {exc}")
+        return
+    if get_timezone(tz.key) is None:
+        zones[tz.key] = tz
+
+
+def _components(stream, zones=None):
+    """Generate the content lines of the VEVENT components of a stream.
+    Components nested into a VEVENT, like VALARM, are skipped.
+
+    :param zones: Optional dict, to which the timezones of VTIMEZONE
+                  components with unknown TZID are added while reading.
+    """
+    lines = None
+    timezone = None
+    depth = 0
+    for line in unfold(stream):
+        upper = line[:10].upper()
+        if timezone is not None:
+            if upper.startswith("END:") and line[4:].strip().upper() == "VTIMEZONE":
+                _add_zone(zones, timezone)
+                timezone = None
+            else:
+                timezone.append(line)
+            continue
+        if upper.startswith("BEGIN:"):
+            if lines is not None:
+                depth += 1
+            elif line[6:].strip().upper() == "VEVENT":
+                lines = []
+            elif zones is not None and line[6:].strip().upper() == "VTIMEZONE":
+                timezone = []
+            continue
+        if upper.startswith("END:"):
+            if lines is None:
+                continue
+            if depth:
+                depth -= 1
+                continue
+            yield lines
+            lines = None
+            continue
+        if lines is not None and not depth:
+            lines.append(line)
+
+
+def read_events(stream, workers=1, chunksize=64, executor=None, skip_invalid=False):
+    """Read the VEVENT components of an RFC5545 calendar incrementally.
+
+    The stream is read line by line and each event is generated as soon as
+    its END:VEVENT line is read, so only one event is kept in memory, plus the
+    chunks in flight if a pool is used. Timezones are looked up by their
+    TZID. For TZIDs, which aren't valid timezone identifiers, the VTIMEZONE
+    component with this TZID is used, if it is read before the event.
+
+    :param stream: Binary file object, bytes or iterable of bytes chunks.
+
+    :param workers: Number of worker processes for the conversion of the
+                    property values. With 1 or less, the values are converted
+                    in the calling process.
+    :type workers: integer
+
+    :param chunksize: Number of events sent to a worker at once.
+    :type chunksize: integer
+
+    :param executor: Optional concurrent.futures executor to be used instead
+                     of a new process pool.
+    :type executor: concurrent.futures.Executor
+
+    :param skip_invalid: Log and skip events with invalid property values
+                         instead of raising a ValueError, so one broken event
+                         doesn't abort the import.
+    :type skip_invalid: boolean
+
+    :returns: Generator of VEventRecord objects in the order of the stream.
+    :rtype: generator
+
+    >>> from plone.event.ical import read_events
+    >>> data = b'''BEGIN:VCALENDAR
+    ... BEGIN:VEVENT
+    ... UID:a1
+    ... SUMMARY:Rock\\\\, Paper
+    ... DTSTART;TZID=Europe/Vienna:20130603T090000
+    ... DURATION:PT1H
+    ... RRULE:FREQ=DAILY;COUNT=3
+    ... EXDATE:20130604T070000Z,
+    ...  20130605T070000Z
+    ... END:VEVENT
+    ... END:VCALENDAR
+    ... '''
+    >>> [event] = read_events(data)
+    >>> event.uid, event.summary, event.rrule
+    ('a1', 'Rock, Paper', 'FREQ=DAILY;COUNT=3')
+    >>> event.dtstart
+    datetime.datetime(2013, 6, 3, 9, 0, tzinfo=<DstTzInfo 'Europe/Vienna' CEST+2:00:00 DST>)
+    >>> event.duration
+    datetime.timedelta(seconds=3600)
+    >>> event.exdate
+    [datetime.datetime(2013, 6, 4, 7, 0, tzinfo=<UTC>), datetime.datetime(2013, 6, 5, 7, 0, tzinfo=<UTC>)]
+
+    """
+    if isinstance(stream, (bytes, str)):
+        stream = [stream]
+    zones = {}
+    components = _components(stream, zones)
+
+    if executor is None and workers <= 1:
+        converted = (_convert(lines, zones) for lines in components)
+        yield from _checked(converted, skip_invalid)
+        return
+
+    chunks = iter(lambda: list(itertools.islice(components, chunksize)), [])
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for chunk in itertools.islice(chunks, 2 * max(workers, 1)):
+            pending.append(executor.submit(_convert_chunk, chunk, dict(zones)))
+        while pending:
+            future = pending.popleft()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(executor.submit(_convert_chunk, chunk, dict(zones)))
+            yield from _checked(future.result(), skip_invalid)
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
@@ -0,0 +1,246 @@
+"""Interval index over the occurrences of many events.
+
+Occurrences are stored as closed intervals of dt2int integer representations
+in a centered interval tree. Range and stabbing queries visit one path down
+the tree and collect the matching intervals of each node by binary search, so
+their cost is logarithmic in the number of occurrences plus the number of
+results.
+
+"""
+
+from bisect import bisect_left
+from bisect import bisect_right
+from plone.event.utils import dt2int
+from plone.event.utils import int2naive
+
+import operator
+
+_interval = operator.itemgetter(0, 1)
+_end = operator.itemgetter(1)
+
+# Occurrences added since the last build of the tree are scanned linearly.
+# Rebuild the tree, if more than this number of occurrences were added or
+# removed.
+REBUILD_THRESHOLD = 1024
+
+
+def occurrence_intervals(starts, duration=None):
+    """Return the closed intervals of occurrences.
+
+    :param starts: dt2int integer representations of the occurrence starts,
+                   e.g. from recurrence_int_sequence.
+    :type starts: iterable
+    :param duration: Optional duration of the occurrences.
+    :type duration: datetime.timedelta
+    :returns: List of (start, end) integer tuples.
+    :rtype: list
+
+    >>> from datetime import datetime, timedelta
+    >>> from plone.event.index import occurrence_intervals
+    >>> from plone.event.utils import dt2int
+    >>> start = dt2int(datetime(2011, 12, 31, 23, 0))
+    >>> occurrence_intervals([start]) == [(start, start)]
+    True
+    >>> occurrence_intervals([start], timedelta(hours=2)) == [
+    ...     (start, dt2int(datetime(2012, 1, 1, 1, 0)))]
+    True
+
+    """
+    if not duration:
+        return [(start, start) for start in starts]
+    return [(start, dt2int(int2naive(start) + duration)) for start in starts]
+
+
+def _toint(value):
+    if isinstance(value, int):
+        return value
+    return dt2int(value)
+
+
+def _build(intervals):
+    """Build a centered interval tree from (start, end, uid) tuples sorted by
+    start. A node is a tuple of center, the starts of its intervals and the
+    intervals sorted by start, the ends of its intervals and the intervals
+    sorted by end and the left and right subtree.
+    """
+    if not intervals:
+        return None
+    # The middle interval contains the center, so each node holds at least
+    # one interval and both subtrees hold at most half of them.
+    center = intervals[len(intervals) // 2][0]
+    left, mid, right = [], [], []
+    for interval in intervals:
+        if interval[1] < center:
+            left.append(interval)
+        elif interval[0] > center:
+            right.append(interval)
+        else:
+            mid.append(interval)
+    by_end = sorted(mid, key=_end)
+    return (
+        center,
+        [it[0] for it in mid],
+        mid,
+        [it[1] for it in by_end],
+        by_end,
+        _build(left),
+        _build(right),
+    )
+
+
+class OccurrenceIndex:
+    """Index of the occurrences of many events, to find the events with an
+    occurrence overlapping a timespan or running at an instant.
+
+    Dates can be given as datetimes or dt2int integer representations.
+    Occurrences are closed intervals: an occurrence ending at the start of a
+    queried timespan overlaps it.
+
+    >>> from datetime import datetime, timedelta
+    >>> from plone.event.index import OccurrenceIndex
+    >>> from plone.event.utils import dt2int
+    >>> from plone.event.recurrence import recurrence_int_sequence
+    >>> from plone.event.recurrence import recurrence_sequence_ical
+    >>> index = OccurrenceIndex()
+    >>> index.index_event(
+    ...     'daily',
+    ...     recurrence_int_sequence(recurrence_sequence_ical(
+    ...         datetime(2011, 11, 1, 10, 0),
+    ...         recrule='RRULE:FREQ=DAILY;COUNT=30')),
+    ...     duration=timedelta(hours=1))
+    >>> index.index_event(
+    ...     'once', [dt2int(datetime(2011, 11, 11, 10, 30))],
+    ...     duration=timedelta(hours=2))
+    >>> sorted(index.overlapping(datetime(2011, 11, 11), datetime(2011, 11, 12)))
+    ['daily', 'once']
+    >>> sorted(index.at(datetime(2011, 11, 11, 12, 0)))
+    ['once']
+    >>> index.remove('once')
+    >>> sorted(index.at(datetime(2011, 11, 11, 12, 0)))
+    []
+
+    """
+
+    def __init__(self):
+        # uid -> list of (start, end) intervals
+        self._events = {}
+        self._tree = None
+        # Intervals added and uids removed since the tree was built.
+        self._added = []
+        self._removed = set()
+        self._changed = 0
+
+    def __len__(self):
+        return len(self._events)
+
+    def __contains__(self, uid):
+        return uid in self._events
+
+    def add(self, uid, intervals):
+        """Add or replace the occurrences of an event.
+
+        :param uid: Unique identifier of the event.
+        :param intervals: Iterable of (start, end) tuples of datetimes or
+                          dt2int integer representations.
+        """
+        intervals = [(_toint(start), _toint(end)) for start, end in intervals]
+        self.remove(uid)
+        self._events[uid] = intervals
+        self._added.extend((start, end, uid) for start, end in intervals)
+        self._changed += len(intervals)
+
+    def index_event(self, uid, starts, duration=None):
+        """Add or replace the occurrences of an event.
+
+        :param uid: Unique identifier of the event.
+        :param starts: dt2int integer representations of the occurrence
+                       starts, as generated by recurrence_int_sequence.
+        :param duration: Optional duration of the occurrences.
+        :type duration: datetime.timedelta
+        """
+        self.add(uid, occurrence_intervals(starts, duration))
+
+    def remove(self, uid):
+        """Remove the occurrences of an event, if it is indexed."""
+        intervals = self._events.pop(uid, None)
+        if intervals is None:
+            return
+        self._changed += len(intervals)
+        if any(it[2] == uid for it in self._added):
+            self._added = [it for it in self._added if it[2] != uid]
+        self._removed.add(uid)
+
+    def clear(self):
+        self._events.clear()
+        self._tree = None
+        self._added = []
+        self._removed = set()
+        self._changed = 0
+
+    def overlapping(self, start, end):
+        """Return the uids of the events with an occurrence overlapping the
+        closed timespan from start to end.
+
+        :rtype: set
+        """
+        return {it[2] for it in self.occurrences(start, end)}
+
+    def at(self, instant):
+        """Return the uids of the events with an occurrence running at an
+        instant.
+
+        :rtype: set
+        """
+        return self.overlapping(instant, instant)
+
+    def occurrences(self, start, end):
+        """Return the occurrences overlapping the closed timespan from start to
+        end.
+
+        :returns: List of (start, end, uid) tuples, sorted by start.
+        :rtype: list
+        """
+        start, end = _toint(start), _toint(end)
+        self._update()
+        result = []
+        stack = [self._tree]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, starts, by_start, ends, by_end, left, right = node
+            if end < center:
+                result.extend(by_start[: bisect_right(starts, end)])
+                stack.append(left)
+            elif start > center:
+                result.extend(by_end[bisect_left(ends, start) :])
+                stack.append(right)
+            else:
+                result.extend(by_start)
+                stack.append(left)
+                stack.append(right)
+        if self._removed:
+            result = [it for it in result if it[2] not in self._removed]
+        result.extend(it for it in self._added if it[0] <= end and it[1] >= start)
+        result.sort(key=_interval)
+        return result
+
+    def _update(self):
+        """Rebuild the tree, if too many intervals changed since the last
+        build.
+        """
+        if self._changed <= REBUILD_THRESHOLD:
+            return
+        self._tree = _build(
+            sorted(
+                (
+                    (start, end, uid)
+                    for uid, intervals in self._events.items()
+                    for start, end in intervals
+                ),
+                key=_interval,
+            )
+        )
+        self._added = []
+        self._removed = set()
+        self._changed = 0
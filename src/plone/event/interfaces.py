@@ -95,6 +95,26 @@ class IRecurrenceSupport(Interface):
         """
 
 
+class IRecurrenceLimits(Interface):
+    """Limits for the calculation of recurrence sequences.
+
+    Can be passed to the recurrence functions of plone.event.recurrence or
+    registered as utility.
+
+    """
+
+    max_occurrences = Attribute(
+        "Maximum number of occurrences in a sequence. None for no limit."
+    )
+    max_candidates = Attribute(
+        "Maximum number of dates scanned from the recurrence rule, including "
+        "those outside of the queried timespan. None for no limit."
+    )
+    timeout = Attribute(
+        "Maximum calculation time of a sequence in seconds. None for no limit."
+    )
+
+
 class IICalendar(Interface):
     """Adapter, which is used to construct an icalendar object."""
 
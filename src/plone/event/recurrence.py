@@ -1,16 +1,415 @@
+from array import array
+from bisect import bisect_right
+from dateutil import parser
 from dateutil import rrule
+from plone.event.cache import LRUCache
+from plone.event.interfaces import IRecurrenceLimits
+from plone.event.simplerule import SimpleRule
+from plone.event.simplerule import WEEKDAYS
+from plone.event.tzbackend import backend_for
+from plone.event.tzbackend import localize
+from plone.event.tztable import EPOCH
+from plone.event.tztable import EPOCH_ORDINAL
+from plone.event.tztable import get_zone_table
+from plone.event.tztable import to_seconds
+from plone.event.tztable import utc_microseconds
+from plone.event.utils import DSTADJUST
 from plone.event.utils import DSTAUTO
+from plone.event.utils import DSTKEEP
 from plone.event.utils import dt2int
+from plone.event.utils import MAX32
 from plone.event.utils import pydt
 from plone.event.utils import tzdel
 from plone.event.utils import utc
-from plone.event.utils import utcoffset_normalize
+from plone.event.utils import utctz
+from pytz.tzinfo import BaseTzInfo
+from zope.component import queryUtility
+from zope.interface import implementer
 
+import asyncio
+import collections
 import datetime
+import heapq
+import itertools
 import re
+import sys
+import threading
+import time
 
-# TODO: make me configurable
-MAXCOUNT = 1000  # Maximum number of occurrences
+# Maximum number of occurrences, if no IRecurrenceLimits are given or
+# registered as utility.
+MAXCOUNT = 1000
+
+# Calculate simple daily and weekly rules arithmetically instead of using
+# python-dateutil. Invalidate the ruleset cache after changing this.
+SIMPLE_RULES = True
+
+# Compiled rulesets, keyed on the recurrence rule and the event's start.
+RULESET_CACHE_SIZE = 4096
+ruleset_cache = LRUCache(maxsize=RULESET_CACHE_SIZE)
+
+# End index of the last, unbounded run of a TimedeltaRecurrence.
+MAXINDEX = sys.maxsize
+
+
+@implementer(IRecurrenceLimits)
+class RecurrenceLimits:
+    """Limits for the calculation of a recurrence sequence. None means
+    unlimited.
+
+    Limits can be passed to the recurrence functions per call or registered
+    as IRecurrenceLimits utility, e.g. per site.
+
+    >>> from plone.event.recurrence import RecurrenceLimits
+    >>> RecurrenceLimits(max_occurrences=10, timeout=0.5)
+    <RecurrenceLimits max_occurrences=10 max_candidates=None timeout=0.5>
+
+    """
+
+    def __init__(self, max_occurrences=None, max_candidates=None, timeout=None):
+        self.max_occurrences = max_occurrences
+        self.max_candidates = max_candidates
+        self.timeout = timeout
+
+    def __repr__(self):
+        return (
+            f"<RecurrenceLimits max_occurrences={self.max_occurrences} "
+            f"max_candidates={self.max_candidates} timeout={self.timeout}>"
+        )
+
+
+def get_limits(limits=None):
+    """Return the limits for a recurrence calculation: the given limits, the
+    registered IRecurrenceLimits utility or a maximum of MAXCOUNT occurrences.
+
+    :param limits: Optional limits.
+    :type limits: IRecurrenceLimits
+    :returns: Limits
+    :rtype: IRecurrenceLimits
+
+    """
+    if limits is None:
+        limits = queryUtility(IRecurrenceLimits)
+    if limits is None:
+        limits = RecurrenceLimits(max_occurrences=MAXCOUNT or None)
+    return limits
+
+
+class RecurrenceSequence:
+    """Iterator over a recurrence sequence. After the iteration, the
+    ``truncated`` attribute tells, if the sequence was stopped by one of the
+    limits before its end.
+    """
+
+    truncated = False
+
+    def __init__(self, generator, *args, **kwargs):
+        self._iterator = generator(self, *args, **kwargs)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def close(self):
+        self._iterator.close()
+
+
+def _deadline(limits):
+    if limits.timeout is None:
+        return None
+    return time.monotonic() + limits.timeout
+
+
+def normalize_recrule(start, recrule):
+    """Normalize a RFC2445 recurrence rule for the given timezone naive start
+    date, before it's parsed by python-dateutil.
+
+    :param start: Timezone naive datetime of the event's start.
+    :type start: datetime.datetime
+
+    :param recrule: String with RFC2445 compatible recurrence definition.
+    :type recrule: string
+
+    :returns: The normalized recurrence definition.
+    :rtype: string
+
+    """
+    # The event's start time.
+    t0 = start.time()
+    # The event's start time as RFC8601 string
+    t0str = f"T{t0.hour:02d}{t0.minute:02d}{t0.second:02d}"
+
+    # 1) Remove DTSTART from the recurrence rule
+    # The start date is always included and therefore removed from the
+    # recurrence rule.
+    recrule = re.sub(r"DTSTART:[^;\n]*[;\n]", "", recrule, re.MULTILINE)
+
+    # 2) Set all RDATE (actually any) time definitions to the start date of
+    # the event, except for those explicitly set to 00:00:00 which might
+    # come from recurrence rule widgets which explicitly set it to that
+    # time.
+    if t0str != "T000000":
+        recrule = re.sub(r"T000000", t0str, recrule)
+
+    # 3) Set the UNTIL times to the end of the day to make sure to include
+    # any possible occurrence on that date.
+    recrule = re.sub(
+        r"(UNTIL[^T]*[0-9]{8})T([0-9]{6})(Z?)",
+        r"\1T235959\3",
+        recrule,
+    )
+
+    # 4) Set the EXDATE properties to the same start time as the event's
+    # start time to make sure to really exclude those occurrences.
+    recrule = re.sub(
+        r"EXDATE:([^\n\s]+)",
+        lambda m: re.sub(
+            r"T[0-9]{6}(Z?)",
+            rf"{t0str}\1",
+            m.group(0),
+        ),
+        recrule,
+    )
+    return recrule
+
+
+def _compile_recurrence(start, recrule):
+    if recrule:
+        recrule = normalize_recrule(start, recrule)
+        if SIMPLE_RULES:
+            rset = SimpleRule.from_string(start, recrule)
+            if rset is not None:
+                return rset
+        # RFC2445 string
+        # forceset: always return a rruleset
+        # dtstart: optional used when no dtstart is in RFC2445 string
+        #          dtstart is given as timezone naive time. timezones are
+        #          applied afterwards, since rrulestr doesn't normalize
+        #          timezones over DST boundaries
+        rset = rrule.rrulestr(
+            recrule,
+            dtstart=start,
+            forceset=True,
+            ignoretz=True,
+            # compatible=True # RFC2445 compatibility
+        )
+    else:
+        rset = rrule.rruleset()
+    rset.rdate(start)  # RCF2445: always include start date
+    return rset
+
+
+def compile_recurrence(start, recrule=None):
+    """Return a python-dateutil rruleset for a timezone naive start date and
+    a RFC2445 recurrence rule, which always includes the start date. Simple
+    daily and weekly rules are returned as plone.event.simplerule.SimpleRule
+    instances, which support the same API for iteration and seeking.
+
+    Compiled rulesets for string rules are kept in the ``ruleset_cache`` LRU
+    cache, so that the same rule for the same start date is only parsed once.
+    The returned rruleset is shared and must not be modified.
+
+    :param start: Timezone naive datetime of the event's start.
+    :type start: datetime.datetime
+
+    :param recrule: Optional string with RFC2445 compatible recurrence
+                    definition.
+    :type recrule: string
+
+    :returns: A rruleset or SimpleRule instance.
+    :rtype: dateutil.rrule.rruleset
+
+    """
+    if not recrule or not isinstance(recrule, str):
+        return _compile_recurrence(start, recrule)
+    return ruleset_cache.get_or_create(
+        (recrule, start),
+        lambda: _compile_recurrence(start, recrule),
+    )
+
+
+def invalidate_recurrence_cache(recrule=None):
+    """Remove compiled rulesets from the cache.
+
+    :param recrule: Only remove the rulesets compiled from this recurrence
+                    rule. If not given, the whole cache is cleared.
+    :type recrule: string
+
+    :returns: Number of removed entries.
+    :rtype: integer
+
+    """
+    if recrule is None:
+        return ruleset_cache.invalidate()
+    return ruleset_cache.invalidate(predicate=lambda key: key[0] == recrule)
+
+
+# Frequencies of rules, which seek_recurrence starts at a later period.
+_PERIODIC = ("YEARLY", "MONTHLY", "WEEKLY", "DAILY", "HOURLY", "MINUTELY")
+
+
+def _rule_defaults(start, parts):
+    """Add the rule parts, which python-dateutil derives from the start date,
+    explicitly to the parts of a RRULE.
+    """
+    freq = _PERIODIC.index(parts["FREQ"])
+    days = ("BYWEEKNO", "BYYEARDAY", "BYMONTHDAY", "BYDAY", "BYEASTER")
+    if not any(name in parts for name in days):
+        if parts["FREQ"] == "YEARLY":
+            parts.setdefault("BYMONTH", str(start.month))
+            parts["BYMONTHDAY"] = str(start.day)
+        elif parts["FREQ"] == "MONTHLY":
+            parts["BYMONTHDAY"] = str(start.day)
+        elif parts["FREQ"] == "WEEKLY":
+            parts["BYDAY"] = WEEKDAYS[start.weekday()]
+    for index, name, value in (
+        (4, "BYHOUR", start.hour),
+        (5, "BYMINUTE", start.minute),
+        (6, "BYSECOND", start.second),
+    ):
+        if freq < index:
+            parts.setdefault(name, str(value))
+    return parts
+
+
+def _period_start(start, parts, before):
+    """Return the start of the last period of the rule, which starts at or
+    before the given date, or None if that's not after the start date.
+    """
+    freq = parts["FREQ"]
+    interval = int(parts.get("INTERVAL", 1))
+    if freq == "YEARLY":
+        year = start.year + (before.year - start.year) // interval * interval
+        period = datetime.datetime(year, 1, 1)
+    elif freq == "MONTHLY":
+        months = (before.year - start.year) * 12 + before.month - start.month
+        month = start.year * 12 + start.month - 1 + months // interval * interval
+        period = datetime.datetime(month // 12, month % 12 + 1, 1)
+    elif freq in ("WEEKLY", "DAILY"):
+        day = start.date()
+        length = 1
+        if freq == "WEEKLY":
+            wkst = WEEKDAYS.index(parts.get("WKST", "MO"))
+            day -= datetime.timedelta(days=(day.weekday() - wkst) % 7)
+            length = 7
+        periods = (before.date() - day).days // length // interval * interval
+        day += datetime.timedelta(days=periods * length)
+        period = datetime.datetime.combine(day, datetime.time())
+    else:
+        if freq == "HOURLY":
+            first = start.replace(minute=0, second=0)
+            step = datetime.timedelta(hours=interval)
+        else:
+            first = start.replace(second=0)
+            step = datetime.timedelta(minutes=interval)
+        period = first + (before - first) // step * step
+    return period if period > start else None
+
+
+def _compile_period(start, recrule, before):
+    """Compile a recurrence rule, like compile_recurrence, but starting at
+    the last period of the rule before the given date instead of at the
+    event's start. The result doesn't include the start date.
+
+    Only definitions with a single RRULE without COUNT, optional RDATE and
+    EXDATE lines are supported, since a later start doesn't change their
+    occurrences after it.
+
+    :returns: A rruleset or None, if the rule isn't supported or there's no
+              later period.
+    """
+    if not isinstance(recrule, str):
+        return None
+    lines = normalize_recrule(start, recrule).upper().split()
+    # Lines without a property name are RRULEs, like in rrulestr.
+    names = [
+        line.split(":")[0].split(";")[0] if ":" in line else "RRULE" for line in lines
+    ]
+    if names.count("RRULE") != 1 or not set(names) <= {"RRULE", "RDATE", "EXDATE"}:
+        return None
+    rule = names.index("RRULE")
+    line = lines[rule]
+    if line.startswith("RRULE:"):
+        line = line[6:]
+    parts = dict(pair.partition("=")[::2] for pair in line.split(";"))
+    if "COUNT" in parts or parts.get("FREQ") not in _PERIODIC:
+        return None
+    period = _period_start(start, parts, before)
+    if period is None:
+        return None
+    parts = _rule_defaults(start, parts)
+    lines[rule] = "RRULE:" + ";".join(
+        f"{name}={value}" for name, value in parts.items()
+    )
+    return ruleset_cache.get_or_create(
+        (recrule, start, period),
+        lambda: rrule.rrulestr(
+            "\n".join(lines), dtstart=period, forceset=True, ignoretz=True
+        ),
+    )
+
+
+def seek_recurrence(start, recrule, from_, duration=None):
+    """Return the timezone naive occurrences of a recurrence rule, starting
+    at the first one which ends after from_, without calculating all
+    occurrences since the event's start.
+
+    Simple rules are indexed directly. Other rules with a single RRULE
+    without COUNT start at the last period of the rule before from_, so the
+    cost doesn't grow with the age of the event. Rules with COUNT are
+    calculated from the event's start.
+
+    :param start: datetime or DateTime instance of the event's start, which
+                  defines the timezone.
+    :type start: datetime.datetime
+
+    :param recrule: Optional string with RFC2445 compatible recurrence
+                    definition, dateutil.rrule or dateutil.rruleset instances.
+    :type recrule: string
+
+    :param from_: datetime or DateTime instance of the date, after which the
+                  occurrences end.
+    :type from_: datetime.datetime
+
+    :param duration: Optional timedelta instance of the event's duration.
+    :type duration: datetime.timedelta
+
+    :returns: An iterator over timezone naive datetime instances.
+    :rtype: iterator
+
+    >>> from datetime import datetime
+    >>> from plone.event.recurrence import seek_recurrence
+    >>> import pytz
+    >>> start = pytz.timezone('Europe/Vienna').localize(datetime(2000, 1, 31, 9))
+    >>> dates = seek_recurrence(
+    ...     start, 'RRULE:FREQ=MONTHLY;BYMONTHDAY=-1', datetime(2013, 3, 1, tzinfo=pytz.utc))
+    >>> next(dates), next(dates)
+    (datetime.datetime(2013, 3, 31, 9, 0), datetime.datetime(2013, 4, 30, 9, 0))
+
+    """
+    start = pydt(start, exact=False)
+    from_ = pydt(from_, exact=False)
+    tz = start.tzinfo
+    start = tzdel(start)
+    duration = duration or datetime.timedelta(0)
+    # The UTC offset of an occurrence might differ from the one at from_, so
+    # start searching a day earlier.
+    naive_from = tzdel(from_.astimezone(tz)) - duration - datetime.timedelta(days=1)
+    rset = compile_recurrence(start, recrule)
+    if not isinstance(rset, SimpleRule):
+        rset = _compile_period(start, recrule, naive_from) or rset
+    table = get_zone_table(tz)
+    bound = utc_microseconds(from_) - _microseconds(duration)
+    return itertools.dropwhile(
+        lambda date: table.utc(date) < bound,
+        rset.xafter(naive_from, inc=True),
+    )
+
+
+def _microseconds(delta):
+    return (delta.days * 86400 + delta.seconds) * 10**6 + delta.microseconds
 
 
 def recurrence_sequence_ical(
@@ -20,6 +419,7 @@ def recurrence_sequence_ical(
     until=None,
     count=None,
     duration=None,
+    limits=None,
 ):
     """Calculates a sequence of datetime objects from a recurrence rule
     following the RFC2445 specification, using python-dateutil recurrence
@@ -35,16 +435,19 @@ def recurrence_sequence_ical(
     :type recrule: string
 
     :param from_:   Optional datetime or DateTime instance of the date, to
-                    limit the result within a timespan.
+                    limit the result within a timespan. The sequence starts
+                    at the first occurrence ending after from_ and limits
+                    are applied from there on. Without until, count is
+                    counted from the event's start.
     :type from_: datetime.datetime
 
     :param until:   Optional datetime or DateTime instance of the date, until
                     the recurrence is calculated. If not given, count or
-                    MAXDATE limit the recurrence calculation.
+                    limits limit the recurrence calculation.
     :type until: datetime.datetime
 
     :param count:   Optional integer which defines the number of occurrences.
-                    If not given, until or MAXDATE limits the recurrence
+                    If not given, until or limits limit the recurrence
                     calculation.
     :type count: integer
 
@@ -53,15 +456,49 @@ def recurrence_sequence_ical(
                      queried timerange.
     :type duration:  datetime.timedelta
 
-    :returns: A generator which generates a sequence of datetime instances.
-    :rtype: generator
+    :param limits: Optional limits for the number of occurrences, the number
+                   of scanned candidates and the calculation time. Defaults
+                   to the registered IRecurrenceLimits utility or MAXCOUNT
+                   occurrences.
+    :type limits: IRecurrenceLimits
+
+    :returns: An iterator which generates a sequence of datetime instances.
+    :rtype: RecurrenceSequence
+
+    """
+    return RecurrenceSequence(
+        _recurrence_sequence_ical,
+        start,
+        recrule=recrule,
+        from_=from_,
+        until=until,
+        count=count,
+        duration=duration,
+        limits=limits,
+    )
 
+
+def _recurrence_sequence_ical(
+    result,
+    start,
+    recrule=None,
+    from_=None,
+    until=None,
+    count=None,
+    duration=None,
+    limits=None,
+    aware=True,
+):
+    """Generate the occurrences of recurrence_sequence_ical. If aware is
+    False, generate their UTC times as integer microseconds instead of
+    timezone aware datetimes.
     """
     # Always use python datetime objects and remove the microseconds
     start = pydt(start, exact=False)
     from_ = pydt(from_, exact=False)
     until = pydt(until, exact=False)
     tz = start.tzinfo
+    aware_start = start
     start = tzdel(start)  # tznaive | start defines tz
     _from = tzdel(from_)
     _until = tzdel(until)
@@ -70,89 +507,238 @@ def recurrence_sequence_ical(
     else:
         duration = datetime.timedelta(0)
 
-    if recrule:
-        # The event's start time.
-        t0 = start.time()
-        # The event's start time as RFC8601 string
-        t0str = f"T{t0.hour:02d}{t0.minute:02d}{t0.second:02d}"
-
-        # 1) Remove DTSTART from the recurrence rule
-        # The start date is always included and therefore removed from the
-        # recurrence rule.
-        recrule = re.sub(r"DTSTART:[^;\n]*[;\n]", "", recrule, re.MULTILINE)
-
-        # 2) Set all RDATE (actually any) time definitions to the start date of
-        # the event, except for those explicitly set to 00:00:00 which might
-        # come from recurrence rule widgets which explicitly set it to that
-        # time.
-        if t0str != "T000000":
-            recrule = re.sub(r"T000000", t0str, recrule)
-
-        # 3) Set the UNTIL times to the end of the day to make sure to include
-        # any possible occurrence on that date.
-        recrule = re.sub(
-            r"(UNTIL[^T]*[0-9]{8})T([0-9]{6})(Z?)",
-            r"\1T235959\3",
-            recrule,
-        )
+    limits = get_limits(limits)
+    max_occurrences = limits.max_occurrences
+    max_candidates = limits.max_candidates
+    deadline = _deadline(limits)
 
-        # 4) Set the EXDATE properties to the same start time as the event's
-        # start time to make sure to really exclude those occurrences.
-        recrule = re.sub(
-            r"EXDATE:([^\n\s]+)",
-            lambda m: re.sub(
-                r"T[0-9]{6}(Z?)",
-                rf"{t0str}\1",
-                m.group(0),
-            ),
-            recrule,
-        )
+    rset = compile_recurrence(start, recrule)
 
-        # RFC2445 string
-        # forceset: always return a rruleset
-        # dtstart: optional used when no dtstart is in RFC2445 string
-        #          dtstart is given as timezone naive time. timezones are
-        #          applied afterwards, since rrulestr doesn't normalize
-        #          timezones over DST boundaries
-        rset = rrule.rrulestr(
-            recrule,
-            dtstart=start,
-            forceset=True,
-            ignoretz=True,
-            # compatible=True # RFC2445 compatibility
-        )
-    else:
-        rset = rrule.rruleset()
-    rset.rdate(start)  # RCF2445: always include start date
+    # Compare UTC times as integer microseconds.
+    table = get_zone_table(tz)
+    if from_:
+        from_bound = utc_microseconds(from_) - _microseconds(duration)
+    if until:
+        until_bound = utc_microseconds(until)
 
     # limit
     if _from and _until:
         # between doesn't add a ruleset but returns a list
         rset = rset.between(_from - duration, _until, inc=True)
+    elif _from and not count:
+        # Seek to the first occurrence, which could reach into the queried
+        # timerange instead of walking the sequence from the event's start.
+        # count is counted from the event's start, so it's walked then.
+        rset = seek_recurrence(aware_start, recrule, from_, duration)
+    yielded = 0
     for cnt, date in enumerate(rset):
+        # Limit the calculation, otherwise calculations take too long
+        if max_candidates is not None and cnt + 1 > max_candidates:
+            result.truncated = True
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            result.truncated = True
+            break
+
         # Localize tznaive dates from rrulestr sequence
-        date = tz.localize(date)
+        if aware:
+            date, utc_date = table.localize(date)
+        else:
+            utc_date = table.utc(date)
 
-        # Limit number of recurrences otherwise calculations take too long
-        if MAXCOUNT and cnt + 1 > MAXCOUNT:
-            break
         if count and cnt + 1 > count:
             break
-        if from_ and utc(date) + duration < utc(from_):
+        if from_ and utc_date < from_bound:
             continue
-        if until and utc(date) > utc(until):
+        if until and utc_date > until_bound:
             break
 
-        yield date
+        if max_occurrences is not None and yielded + 1 > max_occurrences:
+            result.truncated = True
+            break
+        yielded += 1
+        yield date if aware else utc_date
     return
 
 
+def recurrence_int_array(
+    start,
+    recrule=None,
+    from_=None,
+    until=None,
+    count=None,
+    duration=None,
+    limits=None,
+):
+    """Calculates the integer representations of the occurrences of a
+    recurrence rule, as plone.event.utils.dt2int does, without creating
+    timezone aware datetime objects.
+
+    The parameters are the same as for recurrence_sequence_ical and the values
+    are the same as for
+    ``recurrence_int_sequence(recurrence_sequence_ical(...))``.
+
+    :returns: Array of integer representations.
+    :rtype: array.array of typecode 'i'
+
+    >>> from datetime import datetime
+    >>> from plone.event.recurrence import recurrence_int_array
+    >>> import pytz
+    >>> at = pytz.timezone('Europe/Vienna')
+    >>> recurrence_int_array(
+    ...     at.localize(datetime(2010, 1, 1, 0, 0)),
+    ...     recrule='RRULE:FREQ=DAILY;INTERVAL=10;COUNT=3')
+    array('i', [1076762820, 1076777220, 1076791620])
+
+    """
+    utcs = RecurrenceSequence(
+        _recurrence_sequence_ical,
+        start,
+        recrule=recrule,
+        from_=from_,
+        until=until,
+        count=count,
+        duration=duration,
+        limits=limits,
+        aware=False,
+    )
+    return array("i", map(_utc2int, utcs))
+
+
+def _utc2int(utc_us):
+    """Calculate the dt2int integer representation of a UTC time given as
+    microseconds since the epoch.
+    """
+    days, seconds = divmod(utc_us // 10**6, 24 * 60 * 60)
+    day = datetime.date.fromordinal(EPOCH_ORDINAL + days)
+    value = (
+        ((day.year * 12 + day.month) * 31 + day.day) * 24 + seconds // 3600
+    ) * 60 + seconds % 3600 // 60
+    if value > MAX32:
+        raise OverflowError(
+            "{} is not within the range of indexable dates, exceeding 32bit "
+            "range.".format(day)
+        )
+    return value
+
+
+def _split_recrule(start, recrule):
+    """Split a recurrence definition into its normalized rule lines and the
+    sets of its RDATE and EXDATE dates.
+    """
+    rules, rdates, exdates = [], set(), set()
+    if not recrule:
+        return rules, rdates, exdates
+    for line in normalize_recrule(start, recrule).upper().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        name = name.split(";")[0]
+        if sep and name in ("RDATE", "EXDATE"):
+            dates = rdates if name == "RDATE" else exdates
+            dates.update(
+                parser.parse(it, ignoretz=True) for it in value.split(",") if it
+            )
+        else:
+            rules.append(line)
+    return rules, rdates, exdates
+
+
+def recurrence_diff(
+    start,
+    old_recrule=None,
+    new_recrule=None,
+    from_=None,
+    until=None,
+    duration=None,
+    limits=None,
+):
+    """Calculates the occurrences added and removed by changing the
+    recurrence definition of an event.
+
+    If only RDATE and EXDATE lines changed, only the changed dates are checked
+    against the unchanged rule, instead of expanding both sequences. Then the
+    limits don't apply. If the RRULE or EXRULE lines changed, both sequences
+    are calculated with recurrence_sequence_ical and compared.
+
+    :param start: datetime or DateTime instance of the event's start.
+    :type start: datetime.datetime
+
+    :param old_recrule: Recurrence definition before the change.
+    :type old_recrule: string
+
+    :param new_recrule: Recurrence definition after the change.
+    :type new_recrule: string
+
+    :param from_: Optional datetime to limit the diff within a timespan.
+    :type from_: datetime.datetime
+
+    :param until: Optional datetime to limit the diff within a timespan.
+    :type until: datetime.datetime
+
+    :param duration: Optional duration of the occurrences, as for
+                     recurrence_sequence_ical.
+    :type duration: datetime.timedelta
+
+    :param limits: Optional limits, as for recurrence_sequence_ical.
+    :type limits: IRecurrenceLimits
+
+    :returns: Tuple of the sorted lists of added and removed occurrences.
+    :rtype: tuple
+
+    >>> from datetime import datetime
+    >>> from plone.event.recurrence import recurrence_diff
+    >>> import pytz
+    >>> at = pytz.timezone('Europe/Vienna')
+    >>> start = at.localize(datetime(2011, 11, 7, 10, 0))
+    >>> rule = 'RRULE:FREQ=WEEKLY;COUNT=10'
+    >>> recurrence_diff(start, rule, rule + '\\nEXDATE:20111114T000000')
+    ([], [datetime.datetime(2011, 11, 14, 10, 0, tzinfo=<DstTzInfo 'Europe/Vienna' CET+1:00:00 STD>)])
+
+    """
+    start = pydt(start, exact=False)
+    tz = start.tzinfo
+    naive_start = tzdel(start)
+    old_rules, old_rdates, old_exdates = _split_recrule(naive_start, old_recrule)
+    new_rules, new_rdates, new_exdates = _split_recrule(naive_start, new_recrule)
+
+    if old_rules != new_rules:
+        kwargs = dict(from_=from_, until=until, duration=duration, limits=limits)
+        old = set(recurrence_sequence_ical(start, recrule=old_recrule, **kwargs))
+        new = set(recurrence_sequence_ical(start, recrule=new_recrule, **kwargs))
+        return sorted(new - old), sorted(old - new)
+
+    rset = compile_recurrence(naive_start, "\n".join(new_rules))
+
+    def occurs(date, rdates, exdates):
+        return date not in exdates and (date in rdates or date in rset)
+
+    from_ = pydt(from_, exact=False)
+    until = pydt(until, exact=False)
+    duration = duration or datetime.timedelta(0)
+    added, removed = [], []
+    for date in sorted((old_rdates ^ new_rdates) | (old_exdates ^ new_exdates)):
+        before = occurs(date, old_rdates, old_exdates)
+        after = occurs(date, new_rdates, new_exdates)
+        if before == after:
+            continue
+        date = localize(date, tz)
+        if from_ and utc(date) + duration < utc(from_):
+            continue
+        if until and utc(date) > utc(until):
+            continue
+        (added if after else removed).append(date)
+    return added, removed
+
+
 def recurrence_sequence_timedelta(
     start,
     delta=None,
     until=None,
     count=None,
     dst=DSTAUTO,
+    limits=None,
 ):
     """Calculates a sequence of datetime objects from a timedelta integer,
     which defines the minutes between each occurrence.
@@ -171,7 +757,7 @@ def recurrence_sequence_timedelta(
     :type until: datetime
 
     :param count: Integer which defines the number of occurrences. If not given,
-                  until or MAXDATE limits the recurrence calculation.
+                  until or limits limit the recurrence calculation.
     :param count: integer
 
     :param dst:   Daylight Saving Time crossing behavior. DSTAUTO, DSTADJUST or
@@ -179,10 +765,36 @@ def recurrence_sequence_timedelta(
                   plone.event.utils.utcoffset_normalize.
     :param dst: string
 
-    :return: A generator which generates a sequence of datetime instances.
-    :rtype: generator
+    :param limits: Optional limits for the number of occurrences after the
+                   start date and the calculation time. Defaults to the
+                   registered IRecurrenceLimits utility or MAXCOUNT
+                   occurrences.
+    :type limits: IRecurrenceLimits
+
+    :return: An iterator which generates a sequence of datetime instances.
+    :rtype: RecurrenceSequence
 
     """
+    return RecurrenceSequence(
+        _recurrence_sequence_timedelta,
+        start,
+        delta=delta,
+        until=until,
+        count=count,
+        dst=dst,
+        limits=limits,
+    )
+
+
+def _recurrence_sequence_timedelta(
+    result,
+    start,
+    delta=None,
+    until=None,
+    count=None,
+    dst=DSTAUTO,
+    limits=None,
+):
     start = pydt(start)
     yield start
 
@@ -190,17 +802,46 @@ def recurrence_sequence_timedelta(
         return
 
     until = pydt(until)
+    limits = get_limits(limits)
+    max_occurrences = min(
+        [
+            it
+            for it in (limits.max_occurrences, limits.max_candidates)
+            if it is not None
+        ],
+        default=None,
+    )
+    deadline = _deadline(limits)
+
+    if isinstance(start.tzinfo, BaseTzInfo):
+        occurrences = TimedeltaRecurrence(
+            start, delta=delta, until=until, count=count, dst=dst
+        )._occurrences(1)
+    else:
+        occurrences = _step_timedelta(start, delta, until, count, dst)
+    for cnt, after in enumerate(occurrences):
+        # Limit number of recurrences otherwise calculations take too long
+        if max_occurrences is not None and cnt + 1 > max_occurrences:
+            result.truncated = True
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            result.truncated = True
+            break
+        yield after
+
 
+def _step_timedelta(start, delta, until, count, dst):
+    """Generate the occurrences after the start of a timedelta recurrence
+    step by step, for timezones, which aren't pytz timezones.
+    """
     before = start
     delta = datetime.timedelta(minutes=delta)
+    backend = backend_for(start.tzinfo)
+    keep = dst == DSTKEEP or (dst == DSTAUTO and delta < datetime.timedelta(days=1))
     cnt = 0
     while True:
-        after = before + delta
-        after = utcoffset_normalize(after, delta, dst)
+        after = backend.shift(before, delta, keep)
 
-        # Limit number of recurrences otherwise calculations take too long
-        if MAXCOUNT and cnt + 1 > MAXCOUNT:
-            break
         if count and cnt + 1 > count:
             break
         if until and utc(after) > utc(until):
@@ -211,6 +852,230 @@ def recurrence_sequence_timedelta(
         before = after
 
 
+class TimedeltaRecurrence:
+    """Random access sequence of the occurrences of a timedelta recurrence,
+    as generated by recurrence_sequence_timedelta, without limits.
+
+    The occurrences are calculated arithmetically. With DSTKEEP, the UTC
+    times of the occurrences are evenly spaced and the timezone transition of
+    an occurrence is found by binary search. With DSTADJUST, the wall times
+    are evenly spaced and the sequence is split into runs of occurrences with
+    the same UTC offset, which are calculated at the timezone transitions
+    only. The number of occurrences and the nth occurrence are found without
+    walking the sequence.
+
+    Only pytz timezones are supported.
+
+    >>> from datetime import datetime
+    >>> from plone.event.recurrence import TimedeltaRecurrence
+    >>> import pytz
+    >>> at = pytz.timezone('Europe/Vienna')
+    >>> recurrence = TimedeltaRecurrence(
+    ...     at.localize(datetime(2011, 3, 26, 22, 0)), delta=60,
+    ...     until=at.localize(datetime(2021, 3, 26, 22, 0)))
+    >>> len(recurrence)
+    87673
+    >>> recurrence[5]
+    datetime.datetime(2011, 3, 27, 4, 0, tzinfo=<DstTzInfo 'Europe/Vienna' CEST+2:00:00 DST>)
+    >>> recurrence[-1] == recurrence[len(recurrence) - 1]
+    True
+    >>> for date in recurrence.window(
+    ...         datetime(2011, 3, 27, 0, 0, tzinfo=pytz.utc),
+    ...         datetime(2011, 3, 27, 2, 0, tzinfo=pytz.utc)):
+    ...     print(date)
+    2011-03-27 01:00:00+01:00
+    2011-03-27 03:00:00+02:00
+    2011-03-27 04:00:00+02:00
+
+    """
+
+    def __init__(self, start, delta=None, until=None, count=None, dst=DSTAUTO):
+        """
+        :param start: Start of the sequence, with a pytz timezone.
+        :param delta: Minutes between the occurrences.
+        :param until: End of the sequence. Without until, the sequence only
+                      consists of the start, like with
+                      recurrence_sequence_timedelta.
+        :param count: Optional maximum number of occurrences after the start.
+        :param dst: DSTAUTO, DSTADJUST or DSTKEEP, as for
+                    plone.event.utils.utcoffset_normalize.
+        """
+        assert dst in [DSTADJUST, DSTKEEP, DSTAUTO]
+        self.start = start = pydt(start)
+        if not isinstance(start.tzinfo, BaseTzInfo):
+            raise TypeError("Only pytz timezones are supported.")
+        self._table = get_zone_table(start.tzinfo)
+        self._wall0 = to_seconds(tzdel(start))
+        self._utc0 = self._wall0 - _microseconds(start.utcoffset()) // 10**6
+        if delta is None or delta < 1 or until is None:
+            self._step = None
+            self._length = 1
+            return
+        self._step = step = delta * 60
+        self._keep = dst == DSTKEEP or (dst == DSTAUTO and step < 24 * 60 * 60)
+        # DSTADJUST: Runs of occurrences with the same transition interval as
+        # the first indexes of the runs and their interval indexes.
+        self._firsts = []
+        self._intervals = []
+        # Last calculated occurrence index and its UTC offset in seconds.
+        self._last = 0
+        self._offset = self._wall0 - self._utc0
+        self._complete = False
+        length = self._count_until(utc_microseconds(pydt(until)) // 10**6) + 1
+        if count:
+            length = min(length, count + 1)
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[it] for it in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Occurrence index out of range.")
+        return self._occurrence(index)
+
+    def __iter__(self):
+        yield self.start
+        yield from self._occurrences(1)
+
+    def window(self, from_, until):
+        """Return the occurrences starting from from_ until until, inclusive.
+
+        :param from_: Start of the window.
+        :type from_: datetime.datetime
+        :param until: End of the window.
+        :type until: datetime.datetime
+        :rtype: list
+        """
+        from_s = utc_microseconds(pydt(from_)) // 10**6
+        until_s = utc_microseconds(pydt(until)) // 10**6
+        result = []
+        if from_s <= self._utc0 <= until_s:
+            result.append(self.start)
+        if self._length < 2:
+            return result
+        if self._keep:
+            runs = [(1, self._length, self._utc0)]
+        else:
+            runs = []
+            for first, end, interval in self._runs(1):
+                if first >= self._length:
+                    break
+                runs.append((first, end, self._wall0 - self._table.offsets[interval]))
+        for first, end, utc0 in runs:
+            # The UTC times within a run are utc0 plus a multiple of step.
+            lo = max(first, -((utc0 - from_s) // self._step))
+            hi = min(end, (until_s - utc0) // self._step + 1)
+            result.extend(self._occurrences(lo, hi))
+        return result
+
+    def _interval(self, seconds):
+        """Return the index of the transition interval of a UTC time."""
+        return max(bisect_right(self._table.trans, seconds) - 1, 0)
+
+    def _datetime(self, wall, interval):
+        return (EPOCH + datetime.timedelta(seconds=wall)).replace(
+            tzinfo=self._table.tzinfos[interval]
+        )
+
+    def _occurrence(self, index):
+        if index == 0:
+            return self.start
+        if self._keep:
+            utc_s = self._utc0 + index * self._step
+            interval = self._interval(utc_s)
+            return self._datetime(utc_s + self._table.offsets[interval], interval)
+        self._extend(index)
+        interval = self._intervals[bisect_right(self._firsts, index) - 1]
+        return self._datetime(self._wall0 + index * self._step, interval)
+
+    def _occurrences(self, first, stop=None):
+        """Generate the occurrences from index first to stop, exclusive."""
+        stop = self._length if stop is None else min(stop, self._length)
+        if first >= stop:
+            return
+        table, step = self._table, self._step
+        if not self._keep:
+            for start, end, interval in self._runs(first):
+                if start >= stop:
+                    return
+                for index in range(start, min(end, stop)):
+                    yield self._datetime(self._wall0 + index * step, interval)
+            return
+        utc_s = self._utc0 + first * step
+        interval = self._interval(utc_s)
+        for _ in range(first, stop):
+            while (
+                interval + 1 < len(table.trans) and utc_s >= table.trans[interval + 1]
+            ):
+                interval += 1
+            yield self._datetime(utc_s + table.offsets[interval], interval)
+            utc_s += step
+
+    def _count_until(self, until_s):
+        """Return the number of occurrences after the start until the first
+        one after until_s.
+        """
+        if self._keep:
+            return max((until_s - self._utc0) // self._step, 0)
+        for first, end, interval in self._runs(1):
+            offset = self._table.offsets[interval]
+            # The first occurrence of the run after until_s.
+            index = max(first, (until_s + offset - self._wall0) // self._step + 1)
+            if index < end:
+                return index - 1
+
+    def _runs(self, first):
+        """Generate the DSTADJUST runs as tuples of first index, end index,
+        exclusive, and transition interval from the run with index first on.
+        """
+        index = first
+        while True:
+            self._extend(index)
+            pos = bisect_right(self._firsts, index) - 1
+            if pos + 1 < len(self._firsts):
+                end = self._firsts[pos + 1]
+            elif self._complete:
+                end = MAXINDEX
+            else:
+                end = self._last + 1
+            yield index, end, self._intervals[pos]
+            if end == MAXINDEX:
+                return
+            index = end
+
+    def _extend(self, index):
+        """Calculate the DSTADJUST runs up to the occurrence index.
+
+        The UTC offset of an occurrence is the offset of its wall time, taken
+        with the offset of the previous occurrence, like utcoffset_normalize
+        does. While the offset doesn't change, the occurrences stay within the
+        transition interval until its end.
+        """
+        table, step = self._table, self._step
+        while self._last < index and not self._complete:
+            current = self._last + 1
+            offset = self._offset
+            interval = self._interval(self._wall0 + current * step - offset)
+            if not self._intervals or self._intervals[-1] != interval:
+                self._firsts.append(current)
+                self._intervals.append(interval)
+            self._offset = table.offsets[interval]
+            if self._offset != offset:
+                self._last = current
+            elif interval + 1 >= len(table.trans):
+                self._complete = True
+            else:
+                # The last occurrence before the end of the interval.
+                self._last = (
+                    table.trans[interval + 1] + offset - self._wall0 - 1
+                ) // step
+
+
 def recurrence_int_sequence(sequence):
     """Generates a sequence of integer representations from a sequence of
     dateime instances.
@@ -223,3 +1088,301 @@ def recurrence_int_sequence(sequence):
     """
     for dt in sequence:
         yield dt2int(dt)
+
+
+def utc_sorted(sequence):
+    """Generate the datetimes of a sequence sorted by wall time as tuples of
+    UTC time and datetime, sorted by UTC time.
+
+    Around DST changes, the UTC times of a sequence sorted by wall time might
+    not be sorted. UTC offsets are less than a day, so a datetime is passed on
+    as soon as the sequence's wall time is more than a day later. Only the
+    datetimes of about one day are kept in memory.
+
+    :param sequence: Iterable of timezone aware datetimes, sorted by their
+                     wall time, e.g. from recurrence_sequence_ical.
+    :type sequence: iterable
+    :rtype: generator
+    """
+    oneday = datetime.timedelta(days=1)
+    pending = []
+    for cnt, date in enumerate(sequence):
+        bound = date.replace(tzinfo=utctz()) - oneday
+        while pending and pending[0][0] <= bound:
+            utc_date, _, date_ = heapq.heappop(pending)
+            yield utc_date, date_
+        heapq.heappush(pending, (utc(date), cnt, date))
+    while pending:
+        utc_date, _, date_ = heapq.heappop(pending)
+        yield utc_date, date_
+
+
+def merged_occurrences(sources, from_=None, until=None, count=None, limits=None):
+    """Generate the occurrences of many events in chronological order.
+
+    The sequences of the events are merged lazily with a heap, keyed on the
+    next occurrence of each event. After the first occurrence of each event
+    is calculated, the work for each emitted occurrence is logarithmic in the
+    number of events, so e.g. the next 10 upcoming occurrences of thousands
+    of events are found without expanding their whole sequences.
+
+    :param sources: Iterable of (start, recrule, duration) tuples, as passed
+                    to recurrence_sequence_ical. Recurrence rule and duration
+                    can be None.
+    :type sources: iterable
+
+    :param from_: Optional datetime. Only occurrences ending after from_ are
+                  generated.
+    :type from_: datetime.datetime
+
+    :param until: Optional datetime. Only occurrences starting before or at
+                  until are generated.
+    :type until: datetime.datetime
+
+    :param count: Optional maximum number of generated occurrences.
+    :type count: integer
+
+    :param limits: Optional limits per event, as for
+                   recurrence_sequence_ical.
+    :type limits: IRecurrenceLimits
+
+    :returns: Generator of (index, occurrence) tuples, where index is the
+              position of the event in sources.
+    :rtype: generator
+
+    >>> from datetime import datetime
+    >>> from plone.event.recurrence import merged_occurrences
+    >>> sources = [
+    ...     (datetime(2013, 6, 1, 9, 0), 'RRULE:FREQ=WEEKLY', None),
+    ...     (datetime(2013, 6, 2, 10, 0), 'RRULE:FREQ=DAILY', None),
+    ... ]
+    >>> for index, occurrence in merged_occurrences(
+    ...         sources, from_=datetime(2013, 6, 7), count=3):
+    ...     print(index, occurrence)
+    1 2013-06-07 10:00:00+00:00
+    0 2013-06-08 09:00:00+00:00
+    1 2013-06-08 10:00:00+00:00
+
+    """
+
+    def keyed(index, source):
+        start, recrule, duration = source
+        # With from_, the sequence is generated lazily only without until,
+        # which is checked for the merged sequence instead.
+        sequence = recurrence_sequence_ical(
+            start,
+            recrule=recrule,
+            from_=from_,
+            until=None if from_ else until,
+            duration=duration,
+            limits=limits,
+        )
+        for utc_date, date in utc_sorted(sequence):
+            yield utc_date, index, date
+
+    utc_until = utc(pydt(until))
+    merged = heapq.merge(
+        *(keyed(index, source) for index, source in enumerate(sources))
+    )
+    for utc_date, index, date in itertools.islice(merged, count or None):
+        if utc_until and utc_date > utc_until:
+            return
+        yield index, date
+
+
+# Default number of occurrences and time in seconds, which the asynchronous
+# sequences calculate in the executor at once.
+ASYNC_CHUNKSIZE = 64
+ASYNC_TIMESLICE = 0.01
+
+
+def _take(sequence, chunksize, timeslice, stopped):
+    """Calculate the next occurrences of a sequence, until chunksize
+    occurrences are found, timeslice seconds passed or stopped is set.
+    Return the occurrences and if the sequence is exhausted.
+    """
+    deadline = time.monotonic() + timeslice if timeslice else None
+    chunk = []
+    for date in sequence:
+        chunk.append(date)
+        if (
+            len(chunk) >= chunksize
+            or stopped.is_set()
+            or (deadline is not None and time.monotonic() >= deadline)
+        ):
+            return chunk, False
+    return chunk, True
+
+
+class AsyncRecurrenceSequence:
+    """Asynchronous iterator over a recurrence sequence.
+
+    The wrapped sequence, including parsing the recurrence rule, is
+    calculated in an executor in chunks of occurrences, so the event loop
+    isn't blocked. Between chunks, control is given back to the event loop.
+
+    Cancelling the awaiting task or closing the iterator stops the calculation
+    after the current occurrence. A chunk in progress, which doesn't find its
+    next occurrence, keeps its executor thread busy until the limits of the
+    sequence stop it, so give expensive rules a timeout.
+    """
+
+    def __init__(
+        self,
+        sequence,
+        chunksize=ASYNC_CHUNKSIZE,
+        timeslice=ASYNC_TIMESLICE,
+        executor=None,
+    ):
+        """
+        :param sequence: RecurrenceSequence to calculate.
+        :param chunksize: Maximum number of occurrences per chunk.
+        :param timeslice: Maximum calculation time per chunk in seconds, or
+                          None.
+        :param executor: concurrent.futures executor. Defaults to the default
+                         executor of the event loop.
+        """
+        self._sequence = sequence
+        self._chunksize = max(chunksize, 1)
+        self._timeslice = timeslice
+        self._executor = executor
+        self._buffer = collections.deque()
+        self._exhausted = False
+        self._stopped = threading.Event()
+        # Held while a chunk is calculated in the executor.
+        self._lock = threading.Lock()
+
+    @property
+    def truncated(self):
+        """True, if the sequence was stopped by one of the limits before its
+        end.
+        """
+        return self._sequence.truncated
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._buffer:
+            if self._exhausted:
+                raise StopAsyncIteration
+            loop = asyncio.get_running_loop()
+            try:
+                chunk, self._exhausted = await loop.run_in_executor(
+                    self._executor, self._take
+                )
+            except BaseException:
+                self._stop()
+                raise
+            self._buffer.extend(chunk)
+        return self._buffer.popleft()
+
+    def _take(self):
+        with self._lock:
+            if self._stopped.is_set():
+                return [], True
+            return _take(
+                self._sequence, self._chunksize, self._timeslice, self._stopped
+            )
+
+    def _stop(self):
+        self._exhausted = True
+        self._buffer.clear()
+        self._stopped.set()
+        # The sequence cannot be closed while a chunk is calculated. Then it
+        # is closed, when it's garbage collected.
+        if self._lock.acquire(blocking=False):
+            try:
+                self._sequence.close()
+            finally:
+                self._lock.release()
+
+    async def aclose(self):
+        """Stop the calculation and close the sequence."""
+        self._stop()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._stop()
+
+
+def async_recurrence_sequence_ical(
+    start,
+    recrule=None,
+    from_=None,
+    until=None,
+    count=None,
+    duration=None,
+    limits=None,
+    chunksize=ASYNC_CHUNKSIZE,
+    timeslice=ASYNC_TIMESLICE,
+    executor=None,
+):
+    """Asynchronous counterpart of recurrence_sequence_ical, for use in
+    asyncio event loops.
+
+    The parameters are the same as for recurrence_sequence_ical, plus
+    chunksize, timeslice and executor as for AsyncRecurrenceSequence.
+
+    :rtype: AsyncRecurrenceSequence
+
+    >>> import asyncio
+    >>> from datetime import datetime
+    >>> from plone.event.recurrence import async_recurrence_sequence_ical
+    >>> async def occurrences():
+    ...     sequence = async_recurrence_sequence_ical(
+    ...         datetime(2013, 6, 1, 9, 0),
+    ...         recrule='RRULE:FREQ=WEEKLY;COUNT=3', chunksize=2)
+    ...     return [date async for date in sequence]
+    >>> for date in asyncio.run(occurrences()):
+    ...     print(date)
+    2013-06-01 09:00:00+00:00
+    2013-06-08 09:00:00+00:00
+    2013-06-15 09:00:00+00:00
+
+    """
+    return AsyncRecurrenceSequence(
+        recurrence_sequence_ical(
+            start,
+            recrule=recrule,
+            from_=from_,
+            until=until,
+            count=count,
+            duration=duration,
+            limits=limits,
+        ),
+        chunksize=chunksize,
+        timeslice=timeslice,
+        executor=executor,
+    )
+
+
+def async_recurrence_sequence_timedelta(
+    start,
+    delta=None,
+    until=None,
+    count=None,
+    dst=DSTAUTO,
+    limits=None,
+    chunksize=ASYNC_CHUNKSIZE,
+    timeslice=ASYNC_TIMESLICE,
+    executor=None,
+):
+    """Asynchronous counterpart of recurrence_sequence_timedelta, for use in
+    asyncio event loops.
+
+    The parameters are the same as for recurrence_sequence_timedelta, plus
+    chunksize, timeslice and executor as for AsyncRecurrenceSequence.
+
+    :rtype: AsyncRecurrenceSequence
+    """
+    return AsyncRecurrenceSequence(
+        recurrence_sequence_timedelta(
+            start, delta=delta, until=until, count=count, dst=dst, limits=limits
+        ),
+        chunksize=chunksize,
+        timeslice=timeslice,
+        executor=executor,
+    )
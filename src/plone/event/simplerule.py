@@ -0,0 +1,260 @@
+"""Arithmetic recurrence engine for simple RFC5545 recurrence rules.
+
+Plain daily and weekly rules, with an optional INTERVAL, COUNT, UNTIL, BYDAY
+and WKST part, describe a periodic pattern of days. For these rules, the nth
+occurrence, the number of occurrences and the occurrences within a timespan
+are calculated directly instead of iterating over python-dateutil's generic
+rrule machinery. The results are identical to a python-dateutil rruleset
+built from the same rule with the start date added as RDATE.
+
+"""
+
+from bisect import bisect_left
+from bisect import bisect_right
+from datetime import datetime
+from datetime import timedelta
+from dateutil import parser
+
+import math
+import re
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+ONEDAY = timedelta(days=1)
+
+_RULE_PARTS = {
+    "FREQ": re.compile(r"DAILY|WEEKLY"),
+    "INTERVAL": re.compile(r"[1-9][0-9]{0,5}"),
+    "COUNT": re.compile(r"[1-9][0-9]{0,8}"),
+    "UNTIL": re.compile(r"[0-9]{8}(T[0-9]{6})?Z?"),
+    "BYDAY": re.compile(r"(MO|TU|WE|TH|FR|SA|SU)(,(MO|TU|WE|TH|FR|SA|SU))*"),
+    "WKST": re.compile(r"MO|TU|WE|TH|FR|SA|SU"),
+}
+
+
+def parse_simple_rule(recrule):
+    """Parse a normalized recurrence definition into a dictionary of rule
+    parts, if it consists of a single daily or weekly RRULE, which can be
+    calculated arithmetically.
+
+    :param recrule: Normalized RFC5545 recurrence definition.
+    :type recrule: string
+    :returns: Dictionary of rule parts or None, if the rule isn't supported.
+    :rtype: dict
+
+    >>> from plone.event.simplerule import parse_simple_rule
+    >>> parse_simple_rule('RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE')
+    {'FREQ': 'WEEKLY', 'INTERVAL': '2', 'BYDAY': 'MO,WE'}
+
+    >>> parse_simple_rule('RRULE:FREQ=MONTHLY;BYMONTHDAY=1') is None
+    True
+    >>> parse_simple_rule('FREQ=DAILY\\nEXDATE:20130630T000000') is None
+    True
+
+    """
+    lines = recrule.upper().split()
+    if len(lines) != 1:
+        return None
+    line = lines[0]
+    if line.startswith("RRULE:"):
+        line = line[6:]
+    elif ":" in line:
+        return None
+    parts = {}
+    for pair in line.split(";"):
+        name, sep, value = pair.partition("=")
+        pattern = _RULE_PARTS.get(name)
+        if not sep or pattern is None or name in parts:
+            return None
+        if not pattern.fullmatch(value):
+            return None
+        parts[name] = value
+    if "FREQ" not in parts or ("COUNT" in parts and "UNTIL" in parts):
+        return None
+    return parts
+
+
+class SimpleRule:
+    """Sequence of timezone naive occurrences of a simple recurrence rule,
+    including the start date.
+
+    The rule's days are described by a base date, a period length in days and
+    the sorted day offsets of the occurrences within one period. Occurrence
+    slots before the start date are not part of the sequence.
+
+    It supports the parts of the python-dateutil rruleset API, which are used
+    by plone.event: iteration, ``xafter``, ``after``, ``between``, ``count``,
+    indexing and ``in`` checks.
+
+    >>> from datetime import datetime
+    >>> from plone.event.simplerule import SimpleRule
+    >>> rule = SimpleRule.from_string(
+    ...     datetime(2013, 6, 5, 10, 0),  # a Wednesday
+    ...     'RRULE:FREQ=WEEKLY;BYDAY=MO,FR;COUNT=3')
+    >>> list(rule)
+    [datetime.datetime(2013, 6, 5, 10, 0),
+     datetime.datetime(2013, 6, 7, 10, 0),
+     datetime.datetime(2013, 6, 10, 10, 0),
+     datetime.datetime(2013, 6, 14, 10, 0)]
+
+    >>> rule[2]
+    datetime.datetime(2013, 6, 10, 10, 0)
+    >>> rule.count()
+    4
+    >>> rule.after(datetime(2013, 6, 8))
+    datetime.datetime(2013, 6, 10, 10, 0)
+
+    """
+
+    def __init__(self, start, base, period, offsets, count=None, until=None):
+        """
+        :param start: Timezone naive start date of the sequence.
+        :param base: First day of the first period.
+        :param period: Length of a period in days.
+        :param offsets: Sorted day offsets of occurrences within a period.
+                        Empty, if the rule never matches.
+        :param count: Optional maximum number of rule occurrences.
+        :param until: Optional timezone naive datetime of the last possible
+                      occurrence.
+        """
+        self.start = start
+        self.base = datetime.combine(base, start.time())
+        self.period = period
+        self.offsets = offsets
+        # First slot index at or after the start date.
+        self._first = bisect_left(offsets, (start - self.base).days)
+        # python-dateutil stops at datetime.MAXYEAR.
+        stop = self._slots_upto(datetime.max, inclusive=True)
+        if until is not None:
+            stop = min(stop, self._slots_upto(until, inclusive=True))
+        if count is not None:
+            stop = min(stop, self._first + count)
+        self._stop = max(stop, self._first)
+        # The start date is part of the sequence, even if it doesn't match
+        # the rule.
+        self._prefix = 1
+        if self._stop > self._first and self._slot(self._first) == start:
+            self._prefix = 0
+
+    @classmethod
+    def from_string(cls, start, recrule):
+        """Create a SimpleRule from a timezone naive start date and a
+        normalized recurrence definition.
+
+        :returns: A SimpleRule instance or None, if the rule isn't supported.
+        """
+        if start.microsecond or start.tzinfo is not None:
+            return None
+        parts = parse_simple_rule(recrule)
+        if parts is None:
+            return None
+        interval = int(parts.get("INTERVAL", 1))
+        count = int(parts["COUNT"]) if "COUNT" in parts else None
+        until = None
+        if "UNTIL" in parts:
+            try:
+                until = parser.parse(parts["UNTIL"], ignoretz=True)
+            except (ValueError, OverflowError):
+                return None
+        byday = parts.get("BYDAY")
+        weekdays = (
+            sorted({WEEKDAYS.index(day) for day in byday.split(",")}) if byday else None
+        )
+        startdate = start.date()
+
+        if parts["FREQ"] == "DAILY":
+            if weekdays is None:
+                period, offsets = interval, [0]
+            else:
+                # The weekday pattern repeats after lcm(interval, 7) days.
+                period = interval * 7 // math.gcd(interval, 7)
+                offsets = [
+                    offset
+                    for offset in range(0, period, interval)
+                    if (startdate + timedelta(days=offset)).weekday() in weekdays
+                ]
+            return cls(start, startdate, period, offsets, count, until)
+
+        wkst = WEEKDAYS.index(parts.get("WKST", "MO"))
+        if weekdays is None:
+            weekdays = [startdate.weekday()]
+        base = startdate - timedelta(days=(startdate.weekday() - wkst) % 7)
+        offsets = sorted((day - wkst) % 7 for day in weekdays)
+        return cls(start, base, 7 * interval, offsets, count, until)
+
+    def _slot(self, index):
+        quot, rem = divmod(index, len(self.offsets))
+        return self.base + timedelta(
+            days=quot * self.period + self.offsets[rem],
+        )
+
+    def _slots_upto(self, dt, inclusive):
+        """Return the number of slots before dt or, if inclusive, at or before
+        dt, counted from the first slot of the first period.
+        """
+        if dt < self.base or not self.offsets:
+            return 0
+        delta = dt - self.base
+        days = delta.days
+        if not inclusive and delta == timedelta(days=days):
+            days -= 1
+            if days < 0:
+                return 0
+        quot, rem = divmod(days, self.period)
+        return quot * len(self.offsets) + bisect_right(self.offsets, rem)
+
+    def _index(self, dt, inc):
+        """Return the index of the first item after dt, or at dt if inc."""
+        if self._prefix and (dt < self.start or inc and dt == self.start):
+            return 0
+        slots = self._slots_upto(dt, inclusive=not inc)
+        return self._prefix + min(max(slots, self._first), self._stop) - self._first
+
+    def __len__(self):
+        return self._prefix + self._stop - self._first
+
+    def count(self):
+        return len(self)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[index] for index in range(*item.indices(len(self)))]
+        length = len(self)
+        if item < 0:
+            item += length
+        if not 0 <= item < length:
+            raise IndexError(item)
+        if self._prefix and item == 0:
+            return self.start
+        return self._slot(self._first + item - self._prefix)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __contains__(self, dt):
+        index = self._index(dt, inc=True)
+        return index < len(self) and self[index] == dt
+
+    def xafter(self, dt, count=None, inc=False):
+        """Generate the items after dt, or at dt if inc is True."""
+        first = self._index(dt, inc)
+        last = len(self)
+        if count is not None:
+            last = min(last, first + count)
+        for index in range(first, last):
+            yield self[index]
+
+    def after(self, dt, inc=False):
+        """Return the first item after dt, or at dt if inc is True."""
+        index = self._index(dt, inc)
+        if index < len(self):
+            return self[index]
+        return None
+
+    def between(self, after, before, inc=False):
+        """Return the list of items between after and before. If inc is
+        True, items at after or before are included.
+        """
+        first = self._index(after, inc)
+        last = self._index(before, not inc)
+        return [self[index] for index in range(first, max(first, last))]
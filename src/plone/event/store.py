@@ -0,0 +1,378 @@
+"""File backed store of the dt2int occurrence sequences of many events.
+
+The sequences are stored as 32bit little endian integers in a binary file,
+followed by an index of event uid to offset and length. Readers map the file
+into memory and access the sequences without copying, so processes reading
+the same file share one copy in the page cache.
+
+File layout::
+
+    header  magic, version, number of events, offset and size of the index
+    data    int32 sequences, aligned to 4 bytes
+    index   per event: offset, length, uid length, utf-8 encoded uid
+
+Appending writes the new sequences and a new index after the current index
+and then updates the header, so a reader opening the file meanwhile sees
+either the old or the new state. Replaced sequences and old indexes are left
+in place until the file is compacted.
+
+The ``plone-event-store`` console script rebuilds a store from iCalendar
+files, adds their events to it or compacts it, see main.
+
+Writers exclude each other with an exclusive lock on a sidecar file next to
+the store file, path + ".lock", which is left in place. write_store,
+append_store and compact_store hold it while writing, so concurrent writers
+of many processes don't overwrite each other's updates. The lock requires
+fcntl; without it, like on Windows, there must be a single writer.
+
+"""
+
+from array import array
+from contextlib import contextmanager
+from plone.event.ical import format_datetime
+from plone.event.ical import read_events
+from plone.event.recurrence import recurrence_int_array
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+MAGIC = b"PEOS"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHIQQ")
+HEADER_SIZE = 32
+_ENTRY = struct.Struct("<QIH")
+_NATIVE = sys.byteorder == "little"
+
+
+def _align(offset):
+    return (offset + 3) & ~3
+
+
+def _tobytes(values):
+    values = values if isinstance(values, array) else array("i", values)
+    if values.typecode != "i":
+        values = array("i", values)
+    if not _NATIVE:
+        values = array("i", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_header(data):
+    magic, version, _, count, index_offset, index_size = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not an occurrence store file.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported occurrence store version {version}.")
+    return count, index_offset, index_size
+
+
+def _read_index(data, offset, size):
+    index = {}
+    end = offset + size
+    while offset < end:
+        start, length, uid_size = _ENTRY.unpack_from(data, offset)
+        offset += _ENTRY.size
+        uid = bytes(data[offset : offset + uid_size]).decode("utf-8")
+        offset += uid_size
+        index[uid] = (start, length)
+    return index
+
+
+def _write_index(fd, index):
+    chunks = []
+    for uid, (start, length) in index.items():
+        encoded = uid.encode("utf-8")
+        chunks.append(_ENTRY.pack(start, length, len(encoded)))
+        chunks.append(encoded)
+    data = b"".join(chunks)
+    fd.write(data)
+    return len(data)
+
+
+def _write_header(fd, count, index_offset, index_size):
+    fd.seek(0)
+    fd.write(
+        _HEADER.pack(MAGIC, VERSION, 0, count, index_offset, index_size).ljust(
+            HEADER_SIZE, b"\0"
+        )
+    )
+
+
+def _write_data(fd, offset, events, index):
+    """Write the sequences of events from offset on and add them to the
+    index. Return the offset after the last sequence.
+    """
+    for uid, values in events:
+        data = _tobytes(values)
+        fd.seek(offset)
+        fd.write(data)
+        index[uid] = (offset, len(data) // 4)
+        offset = _align(offset + len(data))
+    return offset
+
+
+@contextmanager
+def _writer_lock(path):
+    """Hold the exclusive writer lock of a store file."""
+    with open(f"{path}.lock", "ab") as fd:
+        if fcntl is not None:
+            fcntl.flock(fd.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+def write_store(path, events):
+    """Write a new occurrence store file, replacing an existing one
+    atomically.
+
+    :param path: Path of the store file.
+    :param events: Iterable of (uid, sequence) tuples, where the sequence is
+                   an iterable of dt2int integer representations, e.g. from
+                   plone.event.recurrence.recurrence_int_array.
+    """
+    with _writer_lock(path):
+        _write_store(path, events)
+
+
+def _write_store(path, events):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as fd:
+            index = {}
+            offset = _write_data(fd, HEADER_SIZE, events, index)
+            fd.seek(offset)
+            size = _write_index(fd, index)
+            _write_header(fd, len(index), offset, size)
+            fd.flush()
+            os.fsync(fd.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def append_store(path, events):
+    """Add or replace the sequences of events in an occurrence store file.
+    The file is created, if it doesn't exist.
+
+    :param path: Path of the store file.
+    :param events: Iterable of (uid, sequence) tuples.
+    """
+    with _writer_lock(path):
+        if not os.path.exists(path):
+            _write_store(path, events)
+            return
+        _append_store(path, events)
+
+
+def _append_store(path, events):
+    with open(path, "r+b") as fd:
+        header = fd.read(HEADER_SIZE)
+        count, index_offset, index_size = _read_header(header)
+        fd.seek(index_offset)
+        index = _read_index(fd.read(index_size), 0, index_size)
+        offset = _write_data(fd, _align(index_offset + index_size), events, index)
+        fd.seek(offset)
+        size = _write_index(fd, index)
+        fd.flush()
+        os.fsync(fd.fileno())
+        # The new state becomes visible with the header.
+        _write_header(fd, len(index), offset, size)
+        fd.flush()
+        os.fsync(fd.fileno())
+
+
+def compact_store(path):
+    """Rewrite an occurrence store file without replaced sequences and old
+    indexes.
+    """
+    with _writer_lock(path), OccurrenceStore(path) as store:
+        _write_store(path, ((uid, store[uid]) for uid in store))
+
+
+class OccurrenceStore:
+    """Read-only, memory mapped occurrence store.
+
+    >>> import os, tempfile
+    >>> from plone.event.store import OccurrenceStore
+    >>> from plone.event.store import append_store, write_store
+    >>> path = os.path.join(tempfile.mkdtemp(), 'occurrences.bin')
+    >>> write_store(path, [('a', [1, 2, 3]), ('b', [4])])
+    >>> append_store(path, [('b', [5, 6])])
+    >>> with OccurrenceStore(path) as store:
+    ...     sorted(store), store['a'].tolist(), store['b'].tolist()
+    (['a', 'b'], [1, 2, 3], [5, 6])
+
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the store file.
+        """
+        self.path = path
+        with open(path, "rb") as fd:
+            self._mmap = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            count, index_offset, index_size = _read_header(self._view)
+            self._index = _read_index(self._view, index_offset, index_size)
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, uid):
+        return uid in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __getitem__(self, uid):
+        """Return the sequence of an event.
+
+        :returns: A memoryview of the mapped file with format 'i'. On big
+                  endian platforms, a byteswapped copy as array.
+        """
+        offset, length = self._index[uid]
+        view = self._view[offset : offset + length * 4]
+        if not _NATIVE:
+            values = array("i")
+            values.frombytes(view)
+            values.byteswap()
+            return values
+        return view.cast("i")
+
+    def get(self, uid, default=None):
+        if uid not in self._index:
+            return default
+        return self[uid]
+
+    def close(self):
+        """Close the mapping.
+
+        :raises BufferError: If views returned by this store are still in use.
+        """
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _recurrence(event):
+    """Return the recurrence definition of a VEventRecord, with RDATE and
+    EXDATE values as wall times in the timezone of its start.
+    """
+    lines = [f"RRULE:{event.rrule}"] if event.rrule else []
+    tz = event.dtstart.tzinfo
+    for name, values in (("RDATE", event.rdate), ("EXDATE", event.exdate)):
+        if values:
+            dates = ",".join(format_datetime(it.astimezone(tz)) for it in values)
+            lines.append(f"{name}:{dates}")
+    return "\n".join(lines)
+
+
+def event_sequences(stream, limits=None, skip_invalid=False):
+    """Generate the (uid, sequence) tuples of the events of an RFC5545
+    calendar for write_store and append_store. Events without UID or DTSTART
+    are skipped.
+
+    :param stream: Binary file object, bytes or iterable of bytes chunks, see
+                   plone.event.ical.read_events.
+    :param limits: Optional IRecurrenceLimits for the occurrences per event.
+    :param skip_invalid: Skip events with invalid property values instead of
+                         raising a ValueError.
+    :type skip_invalid: boolean
+
+    >>> from plone.event.store import event_sequences
+    >>> data = b'''BEGIN:VCALENDAR
+    ... BEGIN:VEVENT
+    ... UID:a1
+    ... DTSTART;TZID=Europe/Vienna:20100101T000000
+    ... RRULE:FREQ=DAILY;INTERVAL=10;COUNT=3
+    ... END:VEVENT
+    ... END:VCALENDAR
+    ... '''
+    >>> [(uid, values.tolist()) for uid, values in event_sequences(data)]
+    [('a1', [1076762820, 1076777220, 1076791620])]
+
+    """
+    for event in read_events(stream, skip_invalid=skip_invalid):
+        if event.uid is None or event.dtstart is None:
+            continue
+        duration = event.duration
+        if duration is None and event.dtend is not None:
+            duration = event.dtend - event.dtstart
+        yield event.uid, recurrence_int_array(
+            event.dtstart,
+            recrule=_recurrence(event),
+            duration=duration,
+            limits=limits,
+        )
+
+
+def main(argv=None):
+    """Console script ``plone-event-store``: write a new occurrence store
+    from the events of iCalendar files, add them to an existing one with
+    ``--append`` or compact one with ``--compact``.
+
+    :param argv: Command line arguments, without the program name. Defaults
+                 to sys.argv.
+    :type argv: list
+    """
+    parser = argparse.ArgumentParser(
+        prog="plone-event-store",
+        description="Rebuild, append to or compact an occurrence store.",
+    )
+    parser.add_argument("store", help="Path of the store file.")
+    parser.add_argument(
+        "files", nargs="*", help="iCalendar files, - for the standard input."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--append",
+        action="store_true",
+        help="Add or replace the events in the store instead of rebuilding it.",
+    )
+    mode.add_argument(
+        "--compact",
+        action="store_true",
+        help="Remove replaced sequences from the store.",
+    )
+    parser.add_argument(
+        "--skip-invalid",
+        action="store_true",
+        help="Skip events with invalid values instead of stopping.",
+    )
+    args = parser.parse_args(argv)
+    if args.compact:
+        if args.files:
+            parser.error("--compact doesn't read iCalendar files.")
+        compact_store(args.store)
+        return
+
+    def events():
+        for name in args.files:
+            if name == "-":
+                yield from event_sequences(sys.stdin.buffer, None, args.skip_invalid)
+                continue
+            with open(name, "rb") as fd:
+                yield from event_sequences(fd, None, args.skip_invalid)
+
+    if args.append:
+        append_store(args.store, events())
+    else:
+        write_store(args.store, events())
@@ -56,3 +56,221 @@ class TestAdapters(unittest.TestCase):
         del acc.start
         self.assertTrue(hasattr(acc, "start") is False)
         self.assertTrue(hasattr(obj, "start") is False)
+
+    def test_event_snapshot(self):
+        from datetime import timedelta
+        from plone.event.adapters import EventSnapshot
+
+        obj = MockObject()
+        tz = pytz.timezone("Europe/Vienna")
+        obj.title = "Event"
+        obj.start = datetime(2012, 12, 12, 10, 0, tzinfo=tz)
+        obj.end = datetime(2012, 12, 12, 12, 0, tzinfo=tz)
+        zope.interface.alsoProvides(obj, IEvent)
+
+        snapshot = EventSnapshot(obj)
+        self.assertTrue(IEventAccessor.providedBy(snapshot))
+        self.assertIs(snapshot.context, obj)
+        self.assertEqual(snapshot.title, "Event")
+        self.assertEqual(snapshot.start, obj.start)
+        self.assertEqual(snapshot.duration, timedelta(hours=2))
+        # Attributes the context doesn't have are missing, like on the
+        # accessor.
+        self.assertFalse(hasattr(snapshot, "location"))
+
+        # The values are read once.
+        obj.title = "Changed"
+        self.assertEqual(snapshot.title, "Event")
+        self.assertEqual(EventSnapshot(IEventAccessor(obj)).title, "Changed")
+
+        with self.assertRaises(AttributeError):
+            snapshot.title = "Other"
+        with self.assertRaises(AttributeError):
+            del snapshot.title
+        with self.assertRaises(AttributeError):
+            snapshot.other = True
+
+        # Without start, there's no duration.
+        del obj.start
+        self.assertFalse(hasattr(EventSnapshot(obj), "duration"))
+
+    def test_event_snapshots(self):
+        from plone.event.adapters import event_snapshots
+        from plone.event.adapters import EventSnapshot
+
+        objs = []
+        for it in range(5):
+            obj = MockObject()
+            obj.uid = str(it)
+            obj.start = obj.end = datetime(2012, 12, 12, 10, it)
+            zope.interface.alsoProvides(obj, IEvent)
+            objs.append(obj)
+        accessor = IEventAccessor(objs[0])
+
+        snapshots = event_snapshots(objs + [accessor])
+        self.assertEqual([it.uid for it in snapshots], ["0", "1", "2", "3", "4", "0"])
+        self.assertTrue(all(isinstance(it, EventSnapshot) for it in snapshots))
+        self.assertIs(snapshots[-1].context, objs[0])
+
+        self.assertRaises(TypeError, event_snapshots, [MockObject()])
+
+        # Contexts without registered adapter, which conform to
+        # IEventAccessor.
+        class Conforming:
+            def __conform__(self, iface):
+                if iface is IEventAccessor:
+                    return accessor
+
+        snapshots = event_snapshots([Conforming(), Conforming()])
+        self.assertEqual([it.uid for it in snapshots], ["0", "0"])
+
+    def test_recurrence_support(self):
+        from datetime import timedelta
+        from plone.event.adapters import invalidate_occurrence_cache
+        from plone.event.adapters import occurrence_cache
+        from plone.event.interfaces import IEventRecurrence
+        from plone.event.interfaces import IOccurrence
+        from plone.event.interfaces import IRecurrenceSupport
+        from plone.event.recurrence import recurrence_sequence_ical
+        from unittest import mock
+
+        self.addCleanup(invalidate_occurrence_cache)
+        tz = pytz.timezone("Europe/Vienna")
+        obj = MockObject()
+        obj.uid = "a1"
+        obj.title = "Daily"
+        obj.last_modified = datetime(2013, 5, 1, tzinfo=pytz.utc)
+        obj.start = tz.localize(datetime(2013, 6, 3, 9, 0))
+        obj.end = tz.localize(datetime(2013, 6, 3, 10, 0))
+        obj.recurrence = "RRULE:FREQ=DAILY;COUNT=10"
+        zope.interface.alsoProvides(obj, IEvent, IEventRecurrence)
+        range_start = tz.localize(datetime(2013, 6, 5))
+        range_end = tz.localize(datetime(2013, 6, 8))
+
+        with mock.patch(
+            "plone.event.adapters.recurrence_sequence_ical",
+            wraps=recurrence_sequence_ical,
+        ) as sequence:
+            occurrences = IRecurrenceSupport(obj).occurrences(range_start, range_end)
+            self.assertEqual(
+                [it.start for it in occurrences],
+                [tz.localize(datetime(2013, 6, day, 9, 0)) for day in (5, 6, 7)],
+            )
+            self.assertTrue(all(IOccurrence.providedBy(it) for it in occurrences))
+            self.assertEqual(
+                occurrences[0].end - occurrences[0].start, timedelta(hours=1)
+            )
+            self.assertEqual(occurrences[0].title, "Daily")
+            self.assertEqual(sequence.call_count, 1)
+
+            # Repeated views of the same range are cached.
+            again = IRecurrenceSupport(obj).occurrences(range_start, range_end)
+            self.assertEqual(
+                [it.start for it in again], [it.start for it in occurrences]
+            )
+            self.assertEqual(sequence.call_count, 1)
+            IRecurrenceSupport(obj).occurrences(range_start, range_end + timedelta(1))
+            self.assertEqual(sequence.call_count, 2)
+
+            # Modified events are calculated again.
+            obj.recurrence = "RRULE:FREQ=DAILY;INTERVAL=2;COUNT=10"
+            obj.last_modified = datetime(2013, 5, 2, tzinfo=pytz.utc)
+            occurrences = IRecurrenceSupport(obj).occurrences(range_start, range_end)
+            self.assertEqual(sequence.call_count, 3)
+            self.assertEqual([it.start.day for it in occurrences], [5, 7])
+
+            # Without last_modified, nothing is cached.
+            del obj.last_modified
+            size = len(occurrence_cache)
+            IRecurrenceSupport(obj).occurrences(range_start, range_end)
+            IRecurrenceSupport(obj).occurrences(range_start, range_end)
+            self.assertEqual(sequence.call_count, 5)
+            self.assertEqual(len(occurrence_cache), size)
+
+        self.assertEqual(invalidate_occurrence_cache("a1"), 3)
+        self.assertEqual(len(occurrence_cache), 0)
+
+    def test_recurrence_support_truncated(self):
+        from plone.event.adapters import invalidate_occurrence_cache
+        from plone.event.adapters import occurrence_cache
+        from plone.event.interfaces import IEventRecurrence
+        from plone.event.interfaces import IRecurrenceLimits
+        from plone.event.interfaces import IRecurrenceSupport
+        from plone.event.recurrence import RecurrenceLimits
+        from zope.component import getSiteManager
+
+        self.addCleanup(invalidate_occurrence_cache)
+        obj = MockObject()
+        obj.uid = "c1"
+        obj.last_modified = datetime(2013, 5, 1, tzinfo=pytz.utc)
+        obj.start = obj.end = datetime(2013, 6, 3, 9, 0, tzinfo=pytz.utc)
+        obj.recurrence = "RRULE:FREQ=DAILY;COUNT=10"
+        zope.interface.alsoProvides(obj, IEvent, IEventRecurrence)
+
+        registry = getSiteManager()
+        limits = RecurrenceLimits(max_occurrences=3)
+        registry.registerUtility(limits, IRecurrenceLimits)
+        self.addCleanup(registry.unregisterUtility, limits, IRecurrenceLimits)
+
+        # Sequences cut off by the limits aren't cached.
+        self.assertEqual(len(IRecurrenceSupport(obj).occurrences()), 3)
+        self.assertEqual(len(occurrence_cache), 0)
+
+        # Other limits apply to the next call.
+        limits.max_occurrences = 20
+        self.assertEqual(len(IRecurrenceSupport(obj).occurrences()), 10)
+        self.assertEqual(len(occurrence_cache), 1)
+
+    def test_occurrence_offsets(self):
+        from array import array
+        from datetime import timedelta
+        from plone.event.adapters import invalidate_occurrence_cache
+        from plone.event.adapters import occurrence_cache
+        from plone.event.interfaces import IEventRecurrence
+        from plone.event.interfaces import IRecurrenceSupport
+
+        self.addCleanup(invalidate_occurrence_cache)
+        tz = pytz.timezone("Europe/Vienna")
+        obj = MockObject()
+        obj.uid = "b1"
+        obj.title = "Across DST"
+        obj.last_modified = datetime(2013, 3, 1, tzinfo=pytz.utc)
+        obj.start = tz.localize(datetime(2013, 3, 29, 9, 0))
+        obj.end = tz.localize(datetime(2013, 3, 29, 10, 30))
+        obj.recurrence = "RRULE:FREQ=DAILY;COUNT=4"
+        zope.interface.alsoProvides(obj, IEvent, IEventRecurrence)
+
+        occurrences = IRecurrenceSupport(obj).occurrences()
+        # The wall time and the UTC offset follow the DST change.
+        self.assertEqual(
+            [it.start for it in occurrences],
+            [tz.localize(datetime(2013, 3, day, 9, 0)) for day in (29, 30, 31)]
+            + [tz.localize(datetime(2013, 4, 1, 9, 0))],
+        )
+        self.assertEqual(
+            [str(it.start.utcoffset()) for it in occurrences],
+            ["1:00:00", "1:00:00", "2:00:00", "2:00:00"],
+        )
+        self.assertEqual(
+            [it.end - it.start for it in occurrences], [timedelta(minutes=90)] * 4
+        )
+
+        # Occurrences only store the series and the offset of the start.
+        first, last = occurrences[0], occurrences[-1]
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertIs(first._series, last._series)
+        self.assertEqual(last._offset, 3 * 86400 - 3600)
+        self.assertEqual(first.parent.context, obj)
+        self.assertEqual(last.title, "Across DST")
+        self.assertFalse(hasattr(first, "_other"))
+        self.assertFalse(hasattr(first, "location"))
+
+        # The cache keeps the offsets as integer array.
+        (value,) = occurrence_cache._data.values()
+        self.assertIsInstance(value[2], array)
+
+        # Without duration, occurrences end at their start.
+        del obj.end
+        obj.last_modified = datetime(2013, 3, 2, tzinfo=pytz.utc)
+        occurrences = IRecurrenceSupport(obj).occurrences()
+        self.assertEqual(occurrences[2].end, occurrences[2].start)
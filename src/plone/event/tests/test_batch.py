@@ -0,0 +1,91 @@
+from datetime import datetime
+from datetime import timedelta
+
+import unittest
+
+
+def events():
+    import pytz
+
+    at = pytz.timezone("Europe/Vienna")
+    for cnt in range(50):
+        start = at.localize(datetime(2013, 1, 1, 10, 0) + timedelta(days=cnt))
+        recrule = f"RRULE:FREQ=DAILY;INTERVAL={cnt % 5 + 1};COUNT=20"
+        yield start, recrule, timedelta(hours=cnt % 3)
+    yield datetime(2013, 3, 1), None, None
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        from plone.event.recurrence import recurrence_int_sequence
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        self.from_ = datetime(2013, 2, 1)
+        self.until = datetime(2013, 3, 31)
+        self.expected = [
+            list(
+                recurrence_int_sequence(
+                    recurrence_sequence_ical(
+                        start,
+                        recrule=recrule,
+                        from_=self.from_,
+                        until=self.until,
+                        duration=duration,
+                    )
+                )
+            )
+            for start, recrule, duration in events()
+        ]
+
+    def test_inline(self):
+        from plone.event.batch import expand_many
+
+        res = list(expand_many(events(), self.from_, self.until, workers=1))
+        self.assertEqual([index for index, _ in res], list(range(51)))
+        self.assertEqual([list(ints) for _, ints in res], self.expected)
+
+    def test_executor_ordered(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from plone.event.batch import expand_many
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            res = list(
+                expand_many(
+                    events(),
+                    self.from_,
+                    self.until,
+                    workers=3,
+                    chunksize=4,
+                    executor=executor,
+                )
+            )
+        self.assertEqual([index for index, _ in res], list(range(51)))
+        self.assertEqual([list(ints) for _, ints in res], self.expected)
+
+    def test_process_pool_unordered(self):
+        from plone.event.batch import expand_many
+
+        res = dict(
+            expand_many(
+                events(),
+                self.from_,
+                self.until,
+                workers=2,
+                chunksize=8,
+                ordered=False,
+            )
+        )
+        self.assertEqual(sorted(res), list(range(51)))
+        self.assertEqual([list(res[index]) for index in range(51)], self.expected)
+
+    def test_limits(self):
+        from plone.event.batch import expand_many
+        from plone.event.recurrence import RecurrenceLimits
+
+        limits = RecurrenceLimits(max_occurrences=3)
+        res = list(
+            expand_many(events(), self.from_, self.until, workers=1, limits=limits)
+        )
+        self.assertEqual(
+            [list(ints) for _, ints in res], [it[:3] for it in self.expected]
+        )
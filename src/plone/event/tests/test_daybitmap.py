@@ -0,0 +1,134 @@
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+
+import random
+import unittest
+
+
+class TestDayBitmap(unittest.TestCase):
+    def test_random_sets(self):
+        from plone.event.daybitmap import DayBitmap
+
+        rand = random.Random(12)
+        for _ in range(50):
+            sets = []
+            bitmaps = []
+            for _ in range(2):
+                days = set()
+                bitmap = DayBitmap()
+                for _ in range(rand.randint(0, 20)):
+                    first = rand.randint(-10000, 10000)
+                    last = first + rand.choice([0, 1, 30, 5000])
+                    days.update(range(first, last + 1))
+                    bitmap.add_range(first, last)
+                sets.append(days)
+                bitmaps.append(bitmap)
+            a, b = bitmaps
+            self.assertEqual(list(a), sorted(sets[0]))
+            self.assertEqual(len(a), len(sets[0]))
+            self.assertEqual(list(a | b), sorted(sets[0] | sets[1]))
+            self.assertEqual(list(a & b), sorted(sets[0] & sets[1]))
+            self.assertEqual(list(a - b), sorted(sets[0] - sets[1]))
+            first = rand.randint(-12000, 12000)
+            last = first + rand.randint(0, 9000)
+            expected = sorted(it for it in sets[0] if first <= it <= last)
+            self.assertEqual(a.days(first, last), expected)
+            self.assertEqual(a.any(first, last), bool(expected))
+            self.assertEqual(first in a, first in sets[0])
+
+    def test_dates(self):
+        from plone.event.daybitmap import DayBitmap
+        from plone.event.daybitmap import occurrence_days
+
+        bitmap = DayBitmap([date(1969, 12, 31), datetime(2027, 6, 1, 23, 59)])
+        self.assertEqual(bitmap.dates(), [date(1969, 12, 31), date(2027, 6, 1)])
+        self.assertIn(date(2027, 6, 1), bitmap)
+        self.assertEqual(DayBitmap().dates(), [])
+
+        # Like datetimes, dates end at midnight and don't cover the end day.
+        for start in (date(2027, 5, 3), datetime(2027, 5, 3)):
+            days = occurrence_days([start], timedelta(days=1))
+            self.assertEqual(days.dates(), [date(2027, 5, 3)])
+        days = occurrence_days([date(2027, 5, 3)], timedelta(days=3))
+        self.assertEqual(
+            days.dates(), [date(2027, 5, 3), date(2027, 5, 4), date(2027, 5, 5)]
+        )
+        days = occurrence_days([date(2027, 5, 3)], timedelta(hours=2))
+        self.assertEqual(days.dates(), [date(2027, 5, 3)])
+
+
+class TestDayIndex(unittest.TestCase):
+    def test_occurrence_days(self):
+        from plone.event.daybitmap import occurrence_days
+
+        days = occurrence_days(
+            [datetime(2027, 1, 1, 22, 0), datetime(2027, 1, 10, 0, 0)],
+            duration=timedelta(days=1),
+        )
+        # The second occurrence ends at midnight.
+        self.assertEqual(
+            days.dates(),
+            [
+                date(2027, 1, 1),
+                date(2027, 1, 2),
+                date(2027, 1, 10),
+            ],
+        )
+
+    def test_recurrence(self):
+        from plone.event.daybitmap import DayIndex
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        index = DayIndex()
+        index.index_event(
+            "weekly",
+            recurrence_sequence_ical(
+                at.localize(datetime(2027, 1, 4, 10, 0)),
+                recrule="RRULE:FREQ=WEEKLY;COUNT=52",
+            ),
+            categories=["Work"],
+        )
+        index.index_event(
+            "daily",
+            recurrence_sequence_ical(
+                at.localize(datetime(2027, 3, 1, 10, 0)),
+                recrule="RRULE:FREQ=DAILY;COUNT=10",
+            ),
+            categories=["Work", "Sport"],
+        )
+        dates = index.dates(date(2027, 1, 1), date(2027, 12, 31))
+        self.assertEqual(len(dates), 52 + 10 - 2)
+        self.assertEqual(
+            index.dates(
+                date(2027, 1, 1),
+                date(2027, 12, 31),
+                categories=["Work", "Sport"],
+                operator="and",
+            ),
+            [date(2027, 3, 1) + timedelta(days=it) for it in range(10)],
+        )
+        self.assertEqual(
+            len(index.dates(date(2027, 1, 1), date(2027, 12, 31), ["Work"])),
+            60,
+        )
+        self.assertEqual(index.dates(date(2027, 1, 1), date(2027, 12, 31), []), [])
+
+        index.remove("daily")
+        self.assertEqual(
+            len(index.dates(date(2027, 1, 1), date(2027, 12, 31))),
+            52,
+        )
+        self.assertEqual(
+            index.dates(date(2027, 1, 1), date(2027, 12, 31), ["Sport"]), []
+        )
+        # Replacing an event.
+        index.index_event("weekly", [date(2027, 2, 2)], categories=["Sport"])
+        self.assertEqual(
+            index.dates(date(2027, 1, 1), date(2027, 12, 31)), [date(2027, 2, 2)]
+        )
+        self.assertEqual(index.bitmap("Work").dates(), [])
+        self.assertEqual(len(index), 1)
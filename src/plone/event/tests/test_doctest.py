@@ -11,9 +11,27 @@ DOCFILES = [
     "utils.rst",
 ]
 DOCMODS = [
+    "plone.event.adapters",
+    "plone.event.cache",
+    "plone.event.daybitmap",
+    "plone.event.freebusy",
+    "plone.event.ical",
+    "plone.event.index",
+    "plone.event.recurrence",
+    "plone.event.simplerule",
+    "plone.event.store",
+    "plone.event.tzbackend",
+    "plone.event.tztable",
     "plone.event.utils",
 ]
 
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    pass
+else:
+    DOCMODS.append("plone.event.vectorized")
+
 
 def test_suite():
     suite = unittest.TestSuite()
@@ -0,0 +1,133 @@
+from datetime import datetime
+from datetime import timedelta
+
+import random
+import unittest
+
+
+def brute_force(sources, from_, until):
+    from plone.event.recurrence import recurrence_sequence_ical
+    from plone.event.utils import utc
+
+    periods = []
+    for start, recrule, duration in sources:
+        if not duration:
+            continue
+        for occurrence in recurrence_sequence_ical(
+            start, recrule=recrule, from_=from_, until=until, duration=duration
+        ):
+            occurrence = utc(occurrence)
+            if occurrence < utc(until):
+                periods.append((occurrence, occurrence + duration))
+    periods.sort()
+    result = []
+    for start, end in periods:
+        if result and start <= result[-1][1]:
+            result[-1][1] = max(result[-1][1], end)
+        else:
+            result.append([start, end])
+    return [(max(start, utc(from_)), min(end, utc(until))) for start, end in result]
+
+
+class TestFreeBusy(unittest.TestCase):
+    def test_random(self):
+        from plone.event.freebusy import busy_periods
+
+        import pytz
+
+        rand = random.Random(13)
+        zones = [pytz.timezone("Europe/Vienna"), pytz.timezone("America/New_York")]
+        rules = [
+            None,
+            "RRULE:FREQ=DAILY",
+            "RRULE:FREQ=HOURLY;INTERVAL=5",
+            "RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=20",
+        ]
+        for _ in range(30):
+            tz = rand.choice(zones)
+            sources = [
+                (
+                    tz.localize(
+                        datetime(2013, 3, 1, rand.randint(0, 23))
+                        + timedelta(days=rand.randint(0, 40))
+                    ),
+                    rand.choice(rules),
+                    timedelta(minutes=rand.choice([0, 30, 90, 600])),
+                )
+                for _ in range(rand.randint(0, 6))
+            ]
+            from_ = tz.localize(datetime(2013, 3, 20))
+            until = tz.localize(datetime(2013, 4, 5))
+            self.assertEqual(
+                list(busy_periods(sources, from_, until)),
+                brute_force(sources, from_, until),
+            )
+
+    def test_dst_change(self):
+        # Around the DST change, the UTC times of an hourly rule aren't
+        # sorted.
+        from plone.event.freebusy import busy_periods
+
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        sources = [
+            (
+                at.localize(datetime(2013, 3, 30, 20, 30)),
+                "RRULE:FREQ=MINUTELY;INTERVAL=30",
+                timedelta(minutes=10),
+            ),
+            (at.localize(datetime(2013, 3, 31, 3, 0)), None, timedelta(minutes=5)),
+        ]
+        from_ = at.localize(datetime(2013, 3, 31))
+        until = at.localize(datetime(2013, 3, 31, 6))
+        result = list(busy_periods(sources, from_, until))
+        self.assertEqual(result, brute_force(sources, from_, until))
+        self.assertEqual(result, sorted(result))
+
+    def test_free_periods(self):
+        from plone.event.freebusy import free_periods
+
+        import pytz
+
+        sources = [
+            (datetime(2013, 6, 3, 9, 0), "RRULE:FREQ=DAILY;COUNT=2", timedelta(hours=1))
+        ]
+        self.assertEqual(
+            list(
+                free_periods(sources, datetime(2013, 6, 3), datetime(2013, 6, 4, 9, 30))
+            ),
+            [
+                (
+                    datetime(2013, 6, 3, tzinfo=pytz.utc),
+                    datetime(2013, 6, 3, 9, tzinfo=pytz.utc),
+                ),
+                (
+                    datetime(2013, 6, 3, 10, tzinfo=pytz.utc),
+                    datetime(2013, 6, 4, 9, tzinfo=pytz.utc),
+                ),
+            ],
+        )
+
+    def test_freebusy_lines(self):
+        from plone.event.freebusy import freebusy_lines
+
+        import pytz
+
+        start = datetime(2013, 6, 3, 9, 0, tzinfo=pytz.utc)
+        periods = [
+            (start + timedelta(days=day), start + timedelta(days=day, hours=1))
+            for day in range(10)
+        ]
+        lines = list(freebusy_lines(periods, per_line=4))
+        self.assertEqual(len(lines), 3)
+        for line in lines:
+            self.assertTrue(line.startswith("FREEBUSY:"))
+            for folded in line.split("\r\n"):
+                self.assertLessEqual(len(folded), 75)
+        unfolded = "".join(lines[0].split("\r\n "))
+        self.assertEqual(
+            unfolded.split(":", 1)[1].split(",")[0],
+            "20130603T090000Z/20130603T100000Z",
+        )
+        self.assertEqual(list(freebusy_lines([])), [])
@@ -0,0 +1,499 @@
+from datetime import datetime
+from datetime import timedelta
+from plone.event.interfaces import IEventAccessor
+from zope.interface import implementer
+
+import pytz
+import unittest
+
+
+@implementer(IEventAccessor)
+class Event:
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+STAMP = datetime(2013, 6, 1, tzinfo=pytz.utc)
+
+
+class TestIcal(unittest.TestCase):
+    def export(self, events, **kw):
+        from plone.event.ical import ical_chunks
+
+        data = b"".join(ical_chunks(events, stamp=STAMP, **kw))
+        return data.decode("utf-8").split("\r\n")
+
+    def test_event(self):
+        at = pytz.timezone("Europe/Vienna")
+        lines = self.export(
+            [
+                Event(
+                    uid="a1",
+                    title="Rock, Paper; Scissors",
+                    description="Line\nbreak",
+                    start=at.localize(datetime(2013, 6, 3, 9, 0)),
+                    end=at.localize(datetime(2013, 6, 3, 10, 30)),
+                    created=datetime(2013, 5, 1, 12, 0, tzinfo=pytz.utc),
+                    recurrence="RRULE:FREQ=DAILY;COUNT=3\nEXDATE:20130604T070000Z",
+                    location="Vienna",
+                    url="http://example.com/a1",
+                    subjects=["Tech", "Fun"],
+                    contact_name="John",
+                    contact_email="john@example.com",
+                    attendees=["Jane", "mailto:doe,jane;x@example.com"],
+                )
+            ]
+        )
+        start = lines.index("BEGIN:VEVENT")
+        self.assertEqual(
+            lines[start : lines.index("END:VEVENT") + 1],
+            [
+                "BEGIN:VEVENT",
+                "DTSTAMP:20130601T000000Z",
+                "UID:a1",
+                "CREATED:20130501T120000Z",
+                "DTSTART;TZID=Europe/Vienna:20130603T090000",
+                "DTEND;TZID=Europe/Vienna:20130603T103000",
+                "RRULE:FREQ=DAILY;COUNT=3",
+                "EXDATE:20130604T070000Z",
+                "SUMMARY:Rock\\, Paper\\; Scissors",
+                "DESCRIPTION:Line\\nbreak",
+                "LOCATION:Vienna",
+                "URL:http://example.com/a1",
+                "CATEGORIES:Tech,Fun",
+                "CONTACT:John\\, john@example.com",
+                "ATTENDEE:Jane",
+                "ATTENDEE:mailto:doe,jane;x@example.com",
+                "END:VEVENT",
+            ],
+        )
+        # The timezone is defined before it is used.
+        self.assertLess(lines.index("TZID:Europe/Vienna"), start)
+        self.assertIn("TZOFFSETTO:+0200", lines)
+        self.assertEqual(lines[-2:], ["END:VCALENDAR", ""])
+
+    def test_whole_day_and_open_end(self):
+        at = pytz.timezone("Europe/Vienna")
+        lines = self.export(
+            [
+                Event(
+                    uid="a",
+                    start=at.localize(datetime(2013, 6, 3)),
+                    end=at.localize(datetime(2013, 6, 4, 23, 59, 59)),
+                    whole_day=True,
+                ),
+                Event(
+                    uid="b",
+                    start=datetime(2013, 6, 3, 9, 0, tzinfo=pytz.utc),
+                    end=datetime(2013, 6, 3, 23, 59, 59, tzinfo=pytz.utc),
+                    open_end=True,
+                ),
+            ]
+        )
+        self.assertIn("DTSTART;VALUE=DATE:20130603", lines)
+        self.assertIn("DTEND;VALUE=DATE:20130605", lines)
+        self.assertIn("DTSTART:20130603T090000Z", lines)
+        self.assertFalse([it for it in lines if it.startswith("DTEND:")])
+        self.assertNotIn("BEGIN:VTIMEZONE", lines)
+
+    def test_zoneinfo_dst_roundtrip(self):
+        from datetime import timezone
+        from plone.event.ical import read_events
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        import zoneinfo
+
+        vienna = zoneinfo.ZoneInfo("Europe/Vienna")
+        events = [
+            Event(
+                uid="a",
+                start=datetime(2013, 3, 29, 9, 0, tzinfo=vienna),
+                end=datetime(2013, 3, 29, 10, 0, tzinfo=vienna),
+                recurrence="RRULE:FREQ=DAILY;COUNT=4",
+            ),
+            # UTC and unnamed fixed offsets are written in UTC.
+            Event(uid="b", start=datetime(2013, 3, 29, 9, 0, tzinfo=timezone.utc)),
+            Event(
+                uid="c",
+                start=datetime(2013, 3, 29, 9, 0, tzinfo=timezone(timedelta(hours=3))),
+            ),
+        ]
+        lines = self.export(events)
+        self.assertIn("DTSTART;TZID=Europe/Vienna:20130329T090000", lines)
+        self.assertIn("DTEND;TZID=Europe/Vienna:20130329T100000", lines)
+        self.assertIn("DTSTART:20130329T090000Z", lines)
+        self.assertIn("DTSTART:20130329T060000Z", lines)
+        self.assertEqual(lines.count("BEGIN:VTIMEZONE"), 1)
+        start = lines.index("DTSTART:20130331T020000")
+        self.assertEqual(
+            lines[start - 1 : start + 5],
+            [
+                "BEGIN:DAYLIGHT",
+                "DTSTART:20130331T020000",
+                "TZOFFSETFROM:+0100",
+                "TZOFFSETTO:+0200",
+                "TZNAME:CEST",
+                "END:DAYLIGHT",
+            ],
+        )
+
+        # The occurrences keep their wall time across the DST change.
+        event = next(read_events("\r\n".join(lines).encode("utf-8")))
+        occurrences = list(recurrence_sequence_ical(event.dtstart, recrule=event.rrule))
+        self.assertEqual([it.hour for it in occurrences], [9, 9, 9, 9])
+        self.assertEqual(
+            [it.utcoffset() for it in occurrences],
+            [timedelta(hours=hours) for hours in (1, 1, 2, 2)],
+        )
+
+    def test_timezones_written_once(self):
+        at = pytz.timezone("Europe/Vienna")
+        ny = pytz.timezone("America/New_York")
+        events = [
+            Event(uid=str(it), start=tz.localize(datetime(2013, 6, 3, 9, 0)))
+            for it, tz in enumerate([at, ny, at, ny])
+        ]
+        lines = self.export(events)
+        self.assertEqual(lines.count("TZID:Europe/Vienna"), 1)
+        self.assertEqual(lines.count("TZID:America/New_York"), 1)
+        self.assertEqual(lines.count("BEGIN:VEVENT"), 4)
+
+    def test_calendar(self):
+        from plone.event.interfaces import ICalendarAccessor
+
+        @implementer(ICalendarAccessor)
+        class Calendar:
+            uid = "cal"
+            title = "Events"
+            description = None
+            timezone = "Europe/Vienna"
+
+            def items(self):
+                return [
+                    Event(
+                        uid="a",
+                        start=pytz.timezone(self.timezone).localize(
+                            datetime(2013, 6, 3, 9, 0)
+                        ),
+                    )
+                ]
+
+        lines = self.export(None, calendar=Calendar())
+        self.assertEqual(
+            lines[:6],
+            [
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                "PRODID:-//Plone.org//NONSGML plone.event//EN",
+                "X-WR-CALNAME:Events",
+                "X-WR-RELCALID:cal",
+                "X-WR-TIMEZONE:Europe/Vienna",
+            ],
+        )
+        self.assertEqual(lines.count("TZID:Europe/Vienna"), 1)
+        self.assertLess(lines.index("TZID:Europe/Vienna"), lines.index("BEGIN:VEVENT"))
+
+    def test_folding(self):
+        lines = self.export(
+            [
+                Event(
+                    uid="a",
+                    title="\xe4" * 100,
+                    start=datetime(2013, 6, 3, 9, 0, tzinfo=pytz.utc),
+                )
+            ]
+        )
+        for line in lines:
+            self.assertLessEqual(len(line.encode("utf-8")), 75)
+        start = lines.index("UID:a") + 2
+        end = lines.index("END:VEVENT")
+        unfolded = lines[start] + "".join(it[1:] for it in lines[start + 1 : end])
+        self.assertEqual(unfolded, "SUMMARY:" + "\xe4" * 100)
+
+    def test_streaming(self):
+        from plone.event.ical import ical_chunks
+
+        read = []
+
+        def events():
+            for it in range(1000):
+                read.append(it)
+                yield Event(
+                    uid=str(it),
+                    start=datetime(2013, 6, 3, tzinfo=pytz.utc) + timedelta(hours=it),
+                )
+
+        chunks = ical_chunks(events(), stamp=STAMP, chunk_size=1024)
+        first = next(chunks)
+        self.assertGreaterEqual(len(first), 1024)
+        # Only the events of the first chunk were read.
+        self.assertLess(len(read), 20)
+        rest = list(chunks)
+        self.assertEqual(len(read), 1000)
+        self.assertTrue(all(len(it) >= 1024 for it in rest[:-1]))
+        data = first + b"".join(rest)
+        self.assertEqual(data.count(b"BEGIN:VEVENT"), 1000)
+        self.assertTrue(data.endswith(b"END:VCALENDAR\r\n"))
+
+    def test_adapts_events(self):
+        from plone.event.ical import ical_chunks
+        from plone.event.interfaces import IEvent
+        from zope.configuration import xmlconfig
+        from zope.interface import alsoProvides
+
+        import plone.event
+        import zope.component
+
+        context = xmlconfig.file("meta.zcml", zope.component)
+        xmlconfig.file("configure.zcml", zope.component, context=context)
+        xmlconfig.file("configure.zcml", plone.event, context=context)
+
+        class Content:
+            start = datetime(2013, 6, 3, 9, 0, tzinfo=pytz.utc)
+            title = "Adapted"
+
+        obj = Content()
+        alsoProvides(obj, IEvent)
+        data = b"".join(ical_chunks([obj], stamp=STAMP))
+        self.assertIn(b"SUMMARY:Adapted\r\n", data)
+
+
+CALENDAR = b"""BEGIN:VCALENDAR\r
+VERSION:2.0\r
+BEGIN:VTIMEZONE\r
+TZID:Europe/Vienna\r
+BEGIN:STANDARD\r
+DTSTART:19701025T030000\r
+TZOFFSETFROM:+0200\r
+TZOFFSETTO:+0100\r
+END:STANDARD\r
+END:VTIMEZONE\r
+BEGIN:VEVENT\r
+UID:a\r
+SUMMARY:First\\nline\r
+DTSTART;VALUE=DATE:20130603\r
+DTEND;VALUE=DATE:20130604\r
+CATEGORIES:Tech,Rock\\, Pop\r
+CATEGORIES:Fun\r
+ATTENDEE;CN="Doe; John";ROLE=CHAIR:mailto:john@example.com\r
+RDATE;VALUE=PERIOD:20130610T090000Z/20130610T100000Z\r
+GEO:48.2;16.37\r
+SEQUENCE:2\r
+X-CUSTOM:Custom\\, value\r
+BEGIN:VALARM\r
+ACTION:DISPLAY\r
+DESCRIPTION:Alarm\r
+END:VALARM\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:b\r
+DTSTART;TZID="Unknown/Zone":20130603T090000\r
+DESCRIPTION:Lo\r
+ ng\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+class TestReadEvents(unittest.TestCase):
+    def test_read(self):
+        from plone.event.ical import read_events
+        from plone.event.interfaces import IVEvent
+        from plone.event.utils import default_timezone
+
+        first, second = list(read_events(CALENDAR))
+        tz = pytz.timezone(default_timezone())
+        self.assertTrue(IVEvent.providedBy(first))
+        self.assertEqual(first.uid, "a")
+        self.assertEqual(first.summary, "First\nline")
+        # Dates are localized in the default timezone and flagged.
+        self.assertEqual(first.dtstart, tz.localize(datetime(2013, 6, 3)))
+        self.assertTrue(first.whole_day)
+        self.assertEqual(first.categories, ["Tech", "Rock, Pop", "Fun"])
+        self.assertEqual(first.attendee, ["mailto:john@example.com"])
+        self.assertEqual(first.rdate, [datetime(2013, 6, 10, 9, 0, tzinfo=pytz.utc)])
+        self.assertEqual(first.geo, (48.2, 16.37))
+        self.assertEqual(first.seq, 2)
+        self.assertEqual(first.x_prop, {"X-CUSTOM": "Custom, value"})
+        # The description of the alarm is skipped.
+        self.assertIsNone(first.description)
+        self.assertEqual(first.exdate, [])
+        self.assertIsNone(first.rrule)
+
+        self.assertEqual(second.description, "Long")
+        self.assertFalse(second.whole_day)
+        # Unknown timezones are localized in the default timezone.
+        self.assertEqual(second.dtstart, tz.localize(datetime(2013, 6, 3, 9, 0)))
+
+    def test_roundtrip(self):
+        from plone.event.ical import ical_chunks
+        from plone.event.ical import read_events
+
+        at = pytz.timezone("Europe/Vienna")
+        events = [
+            Event(
+                uid=str(it),
+                title="\xe4" * 50 + ", " + str(it),
+                start=at.localize(datetime(2013, 3, 30, 9, 0) + timedelta(days=it)),
+                end=at.localize(datetime(2013, 3, 30, 10, 0) + timedelta(days=it)),
+                recurrence="RRULE:FREQ=WEEKLY;COUNT=4",
+                subjects=["a,b", "c"],
+            )
+            for it in range(3)
+        ]
+        result = list(read_events(ical_chunks(events, stamp=STAMP)))
+        self.assertEqual([it.uid for it in result], ["0", "1", "2"])
+        for event, record in zip(events, result):
+            self.assertEqual(record.summary, event.title)
+            self.assertEqual(record.dtstart, event.start)
+            self.assertEqual(record.dtstart.tzinfo.zone, "Europe/Vienna")
+            self.assertEqual(record.dtend, event.end)
+            self.assertEqual(record.dtstamp, STAMP)
+            self.assertEqual(record.rrule, "FREQ=WEEKLY;COUNT=4")
+            self.assertEqual(record.categories, ["a,b", "c"])
+
+    def test_whole_day(self):
+        from plone.event.ical import read_events
+
+        data = b"""BEGIN:VCALENDAR\r
+BEGIN:VEVENT\r
+UID:date\r
+DTSTART:20130603\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:midnight\r
+DTSTART:20130603T000000Z\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+        date_event, midnight = read_events(data)
+        self.assertTrue(date_event.whole_day)
+        self.assertEqual(date_event.dtstart.date().isoformat(), "2013-06-03")
+        # A timed event at midnight isn't a whole day event.
+        self.assertFalse(midnight.whole_day)
+        self.assertEqual(midnight.dtstart, datetime(2013, 6, 3, tzinfo=pytz.utc))
+
+    def test_vtimezone(self):
+        from plone.event.ical import read_events
+        from plone.event.ical import VTimezone
+
+        data = b"""BEGIN:VCALENDAR\r
+BEGIN:VTIMEZONE\r
+TZID:W. Europe Standard Time\r
+BEGIN:STANDARD\r
+DTSTART:16011028T030000\r
+RRULE:FREQ=YEARLY;BYDAY=-1SU;BYMONTH=10\r
+TZOFFSETFROM:+0200\r
+TZOFFSETTO:+0100\r
+END:STANDARD\r
+BEGIN:DAYLIGHT\r
+DTSTART:16010325T020000\r
+RRULE:FREQ=YEARLY;BYDAY=-1SU;BYMONTH=3;UNTIL=20371231T230000Z\r
+TZOFFSETFROM:+0100\r
+TZOFFSETTO:+0200\r
+END:DAYLIGHT\r
+END:VTIMEZONE\r
+BEGIN:VEVENT\r
+UID:summer\r
+DTSTART;TZID="W. Europe Standard Time":20130603T090000\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:winter\r
+DTSTART;TZID="W. Europe Standard Time":20131203T090000\r
+RDATE;TZID="W. Europe Standard Time":20131027T023000\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+        for kw in ({}, {"workers": 2, "chunksize": 1}):
+            summer, winter = read_events(data, **kw)
+            self.assertIsInstance(summer.dtstart.tzinfo, VTimezone)
+            self.assertEqual(
+                summer.dtstart, datetime(2013, 6, 3, 7, 0, tzinfo=pytz.utc)
+            )
+            self.assertEqual(
+                winter.dtstart, datetime(2013, 12, 3, 8, 0, tzinfo=pytz.utc)
+            )
+            # Ambiguous wall times are resolved to standard time, like pytz
+            # does.
+            self.assertEqual(
+                [it.astimezone(pytz.utc) for it in winter.rdate],
+                [datetime(2013, 10, 27, 1, 30, tzinfo=pytz.utc)],
+            )
+
+    def test_unknown_timezone(self):
+        from plone.event.ical import read_events
+        from plone.event.utils import default_timezone
+        from plone.event.utils import invalidate_timezone_cache
+
+        invalidate_timezone_cache()
+        data = CALENDAR.replace(b"Unknown/Zone", b"Other/Unknown")
+        with self.assertLogs("plone.event", "WARNING") as logged:
+            _, event = read_events(data)
+        self.assertIn("'Other/Unknown'", logged.output[0])
+        tz = pytz.timezone(default_timezone())
+        self.assertEqual(event.dtstart, tz.localize(datetime(2013, 6, 3, 9, 0)))
+
+    def test_incremental(self):
+        from plone.event.ical import read_events
+
+        read = []
+
+        def lines():
+            for line in CALENDAR.splitlines(keepends=True):
+                read.append(line)
+                yield line
+
+        events = read_events(lines())
+        self.assertEqual(next(events).uid, "a")
+        self.assertFalse([it for it in read if b"UID:b" in it])
+        self.assertEqual(next(events).uid, "b")
+
+    def test_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from plone.event.ical import ical_chunks
+        from plone.event.ical import read_events
+
+        events = [
+            Event(uid=str(it), start=datetime(2013, 6, 3, tzinfo=pytz.utc))
+            for it in range(50)
+        ]
+        data = b"".join(ical_chunks(events, stamp=STAMP))
+        with ThreadPoolExecutor(2) as executor:
+            result = list(read_events(data, chunksize=7, executor=executor))
+        self.assertEqual([it.uid for it in result], [str(it) for it in range(50)])
+
+    def test_workers(self):
+        from plone.event.ical import read_events
+
+        result = list(read_events(CALENDAR, workers=2, chunksize=1))
+        self.assertEqual([it.uid for it in result], ["a", "b"])
+        self.assertEqual(result[0].categories, ["Tech", "Rock, Pop", "Fun"])
+
+    def test_invalid(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from plone.event.ical import read_events
+
+        data = CALENDAR.replace(
+            b"DTSTART;VALUE=DATE:20130603", b"DTSTART;VALUE=DATE:2013060"
+        )
+        with self.assertRaises(ValueError) as raised:
+            list(read_events(data))
+        message = str(raised.exception)
+        self.assertIn("DTSTART", message)
+        self.assertIn("'a'", message)
+        self.assertIn("DTSTART;VALUE=DATE:2013060", message)
+
+        # Invalid events can be skipped, so the others are still read.
+        with self.assertLogs("plone.event", "WARNING") as logged:
+            result = list(read_events(data, skip_invalid=True))
+        self.assertEqual([it.uid for it in result], ["b"])
+        self.assertIn("DTSTART", logged.output[0])
+
+        with ThreadPoolExecutor(2) as executor:
+            with self.assertRaises(ValueError):
+                list(read_events(data, chunksize=1, executor=executor))
+            with self.assertLogs("plone.event", "WARNING"):
+                result = list(
+                    read_events(data, chunksize=1, executor=executor, skip_invalid=True)
+                )
+        self.assertEqual([it.uid for it in result], ["b"])
@@ -0,0 +1,103 @@
+from datetime import datetime
+from datetime import timedelta
+
+import random
+import unittest
+
+
+class TestOccurrenceIndex(unittest.TestCase):
+    def brute_force(self, events, start, end):
+        return sorted(
+            (it[0], it[1], uid)
+            for uid, intervals in events.items()
+            for it in intervals
+            if it[0] <= end and it[1] >= start
+        )
+
+    def test_random(self):
+        from plone.event import index as index_module
+        from plone.event.index import OccurrenceIndex
+
+        rand = random.Random(42)
+        index = OccurrenceIndex()
+        events = {}
+        orig_threshold = index_module.REBUILD_THRESHOLD
+        index_module.REBUILD_THRESHOLD = 50
+        try:
+            for step in range(2000):
+                uid = rand.randint(0, 300)
+                if rand.random() < 0.3:
+                    index.remove(uid)
+                    events.pop(uid, None)
+                else:
+                    intervals = []
+                    for _ in range(rand.randint(0, 5)):
+                        start = rand.randint(0, 10000)
+                        intervals.append((start, start + rand.randint(0, 500)))
+                    index.add(uid, intervals)
+                    events[uid] = intervals
+                if step % 10 == 0:
+                    start = rand.randint(-100, 10500)
+                    end = start + rand.choice([0, 0, 10, 1000])
+                    self.assertEqual(
+                        sorted(index.occurrences(start, end)),
+                        self.brute_force(events, start, end),
+                    )
+                    self.assertEqual(
+                        index.overlapping(start, end),
+                        {it[2] for it in self.brute_force(events, start, end)},
+                    )
+        finally:
+            index_module.REBUILD_THRESHOLD = orig_threshold
+        self.assertEqual(len(index), len(events))
+
+    def test_closed_intervals(self):
+        from plone.event.index import OccurrenceIndex
+        from plone.event.utils import dt2int
+
+        index = OccurrenceIndex()
+        index.add("a", [(datetime(2011, 11, 11, 10), datetime(2011, 11, 11, 12))])
+        self.assertEqual(index.at(datetime(2011, 11, 11, 12)), {"a"})
+        self.assertEqual(index.at(dt2int(datetime(2011, 11, 11, 10))), {"a"})
+        self.assertEqual(index.at(datetime(2011, 11, 11, 12, 1)), set())
+        self.assertEqual(
+            index.overlapping(datetime(2011, 11, 11, 12), datetime(2011, 11, 12)),
+            {"a"},
+        )
+
+    def test_index_event(self):
+        from plone.event.index import OccurrenceIndex
+        from plone.event.recurrence import recurrence_int_sequence
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        index = OccurrenceIndex()
+        index.index_event(
+            "monthly",
+            recurrence_int_sequence(
+                recurrence_sequence_ical(
+                    at.localize(datetime(2011, 1, 31, 23, 0)),
+                    recrule="RRULE:FREQ=MONTHLY;BYMONTHDAY=-1;COUNT=12",
+                )
+            ),
+            duration=timedelta(hours=3),
+        )
+        # Occurrences crossing the end of months and the year.
+        self.assertEqual(index.at(at.localize(datetime(2012, 1, 1, 1, 0))), {"monthly"})
+        self.assertEqual(index.at(at.localize(datetime(2011, 5, 1, 1, 0))), {"monthly"})
+        self.assertEqual(index.at(at.localize(datetime(2011, 5, 2, 1, 0))), set())
+
+    def test_replace_and_clear(self):
+        from plone.event.index import OccurrenceIndex
+
+        index = OccurrenceIndex()
+        index.add("a", [(10, 20)])
+        index.add("a", [(30, 40)])
+        self.assertEqual(index.at(15), set())
+        self.assertEqual(index.at(35), {"a"})
+        self.assertIn("a", index)
+        index.clear()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.at(35), set())
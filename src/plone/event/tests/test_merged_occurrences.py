@@ -0,0 +1,82 @@
+from datetime import datetime
+from datetime import timedelta
+
+import random
+import unittest
+
+
+class TestMergedOccurrences(unittest.TestCase):
+    def sources(self, rand, tz, number):
+        rules = [
+            None,
+            "RRULE:FREQ=DAILY;COUNT=30",
+            "RRULE:FREQ=HOURLY;INTERVAL=7;COUNT=100",
+            "RRULE:FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20131231",
+        ]
+        return [
+            (
+                tz.localize(
+                    datetime(2013, 3, 1, rand.randint(0, 23))
+                    + timedelta(days=rand.randint(0, 60))
+                ),
+                rand.choice(rules),
+                timedelta(hours=rand.choice([0, 1, 5])),
+            )
+            for _ in range(number)
+        ]
+
+    def test_same_as_sorted_expansion(self):
+        from plone.event.recurrence import merged_occurrences
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.utils import utc
+
+        import pytz
+
+        rand = random.Random(14)
+        for tz in [pytz.timezone("Europe/Vienna"), pytz.timezone("UTC")]:
+            sources = self.sources(rand, tz, 20)
+            for kw in [
+                {},
+                {"from_": tz.localize(datetime(2013, 3, 30))},
+                {"until": tz.localize(datetime(2013, 4, 15))},
+                {
+                    "from_": tz.localize(datetime(2013, 3, 30)),
+                    "until": tz.localize(datetime(2013, 4, 15)),
+                },
+            ]:
+                expected = sorted(
+                    (utc(occurrence), index, occurrence)
+                    for index, (start, recrule, duration) in enumerate(sources)
+                    for occurrence in recurrence_sequence_ical(
+                        start, recrule=recrule, duration=duration, **kw
+                    )
+                )
+                expected = [(index, date) for _, index, date in expected]
+                result = list(merged_occurrences(sources, **kw))
+                self.assertEqual(result, expected)
+                self.assertEqual(
+                    list(merged_occurrences(sources, count=10, **kw)), expected[:10]
+                )
+
+    def test_lazy(self):
+        # Unlimited sequences aren't expanded.
+        from plone.event.recurrence import merged_occurrences
+        from plone.event.recurrence import RecurrenceLimits
+
+        sources = [
+            (datetime(2013, 1, 1) + timedelta(minutes=it), "RRULE:FREQ=DAILY", None)
+            for it in range(1000)
+        ]
+        result = list(
+            merged_occurrences(
+                sources,
+                from_=datetime(2014, 1, 1),
+                count=5,
+                limits=RecurrenceLimits(),
+            )
+        )
+        self.assertEqual(len(result), 5)
+        self.assertEqual(
+            [date.replace(tzinfo=None) for _, date in result],
+            [datetime(2014, 1, 1) + timedelta(minutes=it) for it in range(5)],
+        )
@@ -0,0 +1,155 @@
+from datetime import datetime
+
+import asyncio
+import unittest
+
+
+async def collect(sequence):
+    return [date async for date in sequence]
+
+
+class TestAsyncRecurrenceSequence(unittest.TestCase):
+    def test_same_as_sync(self):
+        from plone.event.recurrence import async_recurrence_sequence_ical
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        import pytz
+
+        start = pytz.timezone("Europe/Vienna").localize(datetime(2013, 3, 1, 9, 0))
+        for kw in [
+            {},
+            {"recrule": "RRULE:FREQ=DAILY;COUNT=200"},
+            {
+                "recrule": "RRULE:FREQ=HOURLY;INTERVAL=5;COUNT=300",
+                "from_": datetime(2013, 3, 20),
+                "until": datetime(2013, 4, 10),
+            },
+        ]:
+            for chunksize in [1, 7, 1000]:
+                result = asyncio.run(
+                    collect(
+                        async_recurrence_sequence_ical(start, chunksize=chunksize, **kw)
+                    )
+                )
+                self.assertEqual(result, list(recurrence_sequence_ical(start, **kw)))
+
+    def test_timedelta(self):
+        from plone.event.recurrence import async_recurrence_sequence_timedelta
+        from plone.event.recurrence import recurrence_sequence_timedelta
+
+        kw = {
+            "start": datetime(2013, 3, 1, 9, 0),
+            "delta": 3,
+            "until": datetime(2013, 12, 31),
+        }
+        result = asyncio.run(
+            collect(async_recurrence_sequence_timedelta(chunksize=10, **kw))
+        )
+        self.assertEqual(result, list(recurrence_sequence_timedelta(**kw)))
+
+    def test_truncated(self):
+        from plone.event.recurrence import async_recurrence_sequence_ical
+        from plone.event.recurrence import RecurrenceLimits
+
+        sequence = async_recurrence_sequence_ical(
+            datetime(2013, 3, 1, 9, 0),
+            recrule="RRULE:FREQ=DAILY",
+            limits=RecurrenceLimits(max_occurrences=10),
+        )
+        self.assertEqual(len(asyncio.run(collect(sequence))), 10)
+        self.assertTrue(sequence.truncated)
+
+    def test_event_loop_not_blocked(self):
+        from plone.event.recurrence import async_recurrence_sequence_ical
+        from plone.event.recurrence import RecurrenceLimits
+
+        async def run():
+            ticks = 0
+            done = False
+
+            async def ticker():
+                nonlocal ticks
+                while not done:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            task = asyncio.create_task(ticker())
+            sequence = async_recurrence_sequence_ical(
+                datetime(2013, 3, 1, 9, 0),
+                recrule="RRULE:FREQ=HOURLY",
+                limits=RecurrenceLimits(max_occurrences=5000),
+                chunksize=100,
+            )
+            result = await collect(sequence)
+            done = True
+            await task
+            return result, ticks
+
+        result, ticks = asyncio.run(run())
+        self.assertEqual(len(result), 5000)
+        # At least one tick per chunk.
+        self.assertGreaterEqual(ticks, 50)
+
+    def test_cancel(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from plone.event.recurrence import async_recurrence_sequence_ical
+        from plone.event.recurrence import RecurrenceLimits
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        sequence = async_recurrence_sequence_ical(
+            datetime(2013, 3, 1, 9, 0),
+            recrule="RRULE:FREQ=MINUTELY",
+            limits=RecurrenceLimits(max_occurrences=10**7),
+            chunksize=10**7,
+            timeslice=None,
+            executor=executor,
+        )
+
+        async def run():
+            task = asyncio.create_task(collect(sequence))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        # The running chunk stops after the next occurrence.
+        future = executor.submit(lambda: None)
+        self.assertIsNone(future.result(timeout=5))
+        executor.shutdown()
+        self.assertFalse(sequence.truncated)
+        self.assertEqual(asyncio.run(collect(sequence)), [])
+
+    def test_aclose(self):
+        from plone.event.recurrence import async_recurrence_sequence_ical
+
+        async def run():
+            sequence = async_recurrence_sequence_ical(
+                datetime(2013, 3, 1, 9, 0),
+                recrule="RRULE:FREQ=DAILY;COUNT=100",
+                chunksize=10,
+            )
+            first = [await sequence.__anext__() for _ in range(3)]
+            await sequence.aclose()
+            return first, await collect(sequence)
+
+        first, rest = asyncio.run(run())
+        self.assertEqual(first[-1], datetime(2013, 3, 3, 9, 0, tzinfo=first[0].tzinfo))
+        self.assertEqual(rest, [])
+
+    def test_timeslice(self):
+        from plone.event.recurrence import _take
+
+        import threading
+
+        stopped = threading.Event()
+        chunk, exhausted = _take(iter(range(10)), 3, None, stopped)
+        self.assertEqual((chunk, exhausted), ([0, 1, 2], False))
+        chunk, exhausted = _take(iter(range(2)), 3, None, stopped)
+        self.assertEqual((chunk, exhausted), ([0, 1], True))
+        # An elapsed time slice returns after the first occurrence.
+        chunk, exhausted = _take(iter(range(10)), 3, -1, stopped)
+        self.assertEqual(chunk, [0])
+        stopped.set()
+        chunk, exhausted = _take(iter(range(10)), 3, None, stopped)
+        self.assertEqual(chunk, [0])
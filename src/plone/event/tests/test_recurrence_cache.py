@@ -0,0 +1,75 @@
+import unittest
+
+
+class TestRecurrenceCache(unittest.TestCase):
+    def setUp(self):
+        from plone.event.recurrence import ruleset_cache
+
+        ruleset_cache.clear()
+
+    def tearDown(self):
+        from plone.event.recurrence import ruleset_cache
+
+        ruleset_cache.clear()
+
+    def test_cache_hit(self):
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.recurrence import ruleset_cache
+
+        start = datetime(2011, 11, 23, 10, 0)
+        recrule = "RRULE:FREQ=DAILY;INTERVAL=2;COUNT=5"
+        first = list(recurrence_sequence_ical(start, recrule=recrule))
+        second = list(recurrence_sequence_ical(start, recrule=recrule))
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 5)
+        self.assertEqual(ruleset_cache.misses, 1)
+        self.assertEqual(ruleset_cache.hits, 1)
+
+    def test_cache_key_includes_start(self):
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.recurrence import ruleset_cache
+
+        recrule = "RRULE:FREQ=DAILY;COUNT=3\nEXDATE:20111124T000000"
+        res1 = list(
+            recurrence_sequence_ical(datetime(2011, 11, 23, 10), recrule=recrule)
+        )
+        res2 = list(
+            recurrence_sequence_ical(datetime(2011, 11, 23, 12), recrule=recrule)
+        )
+        self.assertEqual(ruleset_cache.misses, 2)
+        self.assertEqual([it.hour for it in res1], [10, 10])
+        self.assertEqual([it.hour for it in res2], [12, 12])
+
+    def test_invalidate(self):
+        from datetime import datetime
+        from plone.event.recurrence import compile_recurrence
+        from plone.event.recurrence import invalidate_recurrence_cache
+        from plone.event.recurrence import ruleset_cache
+
+        start = datetime(2011, 11, 23)
+        compile_recurrence(start, "RRULE:FREQ=DAILY;COUNT=3")
+        compile_recurrence(start, "RRULE:FREQ=WEEKLY;COUNT=3")
+        self.assertEqual(len(ruleset_cache), 2)
+        self.assertEqual(invalidate_recurrence_cache("RRULE:FREQ=DAILY;COUNT=3"), 1)
+        self.assertEqual(len(ruleset_cache), 1)
+        self.assertEqual(invalidate_recurrence_cache(), 1)
+        self.assertEqual(len(ruleset_cache), 0)
+
+    def test_eviction(self):
+        from datetime import datetime
+        from datetime import timedelta
+        from plone.event.recurrence import compile_recurrence
+        from plone.event.recurrence import ruleset_cache
+        from plone.event.recurrence import RULESET_CACHE_SIZE
+
+        ruleset_cache.resize(2)
+        try:
+            start = datetime(2011, 11, 23)
+            for cnt in range(3):
+                compile_recurrence(start + timedelta(days=cnt), "FREQ=DAILY")
+            self.assertEqual(len(ruleset_cache), 2)
+            self.assertEqual(ruleset_cache.evictions, 1)
+        finally:
+            ruleset_cache.resize(RULESET_CACHE_SIZE)
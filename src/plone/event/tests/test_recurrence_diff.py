@@ -0,0 +1,79 @@
+from datetime import datetime
+from unittest import mock
+
+import unittest
+
+
+class TestRecurrenceDiff(unittest.TestCase):
+    def setUp(self):
+        import pytz
+
+        self.tz = pytz.timezone("Europe/Vienna")
+        self.start = self.tz.localize(datetime(2011, 11, 7, 10, 0))
+        self.rule = "RRULE:FREQ=WEEKLY;COUNT=10"
+
+    def assertSameAsExpansion(self, old, new, **kw):
+        from plone.event.recurrence import recurrence_diff
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        old_seq = set(recurrence_sequence_ical(self.start, old, **kw))
+        new_seq = set(recurrence_sequence_ical(self.start, new, **kw))
+        added, removed = recurrence_diff(self.start, old, new, **kw)
+        self.assertEqual(added, sorted(new_seq - old_seq))
+        self.assertEqual(removed, sorted(old_seq - new_seq))
+        return added, removed
+
+    @mock.patch("plone.event.recurrence.recurrence_sequence_ical")
+    def test_exdate_added(self, expand):
+        from plone.event.recurrence import recurrence_diff
+
+        added, removed = recurrence_diff(
+            self.start,
+            self.rule,
+            self.rule + "\nEXDATE:20111114T000000,20111121T000000",
+        )
+        self.assertEqual(added, [])
+        self.assertEqual(
+            removed,
+            [
+                self.tz.localize(datetime(2011, 11, 14, 10, 0)),
+                self.tz.localize(datetime(2011, 11, 21, 10, 0)),
+            ],
+        )
+        # Only the changed dates were checked.
+        self.assertFalse(expand.called)
+
+    def test_exdate_and_rdate_changes(self):
+        old = self.rule + "\nRDATE:20111109T000000\nEXDATE:20111114T000000"
+        for new in [
+            self.rule,
+            self.rule + "\nRDATE:20111109T000000",
+            self.rule + "\nRDATE:20111110T000000\nEXDATE:20111121T000000",
+            # Excluding a date, which isn't an occurrence.
+            old + ",20111115T000000",
+            # Adding a date, which already is an occurrence.
+            self.rule + "\nRDATE:20111109T000000,20111128T000000"
+            "\nEXDATE:20111114T000000",
+        ]:
+            self.assertSameAsExpansion(old, new)
+            self.assertSameAsExpansion(new, old)
+
+    def test_timespan(self):
+        added, removed = self.assertSameAsExpansion(
+            self.rule,
+            self.rule + "\nEXDATE:20111114T000000,20111212T000000",
+            from_=self.tz.localize(datetime(2011, 12, 1)),
+            until=self.tz.localize(datetime(2011, 12, 31)),
+        )
+        self.assertEqual(removed, [self.tz.localize(datetime(2011, 12, 12, 10, 0))])
+
+    def test_rrule_changed(self):
+        added, removed = self.assertSameAsExpansion(
+            self.rule, "RRULE:FREQ=WEEKLY;COUNT=12\nEXDATE:20111114T000000"
+        )
+        self.assertEqual(len(added), 2)
+        self.assertEqual(len(removed), 1)
+
+    def test_no_rule(self):
+        self.assertSameAsExpansion(None, "RDATE:20111109T000000")
+        self.assertSameAsExpansion("RDATE:20111109T000000", "")
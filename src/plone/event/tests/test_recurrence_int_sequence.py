@@ -12,3 +12,61 @@ class TestRecurrenceIntSequence(unittest.TestCase):
         dt2int.return_value = "a"
         res = [a for a in recurrence_int_sequence(sequence)]
         self.assertEqual(res, ["a", "a", "a"])
+
+
+class TestRecurrenceIntArray(unittest.TestCase):
+    def assertSameAsSequence(self, start, recrule, **kw):
+        from plone.event.recurrence import recurrence_int_array
+        from plone.event.recurrence import recurrence_int_sequence
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        expected = list(
+            recurrence_int_sequence(
+                recurrence_sequence_ical(start, recrule=recrule, **kw)
+            )
+        )
+        result = recurrence_int_array(start, recrule=recrule, **kw)
+        self.assertEqual(result.typecode, "i")
+        self.assertEqual(list(result), expected)
+
+    def test_same_as_sequence(self):
+        from datetime import datetime
+        from datetime import timedelta
+
+        import pytz
+
+        for name in ["Europe/Vienna", "America/New_York", "UTC"]:
+            tz = pytz.timezone(name)
+            start = tz.localize(datetime(2011, 3, 1, 2, 30))
+            for recrule in [
+                None,
+                "RRULE:FREQ=DAILY;COUNT=100",
+                "RRULE:FREQ=HOURLY;INTERVAL=5;COUNT=500",
+                "RRULE:FREQ=MONTHLY;BYDAY=-1SU;COUNT=20",
+            ]:
+                self.assertSameAsSequence(start, recrule)
+                self.assertSameAsSequence(
+                    start,
+                    recrule,
+                    from_=tz.localize(datetime(2011, 3, 20)),
+                    until=tz.localize(datetime(2011, 11, 20)),
+                    duration=timedelta(hours=3),
+                )
+
+    def test_before_epoch(self):
+        from datetime import datetime
+
+        self.assertSameAsSequence(
+            datetime(1900, 2, 27, 23, 59), "RRULE:FREQ=DAILY;COUNT=3"
+        )
+
+    def test_overflow(self):
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_int_array
+
+        self.assertRaises(
+            OverflowError,
+            recurrence_int_array,
+            datetime(4100, 1, 1),
+            "RRULE:FREQ=DAILY;COUNT=3",
+        )
@@ -0,0 +1,143 @@
+import unittest
+
+
+class TestRecurrenceLimits(unittest.TestCase):
+    def test_max_occurrences(self):
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.recurrence import RecurrenceLimits
+
+        seq = recurrence_sequence_ical(
+            datetime(2011, 11, 23),
+            recrule="RRULE:FREQ=DAILY",
+            limits=RecurrenceLimits(max_occurrences=5),
+        )
+        self.assertEqual(len(list(seq)), 5)
+        self.assertTrue(seq.truncated)
+
+    def test_not_truncated(self):
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.recurrence import RecurrenceLimits
+
+        seq = recurrence_sequence_ical(
+            datetime(2011, 11, 23),
+            recrule="RRULE:FREQ=DAILY;COUNT=5",
+            limits=RecurrenceLimits(max_occurrences=5),
+        )
+        self.assertEqual(len(list(seq)), 5)
+        self.assertFalse(seq.truncated)
+
+    def test_max_occurrences_from(self):
+        # Occurrences before from_ don't count towards max_occurrences.
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.recurrence import RecurrenceLimits
+        from pytz import utc
+
+        res = list(
+            recurrence_sequence_ical(
+                datetime(2011, 11, 23),
+                recrule="RRULE:FREQ=DAILY",
+                from_=datetime(2011, 12, 1),
+                limits=RecurrenceLimits(max_occurrences=2),
+            )
+        )
+        self.assertEqual(
+            res,
+            [
+                datetime(2011, 12, 1, tzinfo=utc),
+                datetime(2011, 12, 2, tzinfo=utc),
+            ],
+        )
+
+    def test_max_candidates(self):
+        # Dates excluded by the until check count towards max_candidates,
+        # because they had to be calculated.
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.recurrence import RecurrenceLimits
+
+        seq = recurrence_sequence_ical(
+            datetime(2011, 11, 23),
+            recrule="RRULE:FREQ=DAILY",
+            limits=RecurrenceLimits(max_candidates=4),
+        )
+        self.assertEqual(len(list(seq)), 4)
+        self.assertTrue(seq.truncated)
+
+        seq = recurrence_sequence_ical(
+            datetime(2011, 11, 23),
+            recrule="RRULE:FREQ=DAILY;COUNT=4",
+            limits=RecurrenceLimits(max_candidates=4),
+        )
+        self.assertEqual(len(list(seq)), 4)
+        self.assertFalse(seq.truncated)
+
+    def test_timeout(self):
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.recurrence import RecurrenceLimits
+
+        seq = recurrence_sequence_ical(
+            datetime(2011, 11, 23),
+            recrule="RRULE:FREQ=DAILY",
+            limits=RecurrenceLimits(timeout=0),
+        )
+        self.assertEqual(list(seq), [])
+        self.assertTrue(seq.truncated)
+
+    def test_timedelta(self):
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_timedelta
+        from plone.event.recurrence import RecurrenceLimits
+
+        seq = recurrence_sequence_timedelta(
+            datetime(2011, 11, 23),
+            delta=60,
+            until=datetime(2012, 11, 23),
+            limits=RecurrenceLimits(max_occurrences=3),
+        )
+        # The start date and three more occurrences.
+        self.assertEqual(len(list(seq)), 4)
+        self.assertTrue(seq.truncated)
+
+    def test_utility(self):
+        from datetime import datetime
+        from plone.event.interfaces import IRecurrenceLimits
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.recurrence import RecurrenceLimits
+        from zope.component import getGlobalSiteManager
+
+        gsm = getGlobalSiteManager()
+        limits = RecurrenceLimits(max_occurrences=7)
+        gsm.registerUtility(limits, IRecurrenceLimits)
+        try:
+            res = list(
+                recurrence_sequence_ical(
+                    datetime(2011, 11, 23), recrule="RRULE:FREQ=DAILY"
+                )
+            )
+            self.assertEqual(len(res), 7)
+            # Explicitly passed limits take precedence.
+            res = list(
+                recurrence_sequence_ical(
+                    datetime(2011, 11, 23),
+                    recrule="RRULE:FREQ=DAILY",
+                    limits=RecurrenceLimits(max_occurrences=2),
+                )
+            )
+            self.assertEqual(len(res), 2)
+        finally:
+            gsm.unregisterUtility(limits, IRecurrenceLimits)
+
+    def test_default(self):
+        from datetime import datetime
+        from plone.event.recurrence import MAXCOUNT
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        seq = recurrence_sequence_ical(
+            datetime(2011, 11, 23), recrule="RRULE:FREQ=DAILY"
+        )
+        self.assertEqual(len(list(seq)), MAXCOUNT)
+        self.assertTrue(seq.truncated)
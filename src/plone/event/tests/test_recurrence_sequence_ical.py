@@ -217,3 +217,130 @@ RDATE:20111129T000000"""
         start = at.localize(datetime(2024, 4, 22, 14, 0))
         seq = list(recurrence_sequence_ical(start, recrule=recrule))
         self.assertEqual(len(seq), 5)
+
+    def test_recrule_from_without_until(self):
+        """Occurrences before from_ are skipped without counting them towards
+        MAXCOUNT.
+        """
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        start = datetime(2000, 1, 1, 10, 0)
+        recrule = "RRULE:FREQ=DAILY"
+        from_ = datetime(2020, 1, 1)
+        seq = recurrence_sequence_ical(start, recrule=recrule, from_=from_)
+        results = list(seq)
+        self.assertEqual(len(results), 1000)
+        self.assertEqual(results[0].replace(tzinfo=None), datetime(2020, 1, 1, 10))
+
+    def test_recrule_from_without_until_count(self):
+        """count is counted from the event's start."""
+        from datetime import datetime
+        from datetime import timedelta
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        start = datetime(2019, 12, 30, 10, 0)
+        recrule = "RRULE:FREQ=DAILY"
+        from_ = datetime(2020, 1, 1, 12, 0)
+        seq = recurrence_sequence_ical(start, recrule=recrule, from_=from_, count=5)
+        results = [it.replace(tzinfo=None) for it in seq]
+        self.assertEqual(
+            results,
+            [
+                datetime(2020, 1, 2, 10),
+                datetime(2020, 1, 3, 10),
+            ],
+        )
+
+        # With a duration, the occurrence reaching into from_ is included.
+        seq = recurrence_sequence_ical(
+            start,
+            recrule=recrule,
+            from_=from_,
+            count=5,
+            duration=timedelta(hours=3),
+        )
+        results = [it.replace(tzinfo=None) for it in seq]
+        self.assertEqual(results[0], datetime(2020, 1, 1, 10))
+        self.assertEqual(len(results), 3)
+
+    def test_seek_recurrence(self):
+        """Rules, which aren't simple rules, are started at their last period
+        before from_. The occurrences are the same as from the event's start.
+        """
+        from datetime import datetime
+        from datetime import timedelta
+        from plone.event.recurrence import compile_recurrence
+        from plone.event.recurrence import seek_recurrence
+
+        import itertools
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        start = datetime(1990, 8, 31, 18, 30)
+        from_ = at.localize(datetime(2013, 3, 31, 12, 0))
+        for recrule in (
+            "RRULE:FREQ=YEARLY;INTERVAL=3",
+            "RRULE:FREQ=YEARLY;BYMONTH=2,3",
+            "RRULE:FREQ=MONTHLY;INTERVAL=5",
+            "RRULE:FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1",
+            "RRULE:FREQ=WEEKLY;INTERVAL=3;WKST=SU",
+            "RRULE:FREQ=DAILY;INTERVAL=13;BYMINUTE=0,45",
+            "RRULE:FREQ=HOURLY;INTERVAL=7\nEXDATE:20130401T183000",
+            "RRULE:FREQ=MINUTELY;INTERVAL=997;UNTIL=20200101",
+        ):
+            dates = seek_recurrence(
+                at.localize(start), recrule, from_, timedelta(hours=2)
+            )
+            expected = (
+                date
+                for date in compile_recurrence(start, recrule)
+                if at.localize(date) + timedelta(hours=2) >= from_
+            )
+            self.assertEqual(
+                list(itertools.islice(dates, 50)),
+                list(itertools.islice(expected, 50)),
+                recrule,
+            )
+
+        # Without later period, with COUNT or several rules, the rule is
+        # calculated from the start.
+        for recrule in (
+            "RRULE:FREQ=YEARLY;INTERVAL=30",
+            "RRULE:FREQ=MONTHLY;COUNT=300",
+            "RRULE:FREQ=MONTHLY\nRRULE:FREQ=YEARLY;BYMONTH=1",
+            "RRULE:FREQ=MONTHLY\nEXRULE:FREQ=YEARLY",
+        ):
+            self.assertEqual(
+                list(
+                    itertools.islice(
+                        seek_recurrence(at.localize(start), recrule, from_), 5
+                    )
+                ),
+                list(
+                    itertools.islice(
+                        compile_recurrence(start, recrule).xafter(
+                            datetime(2013, 3, 31, 12), inc=True
+                        ),
+                        5,
+                    )
+                ),
+                recrule,
+            )
+
+    def test_recrule_from_without_until_timezone(self):
+        """from_ in another timezone than the event's start."""
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        ny = pytz.timezone("America/New_York")
+        start = at.localize(datetime(2013, 1, 1, 10, 0))
+        recrule = "RRULE:FREQ=DAILY;COUNT=10"
+        # 2013-01-05 03:30 in New York is 09:30 in Vienna.
+        from_ = ny.localize(datetime(2013, 1, 5, 3, 30))
+        results = list(recurrence_sequence_ical(start, recrule=recrule, from_=from_))
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[0], at.localize(datetime(2013, 1, 5, 10, 0)))
@@ -71,3 +71,120 @@ class TestRecurrenceSequenceTimedelta(unittest.TestCase):
         )
         results = [res for res in td]
         self.assertEqual(len(results), 21)
+
+
+class TestTimedeltaRecurrence(unittest.TestCase):
+    def step(self, start, delta, until, dst):
+        from plone.event.recurrence import _step_timedelta
+
+        return [start] + list(_step_timedelta(start, delta, until, None, dst))
+
+    def assertSameDates(self, first, second):
+        self.assertEqual(
+            [(it.replace(tzinfo=None), it.tzinfo) for it in first],
+            [(it.replace(tzinfo=None), it.tzinfo) for it in second],
+        )
+
+    def test_same_as_steps(self):
+        from datetime import datetime
+        from plone.event.recurrence import TimedeltaRecurrence
+        from plone.event.utils import DSTADJUST
+        from plone.event.utils import DSTAUTO
+        from plone.event.utils import DSTKEEP
+
+        import pytz
+
+        for zone in ["Europe/Vienna", "Australia/Lord_Howe", "Pacific/Apia", "UTC"]:
+            tz = pytz.timezone(zone)
+            start = tz.localize(datetime(2011, 3, 20, 1, 30))
+            until = tz.localize(datetime(2011, 11, 10))
+            for delta in [90, 1440, 1500]:
+                for dst in [DSTAUTO, DSTKEEP, DSTADJUST]:
+                    expected = self.step(start, delta, until, dst)
+                    recurrence = TimedeltaRecurrence(
+                        start, delta=delta, until=until, dst=dst
+                    )
+                    self.assertEqual(len(recurrence), len(expected))
+                    self.assertSameDates(list(recurrence), expected)
+                    self.assertSameDates(recurrence[::7], expected[::7])
+                    self.assertSameDates([recurrence[-1]], [expected[-1]])
+
+    def test_dst(self):
+        from datetime import datetime
+        from plone.event.recurrence import TimedeltaRecurrence
+        from plone.event.utils import DSTADJUST
+        from plone.event.utils import DSTKEEP
+
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        start = at.localize(datetime(2011, 3, 26, 8, 0))
+        until = at.localize(datetime(2011, 3, 28, 8, 0))
+        keep = TimedeltaRecurrence(start, delta=1440, until=until, dst=DSTKEEP)
+        self.assertEqual(len(keep), 2)
+        self.assertEqual(keep[1], at.localize(datetime(2011, 3, 27, 9, 0)))
+        adjust = TimedeltaRecurrence(start, delta=1440, until=until, dst=DSTADJUST)
+        self.assertEqual(len(adjust), 3)
+        self.assertEqual(adjust[1], at.localize(datetime(2011, 3, 27, 8, 0)))
+
+    def test_count(self):
+        from datetime import datetime
+        from plone.event.recurrence import TimedeltaRecurrence
+
+        start = datetime(2011, 11, 23)
+        until = datetime(2011, 11, 24)
+        self.assertEqual(len(TimedeltaRecurrence(start, 60, until)), 25)
+        self.assertEqual(len(TimedeltaRecurrence(start, 60, until, count=5)), 6)
+        self.assertEqual(len(TimedeltaRecurrence(start, 60)), 1)
+        self.assertEqual(len(TimedeltaRecurrence(start, 0, until)), 1)
+        self.assertEqual(len(TimedeltaRecurrence(start, 60, datetime(2011, 1, 1))), 1)
+        with self.assertRaises(IndexError):
+            TimedeltaRecurrence(start, 60, until)[25]
+
+    def test_large(self):
+        from datetime import datetime
+        from plone.event.recurrence import TimedeltaRecurrence
+
+        import pytz
+
+        recurrence = TimedeltaRecurrence(
+            datetime(2000, 1, 1), 1, datetime(9000, 1, 1, tzinfo=pytz.utc)
+        )
+        minutes = (datetime(9000, 1, 1) - datetime(2000, 1, 1)).days * 1440
+        self.assertEqual(len(recurrence), minutes + 1)
+        self.assertEqual(recurrence[-1], datetime(9000, 1, 1, tzinfo=pytz.utc))
+
+    def test_window(self):
+        from datetime import datetime
+        from plone.event.recurrence import TimedeltaRecurrence
+        from plone.event.utils import DSTADJUST
+        from plone.event.utils import utc
+
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        start = at.localize(datetime(2011, 1, 1, 8, 0))
+        until = at.localize(datetime(2013, 1, 1))
+        for delta, dst in [(45, None), (1440, DSTADJUST)]:
+            kw = {"dst": dst} if dst else {}
+            recurrence = TimedeltaRecurrence(start, delta, until, **kw)
+            first = at.localize(datetime(2011, 10, 29))
+            last = at.localize(datetime(2011, 10, 31, 8, 0))
+            self.assertSameDates(
+                recurrence.window(first, last),
+                [it for it in recurrence if utc(first) <= utc(it) <= utc(last)],
+            )
+
+    def test_unsupported_timezone(self):
+        from datetime import datetime
+        from dateutil import tz
+        from plone.event.recurrence import recurrence_sequence_timedelta
+        from plone.event.recurrence import TimedeltaRecurrence
+
+        start = datetime(2011, 11, 23, tzinfo=tz.gettz("Europe/Vienna"))
+        until = datetime(2011, 11, 24, tzinfo=tz.gettz("Europe/Vienna"))
+        with self.assertRaises(TypeError):
+            TimedeltaRecurrence(start, 60, until)
+        self.assertEqual(
+            len(list(recurrence_sequence_timedelta(start, delta=60, until=until))), 25
+        )
@@ -0,0 +1,136 @@
+from datetime import datetime
+from datetime import timedelta
+
+import itertools
+import unittest
+
+RULES = [
+    "RRULE:FREQ=DAILY",
+    "RRULE:FREQ=DAILY;INTERVAL=3;COUNT=20",
+    "RRULE:FREQ=DAILY;UNTIL=20130302T000000",
+    "RRULE:FREQ=DAILY;INTERVAL=2;BYDAY=MO,WE,FR",
+    "RRULE:FREQ=DAILY;INTERVAL=4;BYDAY=FR;UNTIL=20140101",
+    "FREQ=DAILY;BYDAY=SA,SU;COUNT=7",
+    "RRULE:FREQ=WEEKLY",
+    "RRULE:FREQ=WEEKLY;INTERVAL=2;COUNT=10",
+    "RRULE:FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20130415T000000Z",
+    "RRULE:FREQ=WEEKLY;INTERVAL=3;BYDAY=SU,TU,SA;WKST=SU",
+    "RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO;WKST=TH;COUNT=5",
+]
+
+
+class TestSimpleRule(unittest.TestCase):
+    def _rruleset(self, start, recrule):
+        from dateutil import rrule
+
+        rset = rrule.rrulestr(recrule, dtstart=start, forceset=True, ignoretz=True)
+        rset.rdate(start)
+        return rset
+
+    def test_unsupported(self):
+        from plone.event.simplerule import SimpleRule
+
+        start = datetime(2013, 1, 10, 10, 0)
+        for recrule in [
+            "RRULE:FREQ=MONTHLY",
+            "RRULE:FREQ=WEEKLY;BYDAY=1MO",
+            "RRULE:FREQ=DAILY;COUNT=3;UNTIL=20130302T000000",
+            "RRULE:FREQ=DAILY\nRDATE:20130302T000000",
+            "RRULE:FREQ=DAILY;BYHOUR=10",
+            "EXRULE:FREQ=DAILY",
+        ]:
+            self.assertIsNone(SimpleRule.from_string(start, recrule), recrule)
+        self.assertIsNone(
+            SimpleRule.from_string(start.replace(microsecond=1), "FREQ=DAILY")
+        )
+
+    def test_same_as_dateutil(self):
+        from plone.event.recurrence import normalize_recrule
+        from plone.event.simplerule import SimpleRule
+
+        for recrule in RULES:
+            for days in range(0, 8):
+                start = datetime(2013, 1, 10, 10, 0) + timedelta(days=days)
+                recrule = normalize_recrule(start, recrule)
+                rule = SimpleRule.from_string(start, recrule)
+                rset = self._rruleset(start, recrule)
+                expected = list(itertools.islice(rset, 200))
+                self.assertEqual(list(itertools.islice(rule, 200)), expected)
+                if len(expected) < 200:
+                    self.assertEqual(rule.count(), len(expected))
+                for after in [start - timedelta(days=1), start, expected[-1]]:
+                    before = after + timedelta(days=30)
+                    for inc in (True, False):
+                        self.assertEqual(
+                            rule.between(after, before, inc=inc),
+                            rset.between(after, before, inc=inc),
+                        )
+                        self.assertEqual(
+                            list(rule.xafter(after, count=5, inc=inc)),
+                            list(itertools.islice(rset.xafter(after, inc=inc), 5)),
+                        )
+
+    def test_never_matching(self):
+        """A daily rule, which never hits one of the BYDAY days, contains only
+        the start date.
+        """
+        from plone.event.simplerule import SimpleRule
+
+        start = datetime(2013, 1, 10, 10, 0)  # a Thursday
+        rule = SimpleRule.from_string(start, "FREQ=DAILY;INTERVAL=7;BYDAY=FR")
+        self.assertEqual(list(rule), [start])
+        self.assertEqual(list(rule.xafter(start)), [])
+
+    def test_random_access(self):
+        from plone.event.simplerule import SimpleRule
+
+        start = datetime(2000, 1, 3, 8, 0)
+        rule = SimpleRule.from_string(start, "RRULE:FREQ=WEEKLY;BYDAY=MO,WE")
+        self.assertEqual(rule[1001], datetime(2009, 8, 5, 8, 0))
+        self.assertIn(datetime(2009, 8, 17, 8, 0), rule)
+        self.assertNotIn(datetime(2009, 8, 18, 8, 0), rule)
+        self.assertNotIn(datetime(2009, 8, 17, 9, 0), rule)
+        self.assertEqual(
+            rule.between(datetime(2020, 1, 1), datetime(2020, 1, 10)),
+            [
+                datetime(2020, 1, 1, 8, 0),
+                datetime(2020, 1, 6, 8, 0),
+                datetime(2020, 1, 8, 8, 0),
+            ],
+        )
+        self.assertEqual(rule[-1].year, 9999)
+        self.assertEqual(rule[2:4], [rule[2], rule[3]])
+        self.assertRaises(IndexError, lambda: rule[len(rule)])
+
+    def test_recurrence_sequence_ical(self):
+        """The simple rule engine gives the same results as python-dateutil."""
+        from plone.event import recurrence
+        from plone.event.recurrence import recurrence_sequence_ical
+
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        start = at.localize(datetime(2010, 10, 1, 2, 30))
+        from_ = at.localize(datetime(2011, 3, 1))
+        until = at.localize(datetime(2011, 4, 1))
+
+        def sequences():
+            recurrence.invalidate_recurrence_cache()
+            for recrule in RULES:
+                yield list(recurrence_sequence_ical(start, recrule=recrule))
+                yield list(
+                    recurrence_sequence_ical(start, recrule=recrule, from_=from_)
+                )
+                yield list(
+                    recurrence_sequence_ical(
+                        start, recrule=recrule, from_=from_, until=until
+                    )
+                )
+
+        simple = list(sequences())
+        recurrence.SIMPLE_RULES = False
+        try:
+            self.assertEqual(list(sequences()), simple)
+        finally:
+            recurrence.SIMPLE_RULES = True
+            recurrence.invalidate_recurrence_cache()
@@ -0,0 +1,177 @@
+from array import array
+
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestOccurrenceStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "occurrences.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_write_and_read(self):
+        from plone.event.store import OccurrenceStore
+        from plone.event.store import write_store
+
+        events = {
+            "a": array("i", [1077760031, 1077761471]),
+            "b": array("i"),
+            "\xfcml\xe4ut": array("i", range(1000)),
+        }
+        write_store(self.path, events.items())
+        store = OccurrenceStore(self.path)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(set(store), set(events))
+        for uid, values in events.items():
+            view = store[uid]
+            self.assertIsInstance(view, memoryview)
+            self.assertEqual(view.format, "i")
+            self.assertEqual(view.tolist(), values.tolist())
+            view.release()
+        self.assertIsNone(store.get("missing"))
+        self.assertNotIn("missing", store)
+        store.close()
+
+    def test_recurrence_int_array(self):
+        from datetime import datetime
+        from plone.event.recurrence import recurrence_int_array
+        from plone.event.store import OccurrenceStore
+        from plone.event.store import write_store
+
+        values = recurrence_int_array(
+            datetime(2011, 11, 11, 11, 0), recrule="RRULE:FREQ=WEEKLY;COUNT=10"
+        )
+        write_store(self.path, [("event", values)])
+        with OccurrenceStore(self.path) as store:
+            self.assertEqual(store["event"].tolist(), values.tolist())
+
+    def test_append_and_compact(self):
+        from plone.event.store import append_store
+        from plone.event.store import compact_store
+        from plone.event.store import OccurrenceStore
+
+        # Creates the file.
+        append_store(self.path, [("a", [1, 2]), ("b", [3])])
+        old = OccurrenceStore(self.path)
+        append_store(self.path, [("b", [4, 5, 6]), ("c", [7])])
+        size = os.path.getsize(self.path)
+
+        # A store opened before sees the old state.
+        self.assertEqual(sorted(old), ["a", "b"])
+        self.assertEqual(old["b"].tolist(), [3])
+
+        with OccurrenceStore(self.path) as store:
+            self.assertEqual(
+                {uid: store[uid].tolist() for uid in store},
+                {"a": [1, 2], "b": [4, 5, 6], "c": [7]},
+            )
+
+        compact_store(self.path)
+        self.assertLess(os.path.getsize(self.path), size)
+        with OccurrenceStore(self.path) as store:
+            self.assertEqual(
+                {uid: store[uid].tolist() for uid in store},
+                {"a": [1, 2], "b": [4, 5, 6], "c": [7]},
+            )
+        self.assertEqual(old["a"].tolist(), [1, 2])
+        old.close()
+
+    def test_concurrent_writers(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from plone.event.store import append_store
+        from plone.event.store import compact_store
+        from plone.event.store import OccurrenceStore
+
+        def write(worker):
+            for it in range(20):
+                append_store(self.path, [(f"{worker}-{it}", [worker, it])])
+                if it % 5 == 0:
+                    compact_store(self.path)
+
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(write, range(4)))
+
+        # No update is lost to a concurrent append or compaction.
+        with OccurrenceStore(self.path) as store:
+            self.assertEqual(len(store), 80)
+            self.assertEqual(store["3-19"].tolist(), [3, 19])
+        self.assertTrue(os.path.exists(self.path + ".lock"))
+
+    def test_invalid_file(self):
+        from plone.event.store import OccurrenceStore
+
+        with open(self.path, "wb") as fd:
+            fd.write(b"\0" * 64)
+        self.assertRaises(ValueError, OccurrenceStore, self.path)
+
+    def test_main(self):
+        from datetime import datetime
+        from datetime import timedelta
+        from plone.event.recurrence import recurrence_int_array
+        from plone.event.store import main
+        from plone.event.store import OccurrenceStore
+
+        import pytz
+
+        calendar = os.path.join(self.tmpdir, "events.ics")
+        with open(calendar, "wb") as fd:
+            fd.write(
+                b"BEGIN:VCALENDAR\r\n"
+                b"BEGIN:VEVENT\r\n"
+                b"UID:a1\r\n"
+                b"DTSTART;TZID=Europe/Vienna:20130603T090000\r\n"
+                b"DTEND;TZID=Europe/Vienna:20130603T100000\r\n"
+                b"RRULE:FREQ=DAILY;COUNT=5\r\n"
+                b"EXDATE:20130604T070000Z\r\n"
+                b"END:VEVENT\r\n"
+                b"BEGIN:VEVENT\r\n"
+                b"UID:b1\r\n"
+                b"DTSTART:20130610T120000Z\r\n"
+                b"END:VEVENT\r\n"
+                b"BEGIN:VEVENT\r\n"
+                b"SUMMARY:Without UID\r\n"
+                b"DTSTART:20130610T120000Z\r\n"
+                b"END:VEVENT\r\n"
+                b"END:VCALENDAR\r\n"
+            )
+        main([self.path, calendar])
+        at = pytz.timezone("Europe/Vienna")
+        expected = recurrence_int_array(
+            at.localize(datetime(2013, 6, 3, 9, 0)),
+            recrule="RRULE:FREQ=DAILY;COUNT=5\nEXDATE:20130604T090000",
+            duration=timedelta(hours=1),
+        )
+        with OccurrenceStore(self.path) as store:
+            self.assertEqual(sorted(store), ["a1", "b1"])
+            self.assertEqual(store["a1"].tolist(), expected.tolist())
+            self.assertEqual(len(store["a1"]), 4)
+            self.assertEqual(len(store["b1"]), 1)
+
+        # Appending replaces events and keeps the others.
+        with open(calendar, "wb") as fd:
+            fd.write(
+                b"BEGIN:VCALENDAR\r\n"
+                b"BEGIN:VEVENT\r\n"
+                b"UID:b1\r\n"
+                b"DTSTART:20130610T120000Z\r\n"
+                b"RDATE:20130611T120000Z\r\n"
+                b"END:VEVENT\r\n"
+                b"END:VCALENDAR\r\n"
+            )
+        main(["--append", self.path, calendar])
+        size = os.path.getsize(self.path)
+        main(["--compact", self.path])
+        self.assertLess(os.path.getsize(self.path), size)
+        with OccurrenceStore(self.path) as store:
+            self.assertEqual(store["a1"].tolist(), expected.tolist())
+            self.assertEqual(len(store["b1"]), 2)
+
+        # Rebuilding replaces the store.
+        main([self.path, calendar])
+        with OccurrenceStore(self.path) as store:
+            self.assertEqual(list(store), ["b1"])
@@ -0,0 +1,142 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import unittest
+
+
+def key(date):
+    """Wall time, UTC offset and UTC time of a datetime."""
+    return (
+        date.replace(tzinfo=None),
+        date.utcoffset(),
+        date.astimezone(timezone.utc).replace(tzinfo=None),
+    )
+
+
+class TestTimezoneBackends(unittest.TestCase):
+    zones = ["Europe/Vienna", "US/Pacific", "Australia/Lord_Howe", "Pacific/Apia"]
+
+    def walls(self):
+        # Around the DST changes of the zones.
+        for day in [
+            datetime(2011, 3, 27),
+            datetime(2011, 10, 30),
+            datetime(2008, 3, 9),
+            datetime(2008, 11, 2),
+            datetime(2011, 4, 3),
+            datetime(2011, 10, 2),
+            datetime(2011, 12, 29),
+        ]:
+            for minutes in range(0, 36 * 60, 30):
+                yield day + timedelta(minutes=minutes)
+
+    def test_localize(self):
+        from plone.event.tzbackend import PYTZ
+        from plone.event.tzbackend import ZONEINFO
+
+        for name in self.zones:
+            pytz_tz, zoneinfo_tz = PYTZ.timezone(name), ZONEINFO.timezone(name)
+            for wall in self.walls():
+                self.assertEqual(
+                    key(PYTZ.localize(wall, pytz_tz)),
+                    key(ZONEINFO.localize(wall, zoneinfo_tz)),
+                )
+
+    def test_normalize_and_shift(self):
+        from plone.event.tzbackend import PYTZ
+        from plone.event.tzbackend import ZONEINFO
+
+        for name in self.zones:
+            pytz_tz, zoneinfo_tz = PYTZ.timezone(name), ZONEINFO.timezone(name)
+            for wall in self.walls():
+                first = PYTZ.localize(wall, pytz_tz)
+                second = ZONEINFO.localize(wall, zoneinfo_tz)
+                for keep in [False, True]:
+                    self.assertEqual(
+                        key(PYTZ.normalize(first, keep)),
+                        key(ZONEINFO.normalize(second, keep)),
+                    )
+                    for delta in [timedelta(minutes=45), timedelta(days=1)]:
+                        self.assertEqual(
+                            key(PYTZ.shift(PYTZ.normalize(first), delta, keep)),
+                            key(
+                                ZONEINFO.shift(ZONEINFO.normalize(second), delta, keep)
+                            ),
+                        )
+
+    def test_recurrence(self):
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.recurrence import recurrence_sequence_timedelta
+        from plone.event.tzbackend import PYTZ
+        from plone.event.tzbackend import ZONEINFO
+        from plone.event.utils import DSTADJUST
+        from plone.event.utils import DSTKEEP
+
+        for name in self.zones:
+            wall = datetime(2011, 3, 1, 2, 30)
+            starts = [
+                PYTZ.localize(wall, PYTZ.timezone(name)),
+                ZONEINFO.localize(wall, ZONEINFO.timezone(name)),
+            ]
+            for recrule in [
+                "RRULE:FREQ=DAILY;COUNT=400",
+                "RRULE:FREQ=HOURLY;COUNT=900",
+            ]:
+                first, second = (
+                    [key(it) for it in recurrence_sequence_ical(start, recrule=recrule)]
+                    for start in starts
+                )
+                self.assertEqual(first, second)
+            for delta, dst in [(60, DSTKEEP), (1440, DSTADJUST), (1440, DSTKEEP)]:
+                first, second = (
+                    [
+                        key(it)
+                        for it in recurrence_sequence_timedelta(
+                            start,
+                            delta=delta,
+                            until=start + timedelta(days=300),
+                            dst=dst,
+                        )
+                    ]
+                    for start in starts
+                )
+                self.assertEqual(first, second)
+
+    def test_set_backend(self):
+        from plone.event import tzbackend
+        from plone.event.utils import get_timezone
+        from plone.event.utils import pydt
+        from plone.event.utils import utc
+        from plone.event.utils import utctz
+        from plone.event.utils import validated_timezone
+
+        import zoneinfo
+
+        self.addCleanup(tzbackend.set_backend, "pytz")
+        tzbackend.set_backend("zoneinfo")
+        self.assertIs(utctz(), timezone.utc)
+        self.assertEqual(
+            get_timezone("Europe/Vienna"), zoneinfo.ZoneInfo("Europe/Vienna")
+        )
+        self.assertIsNone(get_timezone("NOTVALID"))
+        self.assertEqual(validated_timezone("Europe/Vienna"), "Europe/Vienna")
+        self.assertEqual(
+            pydt(datetime(2011, 11, 11, 11, 11)),
+            datetime(2011, 11, 11, 11, 11, tzinfo=timezone.utc),
+        )
+        self.assertIs(utc(datetime(2011, 11, 11)).tzinfo, timezone.utc)
+        tzbackend.set_backend("pytz")
+        self.assertEqual(get_timezone("Europe/Vienna").zone, "Europe/Vienna")
+
+    def test_pydt_normalizes_zoneinfo(self):
+        from plone.event.utils import pydt
+
+        import zoneinfo
+
+        vienna = zoneinfo.ZoneInfo("Europe/Vienna")
+        # A non-existent wall time gets the UTC offset after the DST change,
+        # like with pytz.
+        date = pydt(datetime(2011, 3, 27, 2, 30, tzinfo=vienna))
+        self.assertEqual(date.utcoffset(), timedelta(hours=2))
+        self.assertEqual(date.replace(tzinfo=None), datetime(2011, 3, 27, 2, 30))
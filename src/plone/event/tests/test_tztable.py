@@ -0,0 +1,69 @@
+from datetime import datetime
+from datetime import timedelta
+
+import unittest
+
+
+class TestZoneTable(unittest.TestCase):
+    def assertLocalized(self, tz, wall):
+        from plone.event.tztable import get_zone_table
+        from plone.event.tztable import utc_microseconds
+
+        table = get_zone_table(tz)
+        date, utc_us = table.localize(wall)
+        expected = tz.localize(wall)
+        self.assertEqual(repr(date), repr(expected))
+        self.assertEqual(utc_us, utc_microseconds(expected))
+        self.assertEqual(table.utc(wall), utc_us)
+
+    def test_transitions(self):
+        import pytz
+
+        for name in ["Europe/Vienna", "America/New_York", "Australia/Lord_Howe"]:
+            tz = pytz.timezone(name)
+            for transition in tz._utc_transition_times[-40:]:
+                for minutes in range(-180, 180, 15):
+                    self.assertLocalized(tz, transition + timedelta(minutes=minutes))
+
+    def test_gap_and_ambiguous(self):
+        import pytz
+
+        tz = pytz.timezone("Europe/Vienna")
+        table = self._table(tz)
+        self.assertIsNone(table.index(self._seconds(datetime(2011, 3, 27, 2, 30))))
+        self.assertIsNone(table.index(self._seconds(datetime(2011, 10, 30, 2, 30))))
+        self.assertIsNotNone(table.index(self._seconds(datetime(2011, 10, 30, 3, 30))))
+        self.assertLocalized(tz, datetime(2011, 3, 27, 2, 30))
+        self.assertLocalized(tz, datetime(2011, 10, 30, 2, 30))
+
+    def test_fixed_offset(self):
+        import pytz
+
+        for tz in [pytz.utc, pytz.timezone("EST"), pytz.FixedOffset(90)]:
+            self.assertLocalized(tz, datetime(2011, 11, 11, 11, 11))
+
+    def test_microseconds(self):
+        # Like utc(), the UTC times have a resolution of seconds.
+        import pytz
+
+        self.assertLocalized(
+            pytz.timezone("Europe/Vienna"), datetime(2011, 11, 11, 11, 11, 11, 999)
+        )
+
+    def test_cached(self):
+        from plone.event.tztable import get_zone_table
+
+        import pytz
+
+        tz = pytz.timezone("Europe/Vienna")
+        self.assertIs(get_zone_table(tz), get_zone_table(tz))
+
+    def _table(self, tz):
+        from plone.event.tztable import get_zone_table
+
+        return get_zone_table(tz)
+
+    def _seconds(self, naive):
+        from plone.event.tztable import to_seconds
+
+        return to_seconds(naive)
@@ -4,16 +4,76 @@ import unittest
 
 
 class TestUtils(unittest.TestCase):
-    @mock.patch("plone.event.utils.pytz")
+    @mock.patch("plone.event.tzbackend.pytz")
     @mock.patch("plone.event.utils.os")
     def test_default_timezone(self, os, pytz):
         from plone.event.utils import default_timezone
+        from plone.event.utils import invalidate_timezone_cache
 
+        self.addCleanup(invalidate_timezone_cache)
         os.environ.keys.return_value = ["TZ"]
         os.environ = mock.MagicMock()
         pytz.timezone().zone = "zone"
         self.assertEqual(default_timezone(), "zone")
 
+    def test_default_timezone_cached(self):
+        from plone.event import utils
+
+        utils.invalidate_timezone_cache()
+        self.addCleanup(utils.invalidate_timezone_cache)
+        with mock.patch.dict(utils.os.environ, {"TZ": "Europe/Vienna"}):
+            self.assertEqual(utils.default_timezone(), "Europe/Vienna")
+            with mock.patch.object(utils, "validated_timezone") as validated:
+                self.assertEqual(utils.default_timezone(), "Europe/Vienna")
+                self.assertFalse(validated.called)
+            # Changing the environment invalidates the cached value.
+            utils.os.environ["TZ"] = "America/New_York"
+            self.assertEqual(utils.default_timezone(), "America/New_York")
+            utils.os.environ["TZ"] = "NOTVALID"
+            self.assertEqual(utils.default_timezone(fallback="CET"), "CET")
+
+    def test_get_timezone(self):
+        from plone.event import utils
+
+        utils.invalidate_timezone_cache()
+        self.addCleanup(utils.invalidate_timezone_cache)
+        with mock.patch.object(
+            utils.pytz, "timezone", side_effect=utils.pytz.timezone
+        ) as timezone:
+            for _ in range(3):
+                self.assertEqual(
+                    utils.get_timezone("Europe/Vienna").zone, "Europe/Vienna"
+                )
+                self.assertIsNone(utils.get_timezone("NOTVALID"))
+                self.assertIsNone(utils.get_timezone(None))
+        self.assertEqual(timezone.call_count, 3)
+
+    def test_invalid_timezone_warning(self):
+        from plone.event import utils
+
+        utils.invalidate_timezone_cache()
+        self.addCleanup(utils.invalidate_timezone_cache)
+        with mock.patch.object(utils, "logger") as logger:
+            for _ in range(3):
+                self.assertEqual(utils.validated_timezone("NOTVALID", "UTC"), "UTC")
+            self.assertEqual(logger.warning.call_count, 1)
+            utils.validated_timezone("NOTVALID", "CET")
+            self.assertEqual(logger.warning.call_count, 2)
+            with mock.patch.object(utils, "WARNING_INTERVAL", 0):
+                utils.validated_timezone("NOTVALID", "UTC")
+            self.assertEqual(logger.warning.call_count, 3)
+
+    def test_dt_to_zone(self):
+        from datetime import datetime
+        from plone.event.utils import dt_to_zone
+
+        import pytz
+
+        dt = datetime(2011, 11, 11, 10, 0, tzinfo=pytz.utc)
+        self.assertEqual(dt_to_zone(dt, "Europe/Vienna").hour, 11)
+        with self.assertRaises(pytz.UnknownTimeZoneError):
+            dt_to_zone(dt, "NOTVALID")
+
     def test_utcoffset_normalize(self):
         from plone.event.utils import utcoffset_normalize
 
@@ -57,6 +117,67 @@ class TestUtils(unittest.TestCase):
 
         self.assertEqual(pydt("wrongtype"), None)
 
+    def test_pydt__normalized(self):
+        from datetime import datetime
+        from plone.event.utils import pydt
+
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        dt = at.localize(datetime(2011, 3, 27, 3, 0))
+        self.assertIs(pydt(dt), dt)
+        self.assertIs(pydt(dt.replace(tzinfo=pytz.utc)).tzinfo, pytz.utc)
+        # The tzinfo of a date before the DST change is replaced.
+        dt = dt.replace(tzinfo=at.localize(datetime(2011, 3, 27, 1, 0)).tzinfo)
+        self.assertEqual(pydt(dt), at.localize(datetime(2011, 3, 27, 3, 0)))
+        self.assertEqual(pydt(dt).utcoffset().total_seconds(), 7200)
+
+    def test_guesstz__cached(self):
+        from DateTime import DateTime
+        from plone.event import utils
+
+        gmt = [DateTime("2011/11/11 GMT+1"), DateTime("2011/11/12 GMT+1")]
+        vienna = [
+            DateTime("2011/11/11 Europe/Vienna"),
+            DateTime("2012/1/1 Europe/Vienna"),
+        ]
+        utils.invalidate_timezone_cache()
+        self.addCleanup(utils.invalidate_timezone_cache)
+        with mock.patch.object(
+            utils.pytz, "timezone", side_effect=utils.pytz.timezone
+        ) as timezone:
+            self.assertEqual([utils.guesstz(it) for it in gmt], [None, None])
+            zones = [utils.guesstz(it) for it in vienna]
+        self.assertEqual(zones[0].zone, "Europe/Vienna")
+        self.assertIs(zones[0], zones[1])
+        self.assertEqual(timezone.call_count, 2)
+
+    def test_pydt_many(self):
+        from datetime import date
+        from datetime import datetime
+        from DateTime import DateTime
+        from plone.event.utils import pydt
+        from plone.event.utils import pydt_many
+
+        import pytz
+
+        values = [
+            DateTime("2011/11/11 11:11:11.5 Europe/Vienna"),
+            DateTime("2011/11/11 10:11:11.5 UTC"),
+            DateTime("2011/11/11 11:11:11.5 Europe/Vienna"),
+            DateTime("2011/11/11 11:11:11 GMT+1"),
+            datetime(2011, 11, 11, 11, 11),
+            date(2011, 11, 11),
+            None,
+        ]
+        for kw in [{}, {"exact": True}, {"missing_zone": pytz.timezone("CET")}]:
+            result = pydt_many(values, **kw)
+            self.assertEqual(result, [pydt(value, **kw) for value in values])
+            self.assertEqual(
+                [getattr(it, "tzinfo", None) for it in result],
+                [getattr(pydt(value, **kw), "tzinfo", None) for value in values],
+            )
+
     def test_dt2int_dt_is_None(self):
         from plone.event.utils import dt2int
 
@@ -92,3 +213,44 @@ class TestUtils(unittest.TestCase):
         dd.minute = 16
         value = 1077778936
         self.assertEqual(dt2int(dt), value)
+
+    def test_int2dt_end_of_month(self):
+        from datetime import datetime
+        from plone.event.utils import dt2int
+        from plone.event.utils import int2dt
+        from plone.event.utils import int2naive
+        from plone.event.utils import utctz
+
+        for dt in (
+            datetime(2011, 12, 31, 23, 59, tzinfo=utctz()),
+            datetime(2012, 1, 31, tzinfo=utctz()),
+            datetime(2012, 2, 29, 12, 0, tzinfo=utctz()),
+        ):
+            self.assertEqual(int2dt(dt2int(dt)), dt)
+            self.assertEqual(int2naive(dt2int(dt)), dt.replace(tzinfo=None))
+
+    def test_dt2int64(self):
+        from datetime import datetime
+        from plone.event.utils import dt2int
+        from plone.event.utils import dt2int64
+        from plone.event.utils import int642dt
+        from plone.event.utils import utctz
+
+        import pytz
+
+        self.assertEqual(dt2int64(None), 0)
+        at = pytz.timezone("Europe/Vienna")
+        for dt in (
+            at.localize(datetime(2011, 11, 11, 11, 11, 11)),
+            datetime(2011, 12, 31, 23, 59, 59, tzinfo=utctz()),
+            datetime(9999, 12, 31, 23, 59, 59, tzinfo=utctz()),
+        ):
+            value = dt2int64(dt)
+            self.assertEqual(int642dt(value), dt)
+            if dt.year < 3000:
+                self.assertEqual(value // 60, dt2int(dt))
+        self.assertGreater(
+            dt2int64(datetime(2011, 11, 11, 11, 11, 12, tzinfo=utctz())),
+            dt2int64(datetime(2011, 11, 11, 11, 11, 11, tzinfo=utctz())),
+        )
+        self.assertRaises(ValueError, int642dt, 1.0)
@@ -0,0 +1,225 @@
+from datetime import datetime
+from datetime import timedelta
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestVectorized(unittest.TestCase):
+    def assertSameAsSequence(self, start, recrule, **kw):
+        from plone.event.recurrence import recurrence_int_sequence
+        from plone.event.recurrence import recurrence_sequence_ical
+        from plone.event.utils import utc
+        from plone.event.vectorized import recurrence_datetime64
+        from plone.event.vectorized import recurrence_int32
+
+        expected = list(recurrence_sequence_ical(start, recrule=recrule, **kw))
+        result = recurrence_datetime64(start, recrule=recrule, **kw)
+        self.assertEqual(result.dtype, numpy.dtype("datetime64[s]"))
+        self.assertEqual(
+            result.tolist(), [utc(it).replace(tzinfo=None) for it in expected]
+        )
+        result = recurrence_int32(start, recrule=recrule, **kw)
+        self.assertEqual(result.dtype, numpy.dtype("int32"))
+        self.assertEqual(result.tolist(), list(recurrence_int_sequence(expected)))
+
+    def test_simple_rules(self):
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        start = at.localize(datetime(2010, 10, 1, 9, 0))
+        for recrule in [
+            None,
+            "RRULE:FREQ=DAILY",
+            "RRULE:FREQ=WEEKLY;BYDAY=MO,FR;COUNT=30",
+            "RRULE:FREQ=DAILY;INTERVAL=3;UNTIL=20110401T000000",
+        ]:
+            self.assertSameAsSequence(start, recrule)
+            self.assertSameAsSequence(start, recrule, count=5)
+            self.assertSameAsSequence(
+                start,
+                recrule,
+                from_=at.localize(datetime(2011, 3, 1)),
+                duration=timedelta(hours=2),
+            )
+            self.assertSameAsSequence(
+                start,
+                recrule,
+                from_=at.localize(datetime(2011, 3, 1)),
+                until=at.localize(datetime(2011, 4, 1)),
+            )
+            # count is counted from the start.
+            self.assertSameAsSequence(
+                start, recrule, from_=at.localize(datetime(2010, 10, 20)), count=30
+            )
+            self.assertSameAsSequence(
+                start, recrule, until=at.localize(datetime(2011, 4, 1))
+            )
+
+    def test_dateutil_rules(self):
+        import pytz
+
+        ny = pytz.timezone("America/New_York")
+        start = ny.localize(datetime(2010, 10, 30, 23, 30))
+        for recrule in [
+            "RRULE:FREQ=MONTHLY;BYMONTHDAY=31;COUNT=12",
+            "RRULE:FREQ=DAILY;COUNT=10\nEXDATE:20101102T000000",
+            "RRULE:FREQ=MONTHLY;BYDAY=-1FR;UNTIL=20150101T000000",
+        ]:
+            self.assertSameAsSequence(start, recrule)
+            self.assertSameAsSequence(
+                start, recrule, from_=ny.localize(datetime(2010, 11, 3))
+            )
+            self.assertSameAsSequence(
+                start, recrule, from_=ny.localize(datetime(2013, 11, 3))
+            )
+            self.assertSameAsSequence(
+                start, recrule, from_=ny.localize(datetime(2010, 11, 3)), count=5
+            )
+
+    def test_dst_transitions(self):
+        """Ambiguous and non-existing wall times are localized like pytz
+        does.
+        """
+        import pytz
+
+        for zone, day in [
+            ("Europe/Vienna", datetime(2010, 3, 27)),
+            ("Europe/Vienna", datetime(2010, 10, 30)),
+            ("America/New_York", datetime(2010, 11, 6)),
+            ("Australia/Lord_Howe", datetime(2010, 4, 3)),
+        ]:
+            tz = pytz.timezone(zone)
+            start = tz.localize(day)
+            self.assertSameAsSequence(
+                start, "RRULE:FREQ=MINUTELY;INTERVAL=15;COUNT=300"
+            )
+
+    def test_recreated_zone(self):
+        """A re-created pytz zone with the same name doesn't use the arrays
+        of the old one.
+        """
+        from plone.event.vectorized import local_to_utc
+
+        import pytz
+
+        tz = pytz.timezone("Europe/Vienna")
+        winter = int((datetime(2010, 1, 1) - datetime(1970, 1, 1)).total_seconds())
+        summer = winter + 181 * 86400
+        wall = numpy.array([winter, summer], dtype=numpy.int64)
+        self.assertEqual(
+            local_to_utc(tz, wall).tolist(), [winter - 3600, summer - 7200]
+        )
+
+        class Recreated(type(tz)):
+            _utc_transition_times = [datetime(1, 1, 1)]
+            _transition_info = [(timedelta(hours=5), timedelta(0), "X")]
+
+        self.assertEqual(
+            local_to_utc(Recreated(), wall).tolist(),
+            [winter - 5 * 3600, summer - 5 * 3600],
+        )
+
+    def test_unbounded(self):
+        from plone.event import recurrence
+        from plone.event.vectorized import recurrence_datetime64
+
+        recurrence.MAXCOUNT = 0
+        try:
+            self.assertRaises(
+                ValueError,
+                recurrence_datetime64,
+                datetime(2010, 1, 1),
+                "RRULE:FREQ=DAILY",
+            )
+        finally:
+            recurrence.MAXCOUNT = 1000
+
+    def test_limits(self):
+        from plone.event.recurrence import RecurrenceLimits
+
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        for limits in (
+            RecurrenceLimits(max_occurrences=3),
+            RecurrenceLimits(max_candidates=12),
+            RecurrenceLimits(max_occurrences=4, max_candidates=20),
+        ):
+            self.assertSameAsSequence(
+                at.localize(datetime(2010, 1, 1, 10, 0)),
+                "RRULE:FREQ=WEEKLY;BYDAY=MO,TH",
+                from_=at.localize(datetime(2010, 1, 20)),
+                limits=limits,
+            )
+            self.assertSameAsSequence(
+                at.localize(datetime(2010, 1, 1, 10, 0)),
+                "RRULE:FREQ=MONTHLY;BYMONTHDAY=1,15",
+                from_=at.localize(datetime(2010, 3, 1)),
+                limits=limits,
+            )
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestBatchConverters(unittest.TestCase):
+    def dates(self):
+        import pytz
+
+        at = pytz.timezone("Europe/Vienna")
+        return [
+            at.localize(datetime(2011, 11, 11, 11, 11, 11)),
+            pytz.utc.localize(datetime(2011, 12, 31, 23, 59, 59)),
+            datetime(2012, 1, 31, 12, 30),
+            at.localize(datetime(2012, 3, 25, 3, 0)),
+        ]
+
+    def test_dt2int_array(self):
+        from plone.event.utils import dt2int
+        from plone.event.vectorized import dt2int_array
+        from plone.event.vectorized import to_datetime64
+
+        dates = self.dates()
+        expected = [dt2int(it) for it in dates]
+        result = dt2int_array(dates)
+        self.assertEqual(result.dtype, numpy.dtype("int32"))
+        self.assertEqual(result.tolist(), expected)
+        values = to_datetime64(dates)
+        self.assertEqual(dt2int_array(values).tolist(), expected)
+        self.assertEqual(dt2int_array(values.astype(numpy.int64)).tolist(), expected)
+        self.assertEqual(dt2int_array([dates[0], None]).tolist(), [expected[0], 0])
+        self.assertEqual(dt2int_array([]).tolist(), [])
+        self.assertRaises(OverflowError, dt2int_array, [datetime(5000, 1, 1)])
+
+    def test_int2dt_array(self):
+        from plone.event.utils import dt2int
+        from plone.event.utils import utc
+        from plone.event.vectorized import int2dt_array
+
+        dates = self.dates()
+        result = int2dt_array([dt2int(it) for it in dates] + [0])
+        self.assertEqual(result.dtype, numpy.dtype("datetime64[s]"))
+        self.assertEqual(
+            result.tolist(),
+            [utc(it).replace(tzinfo=None, second=0) for it in dates] + [None],
+        )
+
+    def test_int64(self):
+        from plone.event.utils import dt2int64
+        from plone.event.utils import utc
+        from plone.event.vectorized import dt2int64_array
+        from plone.event.vectorized import int642dt_array
+
+        dates = self.dates() + [datetime(9999, 12, 31, 23, 59, 59)]
+        result = dt2int64_array(dates)
+        self.assertEqual(result.dtype, numpy.dtype("int64"))
+        self.assertEqual(result.tolist(), [dt2int64(it) for it in dates])
+        self.assertEqual(
+            int642dt_array(result).tolist(),
+            [utc(it).replace(tzinfo=None) for it in dates],
+        )
+        self.assertEqual(int642dt_array([0]).tolist(), [None])
@@ -0,0 +1,177 @@
+"""Timezone backends.
+
+plone.event uses pytz timezones by default. The zoneinfo backend uses the
+timezones of the standard library's zoneinfo module instead, whose UTC offset
+calculations are implemented in C. Both backends have the same DST semantics:
+
+- Localizing resolves ambiguous wall times at the end of DST to standard time
+  and gives non-existent wall times at the start of DST the UTC offset before
+  the change, like pytz's ``localize`` does.
+
+- Normalizing works like plone.event.utils.utcoffset_normalize. DSTKEEP keeps
+  the UTC time, DSTADJUST keeps the wall time and takes the UTC offset, which
+  is valid at the UTC time of the datetime.
+
+The configured backend creates timezones by name, the UTC timezone and
+localizes timezone naive datetimes without a given timezone. Timezone aware
+datetimes are always handled by the backend of their tzinfo, so pytz and
+zoneinfo datetimes can be mixed.
+
+>>> from plone.event import tzbackend
+>>> tzbackend.set_backend('zoneinfo')
+>>> from datetime import datetime
+>>> from plone.event.utils import pydt
+>>> pydt(datetime(2011, 11, 11, 11, 11), tzbackend.get_backend().timezone(
+...     'Europe/Vienna'))
+datetime.datetime(2011, 11, 11, 11, 11, tzinfo=zoneinfo.ZoneInfo(key='Europe/Vienna'))
+>>> tzbackend.set_backend('pytz')
+
+"""
+
+from datetime import timezone
+from pytz.tzinfo import BaseTzInfo
+
+import pytz
+import zoneinfo
+
+
+class PytzBackend:
+    """Backend for pytz timezones."""
+
+    name = "pytz"
+    utc = pytz.utc
+
+    def timezone(self, name):
+        """Return the timezone of an identifier.
+
+        :raises: KeyError, if the identifier isn't a valid timezone.
+        """
+        return pytz.timezone(name)
+
+    def zone(self, tz):
+        """Return the identifier of a timezone."""
+        return getattr(tz, "zone", None)
+
+    def localize(self, naive, tz):
+        """Return a timezone naive wall time as aware datetime of a timezone."""
+        return tz.localize(naive)
+
+    def fromutc(self, naive, tz):
+        """Return a timezone naive UTC time as aware datetime of a timezone."""
+        return tz.fromutc(naive)
+
+    def normalize(self, date, keep=False):
+        """Fix the UTC offset of a datetime, keeping its UTC time with keep
+        or else its wall time.
+        """
+        if keep:
+            return date.tzinfo.normalize(date)
+        return date.replace(tzinfo=date.tzinfo.normalize(date).tzinfo)
+
+    def shift(self, date, delta, keep=False):
+        """Add a timedelta to a datetime and normalize the result."""
+        return self.normalize(date + delta, keep)
+
+
+class ZoneinfoBackend:
+    """Backend for zoneinfo and other PEP 495 timezones."""
+
+    name = "zoneinfo"
+    utc = timezone.utc
+
+    def timezone(self, name):
+        """Return the timezone of an identifier.
+
+        :raises: KeyError, if the identifier isn't a valid timezone.
+        """
+        return zoneinfo.ZoneInfo(name)
+
+    def zone(self, tz):
+        """Return the identifier of a timezone."""
+        if tz is timezone.utc:
+            return "UTC"
+        return getattr(tz, "key", None)
+
+    def localize(self, naive, tz):
+        """Return a timezone naive wall time as aware datetime of a timezone."""
+        date = naive.replace(tzinfo=tz, fold=0)
+        later = date.replace(fold=1)
+        if date.utcoffset() <= later.utcoffset():
+            # Unambiguous or non-existent. fold=0 gives the UTC offset before
+            # the change.
+            return date
+        # Ambiguous: standard time or else the later UTC time.
+        if not date.dst() and later.dst():
+            return date
+        return later
+
+    def fromutc(self, naive, tz):
+        """Return a timezone naive UTC time as aware datetime of a timezone."""
+        return naive.replace(tzinfo=timezone.utc).astimezone(tz)
+
+    def normalize(self, date, keep=False):
+        """Fix the UTC offset of a datetime, keeping its UTC time with keep
+        or else its wall time.
+        """
+        if date.replace(fold=1 - date.fold).utcoffset() == date.utcoffset():
+            # Neither ambiguous nor non-existent, so already normalized.
+            return date
+        return self._normalize(date.replace(tzinfo=None), date, keep)
+
+    def shift(self, date, delta, keep=False):
+        """Add a timedelta to a datetime and normalize the result.
+
+        Like with pytz, the UTC offset of the datetime is kept for the
+        addition. Adding to a zoneinfo datetime directly calculates the UTC
+        offset of the new wall time instead.
+        """
+        return self._normalize(date.replace(tzinfo=None) + delta, date, keep)
+
+    def _normalize(self, wall, date, keep):
+        """Normalize a wall time with the UTC offset of date."""
+        local = self.fromutc(wall - date.utcoffset(), date.tzinfo)
+        if keep:
+            return local
+        result = wall.replace(tzinfo=date.tzinfo, fold=date.fold)
+        target = local.utcoffset()
+        if result.utcoffset() != target:
+            other = result.replace(fold=1 - result.fold)
+            if other.utcoffset() == target:
+                return other
+        return result
+
+
+PYTZ = PytzBackend()
+ZONEINFO = ZoneinfoBackend()
+BACKENDS = {backend.name: backend for backend in (PYTZ, ZONEINFO)}
+
+_backend = PYTZ
+
+
+def get_backend():
+    """Return the configured timezone backend."""
+    return _backend
+
+
+def set_backend(backend):
+    """Configure the timezone backend.
+
+    :param backend: Backend or its name, "pytz" or "zoneinfo".
+    """
+    global _backend
+    from plone.event.utils import invalidate_timezone_cache
+
+    _backend = BACKENDS[backend] if isinstance(backend, str) else backend
+    invalidate_timezone_cache()
+
+
+def backend_for(tz):
+    """Return the backend, which handles datetimes with a tzinfo."""
+    if isinstance(tz, BaseTzInfo):
+        return PYTZ
+    return ZONEINFO
+
+
+def localize(naive, tz):
+    """Return a timezone naive wall time as aware datetime of a timezone."""
+    return backend_for(tz).localize(naive, tz)
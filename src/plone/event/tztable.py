@@ -0,0 +1,203 @@
+"""Lookup tables for the UTC offsets of pytz timezones.
+
+pytz stores the transitions of a timezone as a sorted list of UTC times. The
+local wall time ranges of the transition intervals are sorted as well for
+almost all zones, so the offset of a wall time can be found by binary search.
+Only wall times, which are ambiguous or don't exist because of a DST change,
+are localized with pytz.
+
+Other timezones, like zoneinfo timezones, calculate their UTC offsets
+efficiently themselves. They are localized by their timezone backend.
+
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from plone.event.tzbackend import ZONEINFO
+from plone.event.utils import tzdel
+from plone.event.utils import utc
+from pytz.tzinfo import BaseTzInfo
+
+import threading
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+DAY = 24 * 60 * 60
+
+# Zone tables, keyed on the zone name.
+_zone_tables = {}
+_lock = threading.Lock()
+
+
+def to_seconds(naive):
+    """Return the seconds of a timezone naive datetime since the epoch,
+    without the microseconds.
+
+    >>> from datetime import datetime
+    >>> from plone.event.tztable import to_seconds
+    >>> to_seconds(datetime(1970, 1, 2, 0, 0, 1, 500))
+    86401
+
+    """
+    return (
+        (naive.toordinal() - EPOCH_ORDINAL) * DAY
+        + naive.hour * 3600
+        + naive.minute * 60
+        + naive.second
+    )
+
+
+class ZoneTable:
+    """Transition table of a pytz timezone.
+
+    >>> from datetime import datetime
+    >>> from datetime import timedelta
+    >>> from plone.event.tztable import get_zone_table
+    >>> import pytz
+    >>> table = get_zone_table(pytz.timezone('Europe/Vienna'))
+    >>> date, utc_us = table.localize(datetime(2011, 11, 11, 11, 11))
+    >>> date
+    datetime.datetime(2011, 11, 11, 11, 11, tzinfo=<DstTzInfo 'Europe/Vienna' CET+1:00:00 STD>)
+    >>> datetime(1970, 1, 1) + timedelta(microseconds=utc_us)
+    datetime.datetime(2011, 11, 11, 10, 11)
+
+    Wall times around a DST change are localized by pytz.
+    >>> table.localize(datetime(2011, 10, 30, 2, 30))[0]
+    datetime.datetime(2011, 10, 30, 2, 30, tzinfo=<DstTzInfo 'Europe/Vienna' CET+1:00:00 STD>)
+
+    """
+
+    def __init__(self, tz):
+        """
+        :param tz: pytz timezone.
+        """
+        self.tz = tz
+        self.key = getattr(tz, "_tzinfos", tz)
+        transitions = getattr(tz, "_utc_transition_times", None)
+        if transitions:
+            self.trans = [to_seconds(it) for it in transitions]
+            self.offsets = [
+                int(info[0].total_seconds()) for info in tz._transition_info
+            ]
+            self.tzinfos = [tz._tzinfos[info] for info in tz._transition_info]
+        else:
+            # UTC and zones with a fixed offset.
+            offset = tz.utcoffset(EPOCH) or timedelta(0)
+            self.trans = [to_seconds(datetime.min)]
+            self.offsets = [int(offset.total_seconds())]
+            self.tzinfos = [tz]
+        # Local start times of the transition intervals.
+        self.local = [it + offset for it, offset in zip(self.trans, self.offsets)]
+        #: False, if wall times cannot be looked up by binary search.
+        self.sorted = all(a < b for a, b in zip(self.local, self.local[1:]))
+
+    def index(self, seconds):
+        """Return the index of the transition interval of a wall time or None,
+        if the wall time is ambiguous or doesn't exist.
+
+        :param seconds: Wall time as seconds since the epoch.
+        :type seconds: integer
+        """
+        if not self.sorted:
+            return None
+        idx = max(bisect_right(self.local, seconds) - 1, 0)
+        if idx + 1 < len(self.trans):
+            if seconds >= self.trans[idx + 1] + self.offsets[idx]:
+                # In a gap of non-existent wall times.
+                return None
+        if idx > 0 and seconds < self.trans[idx] + self.offsets[idx - 1]:
+            # Also within the previous interval.
+            return None
+        return idx
+
+    def localize(self, wall):
+        """Localize a timezone naive wall time like ``tz.localize`` does.
+
+        :param wall: Timezone naive wall time.
+        :type wall: datetime
+        :returns: Tuple of the localized datetime and its UTC time as
+                  microseconds since the epoch. Like utc(), the UTC time has
+                  a resolution of seconds.
+        :rtype: tuple
+        """
+        seconds = to_seconds(wall)
+        idx = self.index(seconds)
+        if idx is None:
+            date = self.tz.localize(wall)
+            return date, utc_microseconds(date)
+        return (
+            wall.replace(tzinfo=self.tzinfos[idx]),
+            (seconds - self.offsets[idx]) * 10**6,
+        )
+
+    def utc(self, wall):
+        """Return the UTC time of a localized wall time as microseconds since
+        the epoch.
+        """
+        seconds = to_seconds(wall)
+        idx = self.index(seconds)
+        if idx is None:
+            return utc_microseconds(self.tz.localize(wall))
+        return (seconds - self.offsets[idx]) * 10**6
+
+
+class TzinfoTable:
+    """Lookup table interface for timezones, which aren't pytz timezones."""
+
+    sorted = False
+
+    def __init__(self, tz):
+        """
+        :param tz: zoneinfo or other PEP 495 timezone.
+        """
+        self.tz = tz
+
+    def localize(self, wall):
+        """Localize a timezone naive wall time like the zoneinfo timezone
+        backend does.
+
+        :returns: Tuple of the localized datetime and its UTC time as
+                  microseconds since the epoch, with a resolution of seconds.
+        :rtype: tuple
+        """
+        date = ZONEINFO.localize(wall, self.tz)
+        return date, (to_seconds(wall) - int(date.utcoffset().total_seconds())) * 10**6
+
+    def utc(self, wall):
+        """Return the UTC time of a localized wall time as microseconds since
+        the epoch.
+        """
+        return self.localize(wall)[1]
+
+
+def utc_microseconds(date):
+    """Return the UTC time of a datetime, as calculated by utc(), as
+    microseconds since the epoch.
+    """
+    return to_seconds(tzdel(utc(date))) * 10**6
+
+
+def get_zone_table(tz):
+    """Return the cached transition table of a pytz timezone or a lookup
+    table for other timezones.
+
+    :param tz: pytz, zoneinfo or other PEP 495 timezone.
+    :rtype: ZoneTable
+    """
+    if not isinstance(tz, BaseTzInfo):
+        if isinstance(tz, timezone):
+            # Fixed offset.
+            return ZoneTable(tz)
+        return TzinfoTable(tz)
+    name = getattr(tz, "zone", None)
+    if name is None:
+        return ZoneTable(tz)
+    table = _zone_tables.get(name)
+    # The localized variants of a pytz timezone share their tzinfos.
+    if table is None or table.key is not getattr(tz, "_tzinfos", tz):
+        table = ZoneTable(tz)
+        with _lock:
+            _zone_tables[name] = table
+    return table
@@ -1,11 +1,20 @@
+from bisect import bisect_right
 from datetime import date
 from datetime import datetime
 from datetime import timedelta
+from datetime import timezone
+from plone.event.cache import LRUCache
+from plone.event.tzbackend import backend_for
+from plone.event.tzbackend import get_backend
+from plone.event.tzbackend import localize
+from plone.event.tzbackend import ZONEINFO
 
 import logging
 import os
 import pytz
+import threading
 import time
+import zoneinfo
 
 DSTADJUST = "adjust"
 DSTKEEP = "keep"
@@ -14,6 +23,67 @@ MAX32 = int(2**31 - 1)
 
 logger = logging.getLogger("plone.event")
 
+# pytz zones or None for invalid identifiers, keyed on the identifier.
+TIMEZONE_CACHE_SIZE = 1024
+_timezones = LRUCache(maxsize=TIMEZONE_CACHE_SIZE)
+_marker = object()
+
+# The same warning is logged at most once within this number of seconds.
+WARNING_INTERVAL = 60 * 60
+_warnings = {}
+_warnings_lock = threading.Lock()
+
+# Environment and result of the last default_timezone call.
+_default_timezone = (None, None)
+
+
+def get_timezone(name):
+    """Return the timezone of an identifier from the configured timezone
+    backend or None, if it isn't a valid zone. Lookups are cached, including
+    the invalid ones.
+
+    :param name: Timezone identifier.
+    :type name: string
+    :rtype: tzinfo
+
+    >>> from plone.event.utils import get_timezone
+    >>> get_timezone('Europe/Vienna')
+    <DstTzInfo 'Europe/Vienna' LMT+1:05:00 STD>
+    >>> get_timezone('NOTVALID') is None
+    True
+
+    """
+    tz = _timezones.get(name, _marker)
+    if tz is _marker:
+        try:
+            tz = get_backend().timezone(name)
+        except Exception:
+            tz = None
+        _timezones.set(name, tz)
+    return tz
+
+
+def invalidate_timezone_cache():
+    """Clear the cached timezones, warnings and default timezone."""
+    global _default_timezone
+    _timezones.clear()
+    with _warnings_lock:
+        _warnings.clear()
+    _default_timezone = (None, None)
+
+
+def warn_throttled(message):
+    """Log a warning, unless the same warning was logged within the last
+    WARNING_INTERVAL seconds.
+    """
+    now = time.monotonic()
+    with _warnings_lock:
+        last = _warnings.get(message)
+        if last is not None and now - last < WARNING_INTERVAL:
+            return
+        _warnings[message] = now
+    logger.warning(message)
+
 
 def validated_timezone(timezone, fallback=None):
     """Validate a given timezone identifier. If a fallback is given, return it
@@ -51,24 +121,24 @@ def validated_timezone(timezone, fallback=None):
     'NOTVALID'
 
     """
-    try:
-        # following statement ensures, that timezone is a valid pytz/Olson zone
-        return pytz.timezone(timezone).zone
-    except Exception:
-        if fallback:
-            logger.warning(
-                "The timezone {} is not a valid timezone from the "
-                "Olson database or pytz. Falling back to {}.".format(
-                    timezone,
-                    fallback,
-                )
-            )
-            return fallback
-        else:
-            raise ValueError(
-                "The timezone {} is not a valid timezone from "
-                "the Olson database or pytz.".format(timezone)
+    # following statement ensures, that timezone is a valid pytz/Olson zone
+    tz = get_timezone(timezone)
+    if tz is not None:
+        return get_backend().zone(tz)
+    if fallback:
+        warn_throttled(
+            "The timezone {} is not a valid timezone from the "
+            "Olson database or pytz. Falling back to {}.".format(
+                timezone,
+                fallback,
             )
+        )
+        return fallback
+    else:
+        raise ValueError(
+            "The timezone {} is not a valid timezone from "
+            "the Olson database or pytz.".format(timezone)
+        )
 
 
 def default_timezone(fallback="UTC"):
@@ -116,11 +186,15 @@ def default_timezone(fallback="UTC"):
     ...     del os.environ['TZ']
 
     """
-
-    timezone = None
-    if "TZ" in os.environ.keys():
-        # Timezone from OS env var
-        timezone = os.environ["TZ"]
+    global _default_timezone
+    # The result is cached until the timezone of the environment changes.
+    environment = (os.environ.get("TZ"), time.tzname, fallback)
+    cached_environment, cached = _default_timezone
+    if cached is not None and cached_environment == environment:
+        return cached
+
+    # Timezone from OS env var
+    timezone = environment[0]
     if not timezone:
         # Timezone from python time
         zones = time.tzname
@@ -128,10 +202,12 @@ def default_timezone(fallback="UTC"):
             timezone = zones[0]
         else:
             # Default fallback = UTC
-            logger.warning(
+            warn_throttled(
                 "Operating system's timezone cannot be found. Falling back to UTC."
             )
-    return validated_timezone(timezone, fallback)
+    result = validated_timezone(timezone, fallback)
+    _default_timezone = (environment, result)
+    return result
 
 
 # Display helpers
@@ -217,14 +293,15 @@ def is_same_day(start, end):
 
 # Timezone helpers
 def utctz():
-    """Return the UTVC zone as a pytz.UTC instance.
+    """Return the UTC zone of the configured timezone backend, by default
+    the pytz.UTC instance.
 
     >>> from plone.event.utils import utctz
     >>> utctz()
     <UTC>
 
     """
-    return pytz.timezone("UTC")
+    return get_backend().utc
 
 
 def utc(dt):
@@ -289,10 +366,7 @@ def utcoffset_normalize(date, delta=None, dstmode=DSTAUTO):
             dstmode = DSTADJUST
 
     try:
-        if dstmode == DSTKEEP:
-            return date.tzinfo.normalize(date)
-        else:  # DSTADJUST
-            return date.replace(tzinfo=date.tzinfo.normalize(date).tzinfo)
+        return backend_for(date.tzinfo).normalize(date, keep=dstmode == DSTKEEP)
     except Exception:
         # TODO: python-datetime converts e.g RDATE:20100119T230000Z to
         # datetime.datetime(2010, 1, 19, 23, 0, tzinfo=tzutc())
@@ -446,64 +520,152 @@ def pydt(dt, missing_zone=None, exact=False):
     if dt is None:
         return None
 
-    ret = None
-
     if missing_zone is None:
         missing_zone = utctz()
 
-    if isinstance(dt, date) and not isinstance(dt, datetime):
-        dt = datetime(dt.year, dt.month, dt.day)
-
     if isinstance(dt, datetime):
-        tznaive = not bool(getattr(dt, "tzinfo", False))
-        if tznaive:
-            ret = missing_zone.localize(dt)
+        tzinfo = dt.tzinfo
+        if tzinfo is None:
+            ret = localize(dt, missing_zone)
+        elif (
+            tzinfo is pytz.utc
+            or isinstance(tzinfo, pytz.tzinfo.StaticTzInfo)
+            or isinstance(tzinfo, timezone)
+        ):
+            # Fixed offset zones are always normalized.
+            ret = dt
+        elif isinstance(tzinfo, pytz.tzinfo.DstTzInfo) and _is_normalized(dt):
+            ret = dt
+        elif isinstance(tzinfo, zoneinfo.ZoneInfo):
+            ret = ZONEINFO.normalize(dt)
         else:
             ret = utcoffset_normalize(dt, dstmode=DSTADJUST)
+    elif isinstance(dt, date):
+        ret = localize(datetime(dt.year, dt.month, dt.day), missing_zone)
+    elif _is_zope_datetime(dt.__class__):
+        ret = _zope_pydt(dt, missing_zone)
+    else:
+        return None
 
-    if "DateTime" in str(dt.__class__):
-        # Zope DateTime
-        # TODO: do we need to support subclasses of DateTime too? the check
-        #       above would fail.
-        tz = guesstz(dt)
-        if tz is None:
-            dt = dt.toZone(missing_zone.zone)
-            tz = missing_zone
-
-        year, month, day, hour, min, sec = dt.parts()[:6]
-
-        # seconds (parts[6]) is a float, so we do modulo for microseconds and
-        # map then to int
-        #
-        # there are precision problems when doing the modulo math
-        # (Python 2.7.3 on Ubuntu 12.04):
-        # >>> 10.123456%1*1000000
-        # 123455.99999999913
-        # >>> round(10.123456%1*1000000,0)
-        # 123456.0
-        micro = int(round(sec % 1 * 1000000))
-        sec = int(sec)
-
-        # There is a problem with timezone Europe/Paris
-        # tz is equal to <DstTzInfo 'Europe/Paris' PMT+0:09:00 STD>
-        dt = datetime(year, month, day, hour, min, sec, micro, tzinfo=tz)
-        # before:
-        # datetime.datetime(2011, 3, 14, 14, 19,
-        # tzinfo=<DstTzInfo 'Europe/Paris' PMT+0:09:00 STD>)
-        # dt = dt.tzinfo.normalize(dt)
-        # after: datetime.datetime(2011, 3, 14, 15, 10,
-        # tzinfo=<DstTzInfo 'Europe/Paris' CET+1:00:00 STD>
-        dt = utcoffset_normalize(dt, dstmode=DSTADJUST)
-        # after: datetime.datetime(2011, 3, 14, 19,
-        # tzinfo=<DstTzInfo 'Europe/Paris' CET+1:00:00 STD>
-        ret = dt
-
-    if ret and exact is False:
+    if exact is False and ret.microsecond:
         ret = ret.replace(microsecond=0)
 
     return ret
 
 
+# Naive UTC start and end of the last transition interval, in which a
+# localized pytz tzinfo was found to be valid, keyed on the tzinfo.
+_normalized_ranges = {}
+
+
+def _is_normalized(dt):
+    """Return True, if the tzinfo of a datetime with a pytz DstTzInfo is the
+    one, which utcoffset_normalize would set.
+    """
+    tzinfo = dt.tzinfo
+    try:
+        instant = dt.replace(tzinfo=None) - tzinfo._utcoffset
+    except OverflowError:
+        return False
+    valid = _normalized_ranges.get(tzinfo)
+    if valid is not None and valid[0] <= instant < valid[1]:
+        return True
+    transitions = tzinfo._utc_transition_times
+    idx = max(0, bisect_right(transitions, instant) - 1)
+    if tzinfo._tzinfos[tzinfo._transition_info[idx]] is not tzinfo:
+        return False
+    end = transitions[idx + 1] if idx + 1 < len(transitions) else datetime.max
+    _normalized_ranges[tzinfo] = (transitions[idx], end)
+    return True
+
+
+# Classes, which are recognized as Zope DateTime, keyed on the class.
+_zope_datetime_classes = {}
+
+
+def _is_zope_datetime(cls):
+    result = _zope_datetime_classes.get(cls)
+    if result is None:
+        # TODO: do we need to support subclasses of DateTime too? the check
+        #       fails for them.
+        result = _zope_datetime_classes[cls] = "DateTime" in str(cls)
+    return result
+
+
+def _zope_pydt(dt, missing_zone):
+    """Convert a Zope DateTime to a normalized Python datetime."""
+    tz = guesstz(dt)
+    if tz is None:
+        dt = dt.toZone(backend_for(missing_zone).zone(missing_zone))
+        tz = missing_zone
+
+    year, month, day, hour, min, sec = dt.parts()[:6]
+
+    # seconds (parts[6]) is a float, so we do modulo for microseconds and
+    # map then to int
+    #
+    # there are precision problems when doing the modulo math
+    # (Python 2.7.3 on Ubuntu 12.04):
+    # >>> 10.123456%1*1000000
+    # 123455.99999999913
+    # >>> round(10.123456%1*1000000,0)
+    # 123456.0
+    micro = int(round(sec % 1 * 1000000))
+    sec = int(sec)
+
+    # There is a problem with timezone Europe/Paris
+    # tz is equal to <DstTzInfo 'Europe/Paris' PMT+0:09:00 STD>
+    dt = datetime(year, month, day, hour, min, sec, micro, tzinfo=tz)
+    # before:
+    # datetime.datetime(2011, 3, 14, 14, 19,
+    # tzinfo=<DstTzInfo 'Europe/Paris' PMT+0:09:00 STD>)
+    # dt = dt.tzinfo.normalize(dt)
+    # after: datetime.datetime(2011, 3, 14, 15, 10,
+    # tzinfo=<DstTzInfo 'Europe/Paris' CET+1:00:00 STD>
+    return utcoffset_normalize(dt, dstmode=DSTADJUST)
+    # after: datetime.datetime(2011, 3, 14, 19,
+    # tzinfo=<DstTzInfo 'Europe/Paris' CET+1:00:00 STD>
+
+
+def pydt_many(values, missing_zone=None, exact=False):
+    """Convert many dates, datetimes or Zope DateTimes, e.g. the start dates
+    of catalog brains, like pydt.
+
+    Equal DateTime values are converted once.
+
+    :param values: Iterable of date, datetime or DateTime objects or None.
+    :type values: iterable
+    :param missing_zone: A pytz zone to be used, if no timezone is present.
+    :param exact: If True, the resolution goes down to microseconds.
+    :returns: List of Python datetimes with timezone information.
+    :rtype: list
+
+    >>> from DateTime import DateTime
+    >>> from plone.event.utils import pydt_many
+    >>> pydt_many([DateTime('2011/11/11 11:11:11 Europe/Vienna'), None])
+    [datetime.datetime(2011, 11, 11, 11, 11, 11, tzinfo=<DstTzInfo 'Europe/Vienna' CET+1:00:00 STD>), None]
+
+    """
+    if missing_zone is None:
+        missing_zone = utctz()
+    converted = {}
+    result = []
+    for value in values:
+        if value is None or isinstance(value, date):
+            result.append(pydt(value, missing_zone, exact))
+            continue
+        # The timezone is part of the key, since DateTimes of the same time
+        # in different zones are equal.
+        key = (getattr(value, "_micros", None), getattr(value, "_tz", None))
+        if None in key:
+            result.append(pydt(value, missing_zone, exact))
+            continue
+        if key not in converted:
+            converted[key] = pydt(value, missing_zone, exact)
+        result.append(converted[key])
+    return result
+
+
 def guesstz(DT):
     """'Guess' pytz from a zope DateTime.
 
@@ -527,12 +689,7 @@ def guesstz(DT):
 
     # Please note, the GMT offset based timezone information in DateTime are
     # not compatible with Etc/GMT based from pytz. They have different offsets.
-    try:
-        tz = pytz.timezone(tzname)
-        return tz
-    except KeyError:
-        pass
-    return None
+    return get_timezone(tzname)
 
 
 # Date as integer representation helpers
@@ -577,12 +734,70 @@ def int2dt(dtint):
     """
     if not isinstance(dtint, int):
         raise ValueError("int2dt expects integer values as arguments.")
-    minutes = dtint % 60
-    hours = dtint // 60 % 24
-    days = dtint // 60 // 24 % 31
-    months = dtint // 60 // 24 // 31 % 12
-    years = dtint // 60 // 24 // 31 // 12
-    return datetime(years, months, days, hours, minutes, tzinfo=utctz())
+    return datetime(*_int2parts(dtint), tzinfo=utctz())
+
+
+def int2naive(dtint):
+    """Returns the UTC time of an integer representation with resolution of
+    one minute as timezone naive datetime, e.g. for date arithmetic.
+
+    >>> from plone.event.utils import int2naive
+    >>> int2naive(1077760031)
+    datetime.datetime(2011, 11, 11, 11, 11)
+
+    """
+    return datetime(*_int2parts(dtint))
+
+
+def _int2parts(value):
+    """Return year, month, day, hour and minute of a dt2int integer
+    representation.
+    """
+    value, minute = divmod(value, 60)
+    value, hour = divmod(value, 24)
+    # Days and months are counted from 1, so 31 and 12 don't carry over.
+    day = (value - 1) % 31 + 1
+    value = (value - day) // 31
+    month = (value - 1) % 12 + 1
+    year = (value - month) // 12
+    return year, month, day, hour, minute
+
+
+def dt2int64(dt):
+    """Calculates a 64bit integer from a datetime, resolution is one second.
+    The datetime is always converted to the UTC zone.
+
+    The value is the dt2int integer representation times 60 plus the
+    seconds, so ``dt2int64(dt) // 60 == dt2int(dt)``. It is not limited to
+    the 32bit range.
+
+    >>> from plone.event import utils
+    >>> from datetime import datetime
+    >>> utils.dt2int64(datetime(2011,11,11,11,11,11,tzinfo=utils.utctz()))
+    64665601871
+
+    """
+    if dt is None:
+        return 0
+    dt = utc(dt)
+    return (
+        (((dt.year * 12 + dt.month) * 31 + dt.day) * 24 + dt.hour) * 60 + dt.minute
+    ) * 60 + dt.second
+
+
+def int642dt(value):
+    """Returns a datetime object from a dt2int64 integer representation with
+    resolution of one second. The datetime returned is in the UTC zone.
+
+    >>> from plone.event.utils import int642dt
+    >>> int642dt(64665601871)
+    datetime.datetime(2011, 11, 11, 11, 11, 11, tzinfo=<UTC>)
+
+    """
+    if not isinstance(value, int):
+        raise ValueError("int642dt expects integer values as arguments.")
+    value, second = divmod(value, 60)
+    return datetime(*_int2parts(value), second, tzinfo=utctz())
 
 
 def dt_to_zone(dt, tzstring):
@@ -590,7 +805,10 @@ def dt_to_zone(dt, tzstring):
     string.
 
     """
-    return dt.astimezone(pytz.timezone(tzstring))
+    tz = get_timezone(tzstring)
+    if tz is None:
+        raise pytz.UnknownTimeZoneError(tzstring)
+    return dt.astimezone(tz)
 
 
 # RFC2445 export helpers
@@ -664,5 +882,5 @@ def rfc2445dt(dt, mode="utc", date=True, time=True):
         mode == "utc" and "Z" or "",
     )
     if mode == "local":
-        return date, dt.tzinfo.zone
+        return date, backend_for(dt.tzinfo).zone(dt.tzinfo)
     return date
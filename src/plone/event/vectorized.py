@@ -0,0 +1,479 @@
+"""NumPy based calculation of recurrence sequences as arrays.
+
+This module requires numpy, which can be installed with the ``numpy`` extra of
+plone.event.
+
+"""
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from plone.event.recurrence import compile_recurrence
+from plone.event.recurrence import get_limits
+from plone.event.recurrence import seek_recurrence
+from plone.event.simplerule import SimpleRule
+from plone.event.tztable import get_zone_table
+from plone.event.utils import MAX32
+from plone.event.utils import pydt
+from plone.event.utils import tzdel
+from plone.event.utils import utc
+from pytz.tzinfo import BaseTzInfo
+
+import itertools
+import numpy
+
+EPOCH = datetime(1970, 1, 1)
+DAY = 24 * 60 * 60
+
+# Per zone name: the ZoneTable of get_zone_table and its UTC transition times,
+# local start times of the transition intervals and UTC offsets in seconds as
+# arrays. None for zones, where wall times cannot be looked up by binary
+# search.
+_zone_tables = {}
+
+
+def _seconds(naive):
+    """Return the seconds of a timezone naive datetime since the epoch."""
+    delta = naive - EPOCH
+    return delta.days * DAY + delta.seconds
+
+
+def _zone_table(tz):
+    """Return the transition table arrays of a pytz timezone.
+
+    get_zone_table decides whether its cached table is still valid for tz, so
+    the arrays are rebuilt when it returns a new table.
+    """
+    name = getattr(tz, "zone", None)
+    table = get_zone_table(tz)
+    cached = _zone_tables.get(name)
+    if cached is not None and cached[0] is table:
+        return cached[1]
+    arrays = None
+    if table.sorted:
+        arrays = tuple(
+            numpy.array(it, dtype=numpy.int64)
+            for it in (table.trans, table.local, table.offsets)
+        )
+    if name is not None:
+        _zone_tables[name] = (table, arrays)
+    return arrays
+
+
+def local_to_utc(tz, wall):
+    """Convert timezone naive wall times in a pytz timezone to UTC.
+
+    The result for each wall time ``w`` is the same as for
+    ``utc(tz.localize(w))``. Wall times within a transition interval are
+    converted by binary search over the timezone's transition table. The rare
+    ambiguous or non-existent wall times around DST changes are converted one
+    by one with pytz.
+
+    :param tz: pytz timezone.
+    :param wall: Array of wall times as integer seconds since the epoch.
+    :type wall: numpy.ndarray
+    :returns: Array of UTC times as integer seconds since the epoch.
+    :rtype: numpy.ndarray
+
+    """
+    wall = numpy.asarray(wall, dtype=numpy.int64)
+    if not isinstance(tz, BaseTzInfo) and not isinstance(tz, timezone):
+        # zoneinfo and other timezones without transition table.
+        table = get_zone_table(tz)
+        return numpy.array(
+            [table.utc(EPOCH + timedelta(seconds=it)) // 10**6 for it in wall.tolist()],
+            dtype=numpy.int64,
+        )
+    if not hasattr(tz, "_utc_transition_times"):
+        # UTC and zones with a fixed offset.
+        offset = tz.utcoffset(EPOCH) or timedelta(0)
+        return wall - int(offset.total_seconds())
+
+    table = _zone_table(tz)
+    if table is None:
+        return numpy.array(
+            [_utc_seconds(tz, it) for it in wall.tolist()], dtype=numpy.int64
+        )
+    trans, local, offsets = table
+    last = len(trans) - 1
+    idx = numpy.clip(numpy.searchsorted(local, wall, side="right") - 1, 0, last)
+    nxt = numpy.minimum(idx + 1, last)
+    # Inside the local time range of the found transition interval?
+    valid = (idx == last) | (wall < trans[nxt] + offsets[idx])
+    # Also inside the local time range of the previous interval?
+    prev = numpy.maximum(idx - 1, 0)
+    ambiguous = (idx > 0) & (wall < trans[idx] + offsets[prev])
+    result = wall - offsets[idx]
+    for pos in numpy.flatnonzero(~valid | ambiguous).tolist():
+        result[pos] = _utc_seconds(tz, int(wall[pos]))
+    return result
+
+
+def _utc_seconds(tz, wall):
+    date = utc(tz.localize(EPOCH + timedelta(seconds=wall)))
+    return _seconds(tzdel(date))
+
+
+def _wall_array(rset, first, last):
+    """Return the wall times of the items first to last of a sequence as
+    array of seconds since the epoch.
+    """
+    if isinstance(rset, SimpleRule):
+        last = min(last, len(rset))
+        pos = numpy.arange(first, max(first, last), dtype=numpy.int64)
+        slot = rset._first + pos - rset._prefix
+        offsets = numpy.array(rset.offsets or [0], dtype=numpy.int64)
+        days = slot // len(offsets) * rset.period + offsets[slot % len(offsets)]
+        wall = _seconds(rset.base) + days * DAY
+        if rset._prefix and first == 0 and len(wall):
+            wall[0] = _seconds(rset.start)
+        return wall
+    return numpy.array(
+        [_seconds(it) for it in itertools.islice(rset, first, last)],
+        dtype=numpy.int64,
+    )
+
+
+def _candidates(start, recrule, rset, from_, until, duration, limit, seek=True):
+    """Return the UTC times of the items of rset, the compiled recurrence
+    rule of start, which recurrence_sequence_ical checks against from_ and
+    until. Without seek, the items are taken from the start, even if from_
+    is given.
+    """
+    tz = start.tzinfo
+    if from_ and until:
+        after = tzdel(from_) - duration
+        before = tzdel(until)
+        if isinstance(rset, SimpleRule):
+            first = rset._index(after, inc=True)
+            last = rset._index(before, inc=False)
+            if limit is not None:
+                last = min(last, first + limit)
+            wall = _wall_array(rset, first, last)
+        else:
+            wall = _wall_array(rset.between(after, before, inc=True), 0, limit)
+        return local_to_utc(tz, wall)
+
+    if from_ and seek:
+        # Seek like recurrence_sequence_ical and drop the leading items, which
+        # end before from_.
+        if not isinstance(rset, SimpleRule):
+            dates = seek_recurrence(start, recrule, from_, duration)
+            wall = _wall_array(dates, 0, limit)
+            return local_to_utc(tz, wall)
+        naive_from = tzdel(from_.astimezone(tz))
+        first = rset._index(naive_from - duration - timedelta(days=1), inc=True)
+        # Items after this one end after from_ in any case.
+        last = rset._index(naive_from + timedelta(days=1), inc=True)
+        utcs = local_to_utc(tz, _wall_array(rset, first, last + limit))
+        ends = utcs * 10**6 + _microseconds(duration)
+        keep = numpy.flatnonzero(ends >= _seconds(tzdel(utc(from_))) * 10**6)
+        skip = keep[0] if len(keep) else len(utcs)
+        return utcs[skip : skip + limit]
+
+    if until:
+        # Items after this one are after until in any case.
+        before = tzdel(until.astimezone(tz)) + timedelta(days=1)
+        if isinstance(rset, SimpleRule):
+            last = rset._index(before, inc=False)
+            limit = last if limit is None else min(limit, last)
+        else:
+            rset = itertools.takewhile(lambda it: it <= before, rset)
+    return local_to_utc(tz, _wall_array(rset, 0, limit))
+
+
+def _microseconds(delta):
+    return (delta.days * DAY + delta.seconds) * 10**6 + delta.microseconds
+
+
+def _recurrence_utc(start, recrule, from_, until, count, duration, limits):
+    """Return the occurrences of recurrence_sequence_ical as array of UTC
+    seconds since the epoch.
+    """
+    start = pydt(start, exact=False)
+    from_ = pydt(from_, exact=False)
+    until = pydt(until, exact=False)
+    if duration:
+        assert isinstance(duration, timedelta)
+    else:
+        duration = timedelta(0)
+    rset = compile_recurrence(tzdel(start), recrule)
+
+    limits = get_limits(limits)
+    max_occurrences = limits.max_occurrences
+    limit = limits.max_candidates
+    if count and (limit is None or count < limit):
+        limit = count
+    if limit is None and max_occurrences is None and not until:
+        raise ValueError("Unbounded recurrence sequences cannot be calculated.")
+
+    # Occurrences, which are skipped because they end before from_, don't
+    # count towards max_occurrences. There are only a few of them, so start
+    # with some more candidates and get more, if not enough are left.
+    size = limit
+    pad = 16
+    while True:
+        if max_occurrences is not None:
+            size = max_occurrences + pad
+            if limit is not None:
+                size = min(size, limit)
+        # count is counted from the event's start, so don't seek then.
+        utcs, complete = _occurrences(
+            start, recrule, rset, from_, until, duration, size, seek=not count
+        )
+        if complete or size == limit or len(utcs) >= max_occurrences:
+            return utcs[:max_occurrences]
+        pad *= 4
+
+
+def _occurrences(start, recrule, rset, from_, until, duration, limit, seek=True):
+    """Apply the occurrence checks of recurrence_sequence_ical to the first
+    limit candidates: occurrences ending before from_ are skipped, the
+    sequence stops at the first one after until.
+
+    :returns: The UTC times of the occurrences and a flag, if there are no
+              more occurrences after the limit.
+    """
+    utcs = _candidates(start, recrule, rset, from_, until, duration, limit, seek)
+    complete = limit is None or len(utcs) < limit
+    skip = numpy.zeros(len(utcs), dtype=bool)
+    if from_:
+        utc_from = _seconds(tzdel(utc(from_))) * 10**6
+        skip = utcs * 10**6 + _microseconds(duration) < utc_from
+    if until:
+        stop = numpy.flatnonzero(~skip & (utcs > _seconds(tzdel(utc(until)))))
+        if len(stop):
+            utcs, skip = utcs[: stop[0]], skip[: stop[0]]
+            complete = True
+    return utcs[~skip], complete
+
+
+def recurrence_datetime64(
+    start,
+    recrule=None,
+    from_=None,
+    until=None,
+    count=None,
+    duration=None,
+    limits=None,
+):
+    """Calculate the occurrences of a recurrence rule as NumPy array of UTC
+    datetime64 values with a resolution of one second.
+
+    The parameters and the resulting occurrences are the same as for
+    plone.event.recurrence.recurrence_sequence_ical. Simple daily and weekly
+    rules are calculated as arrays without creating datetime objects for each
+    occurrence.
+
+    :returns: Array of UTC occurrence datetimes.
+    :rtype: numpy.ndarray of dtype datetime64[s]
+
+    >>> from datetime import datetime
+    >>> from plone.event.vectorized import recurrence_datetime64
+    >>> import pytz
+    >>> at = pytz.timezone('Europe/Vienna')
+    >>> recurrence_datetime64(
+    ...     at.localize(datetime(2010, 10, 30, 9, 0)),
+    ...     recrule='RRULE:FREQ=DAILY;COUNT=3')
+    array(['2010-10-30T07:00:00', '2010-10-31T08:00:00', '2010-11-01T08:00:00'],
+          dtype='datetime64[s]')
+
+    """
+    utcs = _recurrence_utc(start, recrule, from_, until, count, duration, limits)
+    return utcs.astype("datetime64[s]")
+
+
+def recurrence_int32(
+    start,
+    recrule=None,
+    from_=None,
+    until=None,
+    count=None,
+    duration=None,
+    limits=None,
+):
+    """Calculate the integer representations of the occurrences of a
+    recurrence rule, as plone.event.utils.dt2int does, as NumPy int32 array.
+
+    The values are the same as for
+    ``recurrence_int_sequence(recurrence_sequence_ical(...))``.
+
+    :returns: Array of integer representations.
+    :rtype: numpy.ndarray of dtype int32
+
+    >>> from datetime import datetime
+    >>> from plone.event.vectorized import recurrence_int32
+    >>> import pytz
+    >>> at = pytz.timezone('Europe/Vienna')
+    >>> recurrence_int32(
+    ...     at.localize(datetime(2010, 1, 1, 0, 0)),
+    ...     recrule='RRULE:FREQ=DAILY;INTERVAL=10;COUNT=5')
+    array([1076762820, 1076777220, 1076791620, 1076806020, 1076820420],
+          dtype=int32)
+
+    """
+    utcs = _recurrence_utc(start, recrule, from_, until, count, duration, limits)
+    return _dt2int(utcs.astype("datetime64[s]"))
+
+
+def _calendar(values):
+    """Return the dt2int integer representations and the seconds of an array
+    of UTC datetime64 values.
+    """
+    years = values.astype("datetime64[Y]").astype(numpy.int64) + 1970
+    months = values.astype("datetime64[M]").astype(numpy.int64) % 12 + 1
+    days = values.astype("datetime64[D]")
+    day = (days - values.astype("datetime64[M]")).astype(numpy.int64) + 1
+    seconds = (values - days).astype("timedelta64[s]").astype(numpy.int64)
+    ret = (
+        ((years * 12 + months) * 31 + day) * 24 + seconds // 3600
+    ) * 60 + seconds % 3600 // 60
+    return ret, seconds % 60
+
+
+def _dt2int(values):
+    """Calculate the dt2int integer representation of an array of UTC
+    datetime64 values.
+    """
+    ret = _calendar(values)[0]
+    if len(ret) and ret.max() > MAX32:
+        raise OverflowError(
+            "Values are not within the range of indexable dates, exceeding "
+            "32bit range."
+        )
+    return ret.astype(numpy.int32)
+
+
+def _from_calendar(values, seconds=0):
+    """Return the UTC datetime64 values of an array of dt2int integer
+    representations and seconds.
+    """
+    values, minute = numpy.divmod(values, 60)
+    values, hour = numpy.divmod(values, 24)
+    day = (values - 1) % 31 + 1
+    values = (values - day) // 31
+    month = (values - 1) % 12 + 1
+    year = (values - month) // 12
+    months = (year - 1970) * 12 + month - 1
+    return (
+        months.astype("datetime64[M]").astype("datetime64[D]")
+        + (day - 1).astype("timedelta64[D]")
+    ).astype("datetime64[s]") + (hour * 3600 + minute * 60 + seconds).astype(
+        "timedelta64[s]"
+    )
+
+
+def to_datetime64(values):
+    """Convert datetimes, datetime64 values or integers to an array of UTC
+    datetime64 values.
+
+    Timezone aware datetimes are converted to UTC, timezone naive ones are
+    taken as UTC like by plone.event.utils.utc. Integers are seconds since the
+    epoch, as returned by local_to_utc. None becomes NaT.
+
+    :param values: Sequence or array of datetimes, datetime64 values or
+                   integers.
+    :returns: Array of UTC datetimes.
+    :rtype: numpy.ndarray of dtype datetime64[s]
+    """
+    values = numpy.asarray(values)
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[s]")
+    if values.dtype.kind in "iu":
+        return values.astype(numpy.int64).astype("datetime64[s]")
+    return numpy.array(
+        [None if it is None else tzdel(utc(it)) for it in values.ravel().tolist()],
+        dtype="datetime64[s]",
+    ).reshape(values.shape)
+
+
+def _encode(values, dtype, encode):
+    values = to_datetime64(values)
+    missing = numpy.isnat(values)
+    if missing.any():
+        # Like dt2int, None is 0.
+        ret = numpy.zeros(values.shape, dtype=dtype)
+        ret[~missing] = encode(values[~missing])
+        return ret
+    return encode(values.ravel()).reshape(values.shape)
+
+
+def _decode(values, decode):
+    values = numpy.asarray(values, dtype=numpy.int64)
+    ret = decode(values)
+    # 0 is the representation of None.
+    ret[values == 0] = numpy.datetime64("NaT")
+    return ret
+
+
+def dt2int_array(values):
+    """Calculate the integer representations of many datetimes as
+    plone.event.utils.dt2int does.
+
+    :param values: Sequence or array of datetimes, datetime64 values or
+                   integers, as for to_datetime64.
+    :returns: Array of integer representations.
+    :rtype: numpy.ndarray of dtype int32
+    :raises OverflowError: If a value exceeds the 32bit range.
+
+    >>> from datetime import datetime
+    >>> from plone.event.vectorized import dt2int_array
+    >>> import pytz
+    >>> dt2int_array([pytz.utc.localize(datetime(2011, 11, 11, 11, 11)), None])
+    array([1077760031,          0], dtype=int32)
+
+    """
+    return _encode(values, numpy.int32, _dt2int)
+
+
+def int2dt_array(values):
+    """Return the UTC datetimes of many dt2int integer representations. 0
+    becomes NaT.
+
+    :param values: Sequence or array of integers.
+    :rtype: numpy.ndarray of dtype datetime64[s]
+
+    >>> from plone.event.vectorized import int2dt_array
+    >>> int2dt_array([1077760031, 1077834239])
+    array(['2011-11-11T11:11:00', '2011-12-31T23:59:00'],
+          dtype='datetime64[s]')
+
+    """
+    return _decode(values, _from_calendar)
+
+
+def dt2int64_array(values):
+    """Calculate the 64bit integer representations of many datetimes with a
+    resolution of one second, as plone.event.utils.dt2int64 does.
+
+    :param values: Sequence or array of datetimes, datetime64 values or
+                   integers, as for to_datetime64.
+    :rtype: numpy.ndarray of dtype int64
+
+    >>> from plone.event.vectorized import dt2int64_array
+    >>> import numpy
+    >>> dt2int64_array(numpy.array(['2011-11-11T11:11:11'], 'datetime64[s]'))
+    array([64665601871])
+
+    """
+
+    def encode(values):
+        minutes, seconds = _calendar(values)
+        return minutes * 60 + seconds
+
+    return _encode(values, numpy.int64, encode)
+
+
+def int642dt_array(values):
+    """Return the UTC datetimes of many dt2int64 integer representations. 0
+    becomes NaT.
+
+    :param values: Sequence or array of integers.
+    :rtype: numpy.ndarray of dtype datetime64[s]
+
+    >>> from plone.event.vectorized import int642dt_array
+    >>> int642dt_array([64665601871])
+    array(['2011-11-11T11:11:11'], dtype='datetime64[s]')
+
+    """
+    return _decode(values, lambda values: _from_calendar(*numpy.divmod(values, 60)))